@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks for src.pyutilities.logit hot paths.
+
+    uv run python benchmarks/bench_logit.py [benchmark_name ...]
+
+Each benchmark prints the cost per call (nanoseconds) or the throughput of the
+compared variants. Without arguments every registered benchmark is run.
+"""
+import os
+import sys
+import time
+import re
+import inspect
+import tempfile
+import contextlib
+import multiprocessing
+from pathlib import Path
+from typing import Callable
+from unittest.mock import patch
+
+# Make "src.pyutilities" importable when run as a plain script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.pyutilities.logit import (   # noqa: E402
+    _get_caller_location,
+    _resolve_index,
+    pv,
+    mem_calc,
+    Logit,
+    LogCollector,
+    TimestampCache,
+    LogIndex,
+    LogLevel,
+)
+
+
+def _measure(func: Callable[[], object], number: int) -> float:
+    """ Run func number times and return the mean cost per call in nanoseconds."""
+    start = time.perf_counter_ns()
+    for _ in range(number):
+        func()
+    return (time.perf_counter_ns() - start) / number
+
+
+def _report(label: str, func: Callable[[], object], number: int, baseline: float | None = None) -> float:
+    """ Measure func, print one result line and return the per-call cost."""
+    cost = _measure(func, number)
+    ratio = f"  ({baseline / cost:.1f}x)" if baseline else ""
+    print(f"  {label:<40} {cost:>12,.0f} ns/call{ratio}")
+    return cost
+
+
+# ------------------------------------------------------------------------------
+# Benchmarks
+# ------------------------------------------------------------------------------
+def _getframeinfo_location(skipframe: int = 2):
+    """ Previous caller-location implementation (inspect.getframeinfo based)."""
+    caller_frame = inspect.currentframe()
+    for _ in range(skipframe):
+        caller_frame = caller_frame.f_back
+    frame_info = inspect.getframeinfo(caller_frame)
+    return (frame_info.lineno, frame_info.filename)
+
+
+def bench_caller_location(number: int = 100_000):
+    """ Caller location capture: inspect.getframeinfo vs. f_back/f_lineno fast path."""
+    print("caller_location:")
+    baseline = _report("inspect.getframeinfo", lambda: _getframeinfo_location(), number)
+    _ = _report("_get_caller_location (fast path)", lambda: _get_caller_location(), number, baseline)
+
+    # Full Logit._log cost with console output suppressed
+    with patch.object(Logit, "_notify", lambda self, log_str: None):
+        with_location = Logit()
+        without_location = Logit(location=False)
+        baseline = _report("Logit.info (location=True)", lambda: with_location.info("msg"), number)
+        _ = _report("Logit.info (location=False)", lambda: without_location.info("msg"), number, baseline)
+
+
+def _quiet_logit(**kwargs: object) -> Logit:
+    """ Logit without console output (file/collector output only)."""
+    logger = Logit(location=False, **kwargs)  # type: ignore[arg-type]
+    logger._notify = lambda log_str: None
+    return logger
+
+
+def _direct_worker(path: str, count: int):
+    """ Worker process appending to the shared log file itself (open/close per record)."""
+    logger = _quiet_logit(logfile=path)
+    for i in range(count):
+        logger.info("pid %d record %d", os.getpid(), i)
+
+
+def _collector_worker(record_queue: "multiprocessing.Queue[str | None]", count: int):
+    """ Worker process sending records to the LogCollector writer process."""
+    logger = _quiet_logit(collector=record_queue)
+    for i in range(count):
+        logger.info("pid %d record %d", os.getpid(), i)
+
+
+def _run_workers(target: Callable[..., None], args: tuple[object, ...], processes: int) -> float:
+    """ Start processes running target(*args) and return the elapsed seconds until all exit."""
+    workers = [multiprocessing.Process(target=target, args=args) for _ in range(processes)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+
+
+def bench_collector(records_per_process: int = 5_000):
+    """ Multi-process throughput: every process appending vs. one LogCollector writer."""
+    print("collector (records/second, all processes combined):")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for processes in (1, 4, 16):
+            total = processes * records_per_process
+
+            direct_path = os.path.join(tmp_dir, f"direct_{processes}.log")
+            direct_s = _run_workers(_direct_worker, (direct_path, records_per_process), processes)
+
+            collector_path = os.path.join(tmp_dir, f"collector_{processes}.log")
+            collector = LogCollector(collector_path)
+            collector.start()
+            start = time.perf_counter()
+            _ = _run_workers(_collector_worker, (collector.queue, records_per_process), processes)
+            collector.stop()  # Includes draining the queue to disk
+            collector_s = time.perf_counter() - start
+
+            print(f"  {processes:>2} process(es): direct append {total / direct_s:>12,.0f}"
+                  f"   collector {total / collector_s:>12,.0f}  ({direct_s / collector_s:.1f}x)")
+
+
+def bench_timestamp(number: int = 200_000):
+    """ Log timestamp formatting: strftime(localtime()) per record vs. TimestampCache."""
+    print("timestamp:")
+    baseline = _report(
+        "time.strftime(time.localtime())",
+        lambda: time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()), number
+    )
+    for precision in ("s", "ms", "us"):
+        cache = TimestampCache(precision)
+        _ = _report(f"TimestampCache({precision!r})", cache.format, number, baseline)
+    utc_cache = TimestampCache("us", utc=True)
+    _ = _report("TimestampCache('us', utc=True)", utc_cache.format, number, baseline)
+
+
+def bench_rate_limit(number: int = 50_000):
+    """ Log storm: cost of a record written to the log file vs. one suppressed by the rate limiter."""
+    print("rate_limit:")
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            patch.object(Logit, "_notify", lambda self, log_str: None):
+        for location in (True, False):
+            emitting = Logit(logfile=os.path.join(tmp_dir, "storm.log"), location=location)
+            limited = Logit(logfile=os.path.join(tmp_dir, "limited.log"), location=location,
+                            rate_limit=1.0, rate_burst=1)
+            baseline = _report(f"Logit.err (written, location={location})",
+                               lambda: emitting.err("db down: %s", 1), number)
+            _ = _report(f"Logit.err (suppressed, location={location})",
+                        lambda: limited.err("db down: %s", 1), number, baseline)
+
+
+def bench_log_search(records: int = 200_000):
+    """ Time-range query on a large log file: line-by-line scan vs. LogIndex (mmap + sparse index)."""
+    print("log_search (one minute out of a long log):")
+    logger = Logit(location=False)
+    start = 1769171696.0
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "big.log")
+        with open(path, "w", encoding="utf8") as log:
+            for i in range(records):
+                _ = log.write(logger._format_record(LogLevel.INFO, f"request {i} done", None, start + i / 10) + "\n")
+        first = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start + records / 20))
+        last = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start + records / 20 + 60))
+
+        def scan() -> int:
+            with open(path, encoding="utf8") as log:
+                return sum(1 for line in log if first <= line[:19] < last)
+
+        index = LogIndex(path)
+        build_start = time.perf_counter()
+        _ = index.update()
+        build_ms = (time.perf_counter() - build_start) * 1000
+        print(f"  index build: {build_ms:,.1f} ms ({len(index.entries)} entries, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB)")
+        baseline = _report("full scan", scan, 3)
+        _ = _report("LogIndex.search", lambda: sum(1 for _ in index.search(first, last)), 3, baseline)
+
+
+def _uncached_pv(*args: object) -> None:
+    """ Previous pv() implementation: source line read and parsed on every call."""
+    caller_frame = inspect.currentframe().f_back
+    frame_info = inspect.getframeinfo(caller_frame)
+    var_name = ""
+    for line in frame_info.code_context or []:
+        if match := re.search(r"pv\(\s*(.+?)\s*\)", re.sub(r"#.*$", "", line).strip()):
+            var_name = match.group(1).split(", end")[0].strip()
+            break
+    if index_matches := re.findall(r"\[(.*?)\]", var_name):
+        var_name = var_name.split("[")[0] + "".join(
+            f"[{eval(part, globals(), caller_frame.f_locals)}]" for part in index_matches
+        )
+    print(f"{frame_info.lineno}@{frame_info.filename} {var_name} = {', '.join(map(str, args))}")
+
+
+def bench_pv(number: int = 1_000_000):
+    """ pv() inside a hot loop: per-call source parsing vs. per-call-site cache."""
+    print(f"pv (loop of {number:,} iterations, output to {os.devnull}):")
+    values = list(range(16))
+
+    def uncached_loop(count: int):
+        for i in range(count):
+            _uncached_pv(values[i % 16])
+
+    def cached_loop(count: int):
+        for i in range(count):
+            pv(values[i % 16])
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # The uncached path is slow: measure a slice of the loop and scale it up
+        baseline_number = max(1, number // 20)
+        baseline = _measure(lambda: uncached_loop(baseline_number), 1) / baseline_number
+        cached = _measure(lambda: cached_loop(number), 1) / number
+    print(f"  {'uncached (getframeinfo + re per call)':<40} {baseline:>12,.0f} ns/call"
+          f"   (~{baseline * number / 1e9:,.1f} s per loop)")
+    print(f"  {'pv (call-site cache)':<40} {cached:>12,.0f} ns/call"
+          f"   ({cached * number / 1e9:,.1f} s per loop)  ({baseline / cached:.1f}x)")
+
+
+def bench_resolve_index(number: int = 200_000):
+    """ Index expression evaluation: eval() of the raw string vs. LRU-cached code objects."""
+    print("resolve_index:")
+    locals_dict = {"i": 3, "rows": [[1, 2, 3, 4, 5]] * 5}
+    expression = "rows[i - 1][i + 1] * 2"
+    baseline = _report("eval(str) per call", lambda: str(eval(expression, globals(), locals_dict)), number)
+    _ = _report("_resolve_index (compiled, cached)",
+                lambda: _resolve_index(expression, locals_dict, safe=False), number, baseline)
+    _ = _report("_resolve_index (safe mode)",
+                lambda: _resolve_index(expression, locals_dict, safe=True), number, baseline)
+
+
+def bench_mem_calc(number: int = 20_000):
+    """ Allocation profiling overhead: plain call vs. mem_calc with/without sites and sampling."""
+    print("mem_calc (function allocating a 1000-item list):")
+
+    def work() -> list[int]:
+        return list(range(1000))
+
+    baseline = _report("plain call", work, number)
+    # Stats mode: no per-call output
+    _ = _report("mem_calc (every call, top_sites=0)",
+                mem_calc(work, stats=True, sample_every=1, top_sites=0), number // 10, baseline)
+    _ = _report("mem_calc (every call, top_sites=5)",
+                mem_calc(work, stats=True, sample_every=1, top_sites=5), number // 20, baseline)
+    _ = _report("mem_calc (default: 1 call in 100)",
+                mem_calc(work, stats=True), number, baseline)
+
+
+# Registered benchmarks (name → function)
+BENCHMARKS: dict[str, Callable[[], None]] = {
+    "caller_location": bench_caller_location,
+    "collector": bench_collector,
+    "timestamp": bench_timestamp,
+    "rate_limit": bench_rate_limit,
+    "log_search": bench_log_search,
+    "pv": bench_pv,
+    "resolve_index": bench_resolve_index,
+    "mem_calc": bench_mem_calc,
+}
+
+
+def main(names: list[str]):
+    """ Run the selected benchmarks (all when names is empty)."""
+    for name in names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choices: {', '.join(BENCHMARKS)})")
+            sys.exit(1)
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
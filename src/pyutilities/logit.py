@@ -5,9 +5,32 @@ Python Debugging & Logging Utility Toolkit
 ==========================================
 Core Features:
 - Enhanced print functions (po/pv/pe) with caller context (line number + filename)
-- Function execution time calculator (time_calc decorator)
+  and a redirectable, optionally buffered output target (stderr, file, sink, memory)
+- Function execution time calculator (time_calc decorator) with aggregated statistics mode
+- Coroutine/generator aware timing (time to completion, optional running/suspended split)
+- Hierarchical span tracing (call tree with inclusive/self time, Chrome trace export)
+- Statistical sampling profiler thread (flamegraph-compatible folded stacks)
+- Allocation profiling (mem_calc decorator / MemoryProfile context manager):
+  peak/net bytes and top allocation sites per call via tracemalloc, aggregated
+  like the timing statistics, with 1-in-N call sampling
 - Extensible class-based logging decorator (Logit) with log levels and file output
 - Inheritable logging extension (EmailLogit) for notification integration
+  (optional background digest delivery over one reusable SMTP session)
+- Optional background writer thread (AsyncFileWriter) for high-volume file logging
+- Size/time based log rotation with retention and background compression (RotatingFile)
+- Multi-process safe collection: workers send records to one writer process (LogCollector)
+- In-memory flight recorder: keep the last N records, dump them when an ERROR arrives
+- Structured JSON Lines output with per-call key/value fields (and a streaming reader)
+- Cached timestamp formatting (s/ms/us precision, local or UTC ISO-8601)
+- Log storm suppression: token-bucket rate limit per call site and message
+- Pluggable output sinks (console, file, rotating file, memory, socket, SQLite) with
+  per-sink level threshold and optional per-sink background queue
+- SQLite sink with batched transactions and indexed time/level/location queries
+- Decorator capture of arguments/return values/exceptions with bounded repr cost,
+  argument redaction and 1-in-N call sampling
+- Context fields (request/trace ids) bound via contextvars, merged into every record
+- Indexed search over log files: mmap + sparse timestamp→offset index saved next to
+  the file, time-range/level queries (library API and pyutilities-logsearch command)
 
 Dependencies:
 - inspect: For retrieving call stack/frame metadata (core for context awareness)
@@ -16,22 +39,64 @@ Dependencies:
 - enum: For typed log level definitions
 - functools.wraps: For preserving original function metadata in decorators
 - typing: For type hints (improves maintainability and IDE support)
+- threading/queue: For the background file writer (asynchronous logging mode)
 
 Usage Notes:
 - Frame references are explicitly deleted to prevent memory leaks
 - Log levels follow IntEnum (higher value = more severe: INFO < WARN < ERROR)
+- Set PYUTILITIES_DEBUG_PRINT=0 to turn po/pv/pe into no-ops (set_debug_print(True) re-enables them)
+- Set PYUTILITIES_SAFE_EVAL=1 (or call set_safe_index_eval) to restrict pv() index
+  expressions to names, attributes, subscripts and arithmetic (no calls, no builtins)
 """
 # Standard library imports with purpose annotations
+import io                          # In-memory target of po/pv/pe output
+import math                        # Percentile rank computation
+import os                          # Environment variable switches (debug print on/off)
 import re                          # Regular expressions for parsing variable/expression strings
+import sys                         # Thread frame snapshots for the sampling profiler
 import inspect                     # Access call stack/frame info (caller line, filename, locals)
 import time                        # Time utilities (timestamps, execution time measurement)
+import queue                       # Bounded FIFO between log callers and the writer thread
+import random                      # Reservoir sampling for timing percentiles
+import gzip                        # Compression of rotated log files
+import json                        # Chrome trace-event export, JSON Lines records
+import json.encoder                # C-accelerated JSON string escaping (precompiled encoder)
+import lzma                        # Compression of rotated log files (xz)
+import shutil                      # Stream copy when compressing rotated log files
+import threading                   # Background writer thread for asynchronous file logging
+import multiprocessing             # Collector process for multi-process log output
+import multiprocessing.util        # Exit finalizers (drain async records, also in child processes)
+import weakref                     # Exit finalizers that do not keep their object alive
+import smtplib                     # Reusable SMTP session of the email digest sender
+import socket                      # SocketSink (TCP/UDP log shipping)
+import sqlite3                     # SQLiteSink connection factory
+import mmap                        # Zero-copy scanning of large log files (LogIndex)
+import bisect                      # Binary search in the sparse timestamp index
+import argparse                    # Command line of the log search entry point
+import reprlib                     # Size-bounded repr of captured arguments/return values
+import itertools                   # Thread-safe call counter for decorator sampling
+import ast                         # pv()/pe() call extraction, index expression whitelist
+import linecache                   # Caller source lines for pv()/pe() call extraction
+import tracemalloc                 # Allocation profiling (mem_calc/MemoryProfile)
+from email.mime.text import MIMEText  # Email digest message body
+from contextvars import ContextVar, Token  # Current trace span (safe across threads and tasks)
 from enum import IntEnum           # Typed enumeration for log levels (type-safe vs. plain integers)
+from types import CodeType         # Type hint for code objects (caller filename cache key)
 from functools import wraps        # Preserve original function metadata in decorators
+from functools import lru_cache    # Compiled index expression cache (pv/_resolve_index)
 from typing import override        # Mark method overrides (type hint for inheritance)
+from typing import overload        # Typed signatures for dual-use decorators (@deco / @deco(...))
+from collections import deque      # Flight-recorder ring buffer (bounded, O(1) append)
+from collections import OrderedDict  # LRU order of the pv()/pe() call-site caches
+from collections.abc import Awaitable, Generator, Hashable, Collection, Iterator
 from typing import (
+    Any,                           # Values passed through wrapped coroutines/generators
+    Literal,                       # Type hint for fixed string options (queue overflow policy)
     Callable,                      # Type hint for callable objects (functions/methods)
     TypeVar,                       # Generic type variable for flexible type hints
     ParamSpec,                     # Generic type for function parameter specifications
+    cast,                          # Narrow queue items to their concrete type
+    TextIO,                        # Output stream of ConsoleSink
 )
 
 
@@ -50,9 +115,62 @@ V = TypeVar('V')
 P = ParamSpec("P")
 R = TypeVar("R")
 
+# Policy applied when the asynchronous log queue is full:
+# "block" - caller waits for free space (no records lost)
+# "drop_oldest" - discard the oldest queued record to make room for the new one
+# "drop_newest" - discard the incoming record
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest"]
+
+# Compression applied to rotated log files (None = keep them as plain text)
+CompressionType = Literal["gzip", "lzma"] | None
+
+# Transport of SocketSink
+SocketProtocol = Literal["tcp", "udp"]
+
+# Log line format: classic text ("timestr location [LEVEL]: msg") or JSON Lines
+OutputFormat = Literal["text", "json"]
+
+# Fractional-second precision of log timestamps (seconds, milliseconds, microseconds)
+TimestampPrecision = Literal["s", "ms", "us"]
+
+# Log message: a ready string, a printf-style template (formatted with args),
+# or a zero-argument callable evaluated only when the record is emitted
+LogMessage = str | Callable[[], object]
+
+
+# Cache: raw code filename (co_filename) → display filename reported for it
+# (same value inspect.getframeinfo would report, resolved once per source file)
+_filename_cache: dict[str, str] = {}
+
+
+def _code_filename(code: CodeType) -> str:
+    """ Resolve the display filename of a code object (cached per source file).
+    Avoids the per-call source lookup done by inspect.getframeinfo.
+
+    Args:
+        code: Code object of the frame being inspected
+
+    Returns:
+        Source file path (falls back to co_filename for non-file code)
+    """
+    raw_filename = code.co_filename
+    try:
+        return _filename_cache[raw_filename]
+    except KeyError:
+        pass
+
+    try:
+        filename = inspect.getsourcefile(code) or raw_filename
+    except (TypeError, AttributeError):
+        filename = raw_filename
+    _filename_cache[raw_filename] = filename
+    return filename
+
 
 def _get_caller_location(skipframe: int = 2):
     """ get caller location according skipframe
+    Walks frames via f_back and reads f_lineno/co_filename directly
+    (no source context or Traceback object is built).
 
     Args:
         skipframe: the frame number to skip
@@ -72,11 +190,10 @@ def _get_caller_location(skipframe: int = 2):
 
         # Extract caller metadata if frame is available
         if caller_frame:
-            frame_info = inspect.getframeinfo(caller_frame)
             # Full path to caller file
-            caller_filename = frame_info.filename
+            caller_filename = _code_filename(caller_frame.f_code)
             # Line number of caller
-            caller_lineno = frame_info.lineno
+            caller_lineno = caller_frame.f_lineno
     except:
         pass
     finally:  # Release frame reference (critical for memory management)
@@ -84,6 +201,248 @@ def _get_caller_location(skipframe: int = 2):
             del caller_frame
         return (caller_lineno, caller_filename)
 
+
+def _definition_location(func: Callable[..., object]) -> tuple[int | str, str] | None:
+    """ Location where a function is defined, for records that describe the function
+    as a whole (e.g. periodic statistics) rather than one call site.
+
+    Args:
+        func: Decorated function (decorator wrappers are unwrapped)
+
+    Returns:
+        (first lineno, filename), or None for callables without a code object
+    """
+    code = getattr(inspect.unwrap(func), "__code__", None)
+    if not isinstance(code, CodeType):
+        return None
+    return (code.co_firstlineno, _code_filename(code))
+
+# ------------------------------------------------------------------------------
+# Debug Print Switch
+# ------------------------------------------------------------------------------
+# Environment variable values that disable po/pv/pe at import time
+_FALSE_VALUES = ("0", "false", "off", "no")
+
+# Global on/off state for po/pv/pe (initialized from PYUTILITIES_DEBUG_PRINT)
+_debug_print_enabled: bool = (
+    os.environ.get("PYUTILITIES_DEBUG_PRINT", "1").strip().lower() not in _FALSE_VALUES
+)
+
+
+def set_debug_print(enabled: bool):
+    """ Turn po/pv/pe output on or off at runtime.
+    Disabled calls return immediately (before any frame inspection or formatting).
+
+    Args:
+        enabled: True to print, False to make po/pv/pe no-ops
+    """
+    global _debug_print_enabled
+    _debug_print_enabled = enabled
+
+
+def is_debug_print_enabled() -> bool:
+    """ Return whether po/pv/pe currently produce output."""
+    return _debug_print_enabled
+
+
+# Safe evaluation of pv() index expressions (initialized from PYUTILITIES_SAFE_EVAL)
+_safe_index_eval: bool = (
+    os.environ.get("PYUTILITIES_SAFE_EVAL", "0").strip().lower() not in _FALSE_VALUES
+)
+
+
+def set_safe_index_eval(enabled: bool):
+    """ Turn safe evaluation of index expressions (pv/_resolve_index) on or off.
+    In safe mode only names, attributes, subscripts, constants and arithmetic are
+    evaluated; anything else (calls, comprehensions, dunder attributes, ...) is
+    left unresolved.
+
+    Args:
+        enabled: True to restrict index expressions, False to use plain eval()
+    """
+    global _safe_index_eval
+    _safe_index_eval = enabled
+
+
+def is_safe_index_eval_enabled() -> bool:
+    """ Return whether index expressions are evaluated in safe mode."""
+    return _safe_index_eval
+
+
+# ------------------------------------------------------------------------------
+# Exit Finalizers
+# ------------------------------------------------------------------------------
+def _exit_finalizer(obj: object, method: str) -> multiprocessing.util.Finalize:
+    """ Call obj.<method>() at interpreter exit (multiprocessing finalizers also run
+    in child processes, unlike atexit; high priority so buffered records are written
+    before multiprocessing queues are closed).
+    The callback only holds a weak reference: an object that is garbage collected
+    first is not kept alive by the finalizer registry (its entry is removed, and
+    records still buffered in it are lost - close() it to write them).
+
+    Args:
+        obj: Object to finalize
+        method: Name of the zero-argument method to call (e.g. "close")
+
+    Returns:
+        Finalizer; cancel() it when the object is closed explicitly
+    """
+    ref = weakref.ref(obj)
+
+    def finalize():
+        target = ref()
+        if target is not None:
+            getattr(target, method)()
+    return multiprocessing.util.Finalize(obj, finalize, exitpriority=100)
+
+
+# ------------------------------------------------------------------------------
+# Debug Print Output
+# ------------------------------------------------------------------------------
+class DebugOutput():
+    """ Output target of po/pv/pe.
+    Every call produces one complete line written with a single write() under a
+    lock, so lines from different threads never interleave. With buffer_lines > 1
+    lines are collected and written in one batch (one write syscall per batch);
+    call flush() to push them out early.
+
+    Targets:
+        "stdout"/"stderr": standard stream (looked up at write time)
+        "memory": in-memory buffer (read back with getvalue())
+        other str: file path (appended to, kept open)
+        text stream: any object with write()/flush()
+        LogSink: each line becomes an INFO LogRecord of the sink
+
+    Attributes:
+        target: Configured target
+        buffer_lines: Lines collected before a batch is written (<= 1 = unbuffered)
+        _stream: Output stream (None = standard stream or sink target)
+        _owns_stream: Whether close() closes _stream (file path target)
+        _sink: Sink target (None = stream target)
+        _pending: Buffered lines (or records for a sink target)
+        _lock: Makes line writes and batch flushes atomic across threads
+    """
+    def __init__(self, target: "str | TextIO | LogSink" = "stdout", buffer_lines: int = 0):
+        """ Open the target.
+
+        Args:
+            target: "stdout", "stderr", "memory", a file path, a text stream or a LogSink
+            buffer_lines: Lines collected before a batch is written (default: 0 = unbuffered)
+        """
+        self.target: "str | TextIO | LogSink" = target
+        self.buffer_lines: int = max(0, buffer_lines)
+        self._stream: TextIO | None = None
+        self._owns_stream: bool = False
+        self._sink: "LogSink | None" = None
+        self._pending: list[Any] = []
+        self._lock: threading.Lock = threading.Lock()
+        if target == "memory":
+            self._stream = io.StringIO()
+        elif isinstance(target, str):
+            if target not in ("stdout", "stderr"):
+                self._stream = open(target, "a", encoding="utf8")
+                self._owns_stream = True
+        elif isinstance(target, LogSink):
+            self._sink = target
+        else:
+            self._stream = target
+        if self.buffer_lines > 1:
+            # Buffered lines reach their target at interpreter exit
+            self._finalizer = _exit_finalizer(self, "flush")
+
+    def _output(self) -> TextIO:
+        """ Resolve the stream written to (standard streams are looked up per write)."""
+        if self._stream is not None:
+            return self._stream
+        return sys.stderr if self.target == "stderr" else sys.stdout
+
+    def write(self, location: str, text: str, end: str = "\n"):
+        """ Write (or buffer) one po/pv/pe line.
+
+        Args:
+            location: Caller location ("lineno@filename")
+            text: Line content after the location
+            end: Line terminator
+        """
+        with self._lock:
+            if self._sink is not None:
+                lineno, _, filename = location.partition("@")
+                line = f"{location} {text}"
+                item: Any = LogRecord(time.time(), LogLevel.INFO, (lineno, filename), line, None, line)
+            else:
+                item = f"{location} {text}{end}"
+            if self.buffer_lines <= 1:
+                self._deliver([item])
+                return
+            self._pending.append(item)
+            if len(self._pending) >= self.buffer_lines:
+                self._deliver(self._pending)
+                self._pending = []
+
+    def _deliver(self, items: list[Any]):
+        """ Write a batch of lines/records to the target (caller holds the lock)."""
+        if self._sink is not None:
+            for record in items:
+                self._sink.emit(record)
+            return
+        stream = self._output()
+        _ = stream.write(items[0] if len(items) == 1 else "".join(items))
+
+    def flush(self):
+        """ Write buffered lines and flush the target."""
+        with self._lock:
+            if self._pending:
+                self._deliver(self._pending)
+                self._pending = []
+            if self._sink is not None:
+                self._sink.flush()
+            else:
+                self._output().flush()
+
+    def getvalue(self) -> str:
+        """ Return everything written to the "memory" target ("" for other targets)."""
+        self.flush()
+        return self._stream.getvalue() if isinstance(self._stream, io.StringIO) else ""
+
+    def close(self):
+        """ Flush and close a file target opened by this object (other targets stay open)."""
+        self.flush()
+        if self.buffer_lines > 1:
+            self._finalizer.cancel()
+        if self._owns_stream and self._stream is not None:
+            self._stream.close()
+
+
+# Current output target of po/pv/pe (unbuffered sys.stdout by default)
+_debug_output: DebugOutput = DebugOutput()
+
+
+def set_debug_output(target: "str | TextIO | LogSink" = "stdout", buffer_lines: int = 0) -> DebugOutput:
+    """ Redirect po/pv/pe output (the previous target is flushed and closed).
+
+    Args:
+        target: "stdout", "stderr", "memory", a file path, a text stream or a LogSink
+        buffer_lines: Lines collected before a batch is written (default: 0 = unbuffered)
+
+    Returns:
+        The new output target (e.g. for getvalue() of a "memory" target)
+    """
+    global _debug_output
+    previous, _debug_output = _debug_output, DebugOutput(target, buffer_lines)
+    previous.close()
+    return _debug_output
+
+
+def get_debug_output() -> DebugOutput:
+    """ Return the current po/pv/pe output target."""
+    return _debug_output
+
+
+def flush_debug_output():
+    """ Write buffered po/pv/pe lines to their target."""
+    _debug_output.flush()
+
+
 # ------------------------------------------------------------------------------
 # Enhanced Print Functions
 # ------------------------------------------------------------------------------
@@ -106,6 +465,10 @@ def po(*values: object, endstr: str = "\n") -> None:
         Explicitly deletes frame references to avoid cyclic references/memory leaks.
 
     """
+    # Globally disabled: skip all work
+    if not _debug_print_enabled:
+        return
+
     # Get location (use DEFAULT skip_frames=2: code -> this po() function → actual caller)
     lineno, filename = _get_caller_location()
     location_str = f"{lineno}@{filename}"
@@ -124,18 +487,193 @@ def po(*values: object, endstr: str = "\n") -> None:
         output_str = f"[Conversion Error]: {e}"
 
     # Print final output (location + values)
-    print(f"{location_str} {output_str}", end=endstr)
+    _debug_output.write(location_str, output_str, endstr)
+
+
+# Compiled patterns used by pv/pe to find their own call in the caller's source line
+_COMMENT_PATTERN = re.compile(r"#.*$")
+_PV_PATTERN = re.compile(r"pv\(\s*(.+?)\s*\)")
+_PE_PATTERN = re.compile(r"\bpe\s*\(([^()]*+(?:\([^()]*+\)[^()]*+)*+)\)")
+_INDEX_PATTERN = re.compile(r"\[(.*?)\]")
+
+
+def _format_index_value(value: object) -> str:
+    """ Format values to distinguish string types from non-str types.
+
+    Args:
+        value: Original value (before string conversion)
+
+    Returns:
+        Formatted string with special markers for empty/space-only strings
+    """
+    # Case 1: Non-string values (int, None, float, etc.) → direct string conversion
+    if not isinstance(value, str):
+        return str(value)
+
+    # Case 2: Exact empty string ("")
+    if value == "":
+        return "<EMPTY>"
+
+    # Case 3: String with only whitespace (spaces/tabs/newlines)
+    stripped = value.strip()
+    if stripped == "":
+        return f"<SPACE:{len(value)}>"  # Mark space count (e.g., "<SPACE:2>")
+
+    # Case 4: Normal string (has non-whitespace content) → quote it
+    return f"'{value}'"
+
+
+# AST nodes allowed in safe mode: names, attributes, subscripts and arithmetic
+_SAFE_INDEX_NODES: tuple[type[ast.AST], ...] = (
+    ast.Expression, ast.Name, ast.Load, ast.Attribute, ast.Subscript, ast.Constant,
+    ast.BinOp, ast.UnaryOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv,
+    ast.Mod, ast.UAdd, ast.USub,
+)
+
+# Globals of safe mode evaluation: no builtins (names resolve from the caller's locals)
+_SAFE_INDEX_GLOBALS: dict[str, Any] = {"__builtins__": {}}
+
+
+def _is_safe_index(tree: ast.AST) -> bool:
+    """ Check that an index expression only uses the safe mode node whitelist.
+    Attribute names starting with "_" are rejected (no __class__/__globals__ walks).
+
+    Args:
+        tree: Parsed expression (mode="eval")
+
+    Returns:
+        True if the expression can be evaluated in safe mode
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, _SAFE_INDEX_NODES):
+            return False
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            return False
+    return True
+
+
+class _IndexExpression():
+    """ Index expression parsed and compiled once (evaluated many times).
+    Comma-separated indexes (numpy-style tuple indexing) are split into parts,
+    each compiled to its own code object and checked against the safe mode whitelist.
+
+    Attributes:
+        text: Original index expression string
+        parts: (part text, code object or None if it does not compile, safe) per part
+        is_tuple: Whether the expression is comma-separated (rendered as "(a,b)")
+    """
+    __slots__ = ("text", "parts", "is_tuple")
+
+    def __init__(self, index_str: str):
+        """ Split, parse and compile index_str.
+
+        Args:
+            index_str: Index expression string (e.g., "i", "i+1", "i,j")
+        """
+        self.text: str = index_str
+        self.is_tuple: bool = "," in index_str
+        texts = [index_str]
+        if self.is_tuple:
+            texts = self._split(index_str)
+            self.is_tuple = len(texts) > 1
+        self.parts: tuple[tuple[str, CodeType | None, bool], ...] = tuple(
+            (text, *self._compile(text)) for text in texts
+        )
 
+    @staticmethod
+    def _split(index_str: str) -> list[str]:
+        """ Split a comma-separated index into its parts.
+        Only top-level commas separate parts (a[f(i, j)] is one index); text that
+        does not parse is split at every comma.
+        """
+        try:
+            tree = ast.parse(index_str.strip(), "<index>", "eval").body
+        except (SyntaxError, ValueError):
+            return [p.strip() for p in index_str.split(",")]
+        if not isinstance(tree, ast.Tuple):
+            return [index_str]
+        return [ast.get_source_segment(index_str.strip(), element) or "" for element in tree.elts]
+
+    @staticmethod
+    def _compile(text: str) -> tuple[CodeType | None, bool]:
+        """ Compile one index part.
+
+        Returns:
+            (code object or None if it is not a valid expression, passes safe mode check)
+        """
+        try:
+            tree = ast.parse(text.strip(), "<index>", "eval")
+            return (compile(tree, "<index>", "eval"), _is_safe_index(tree))
+        except (SyntaxError, ValueError):
+            return (None, False)
+
+    @staticmethod
+    def _evaluate(code: CodeType, safe: bool, locals_dict: dict[str, Any]) -> object:
+        """ Evaluate one compiled part (restricted globals in safe mode)."""
+        if safe:
+            return eval(code, _SAFE_INDEX_GLOBALS, locals_dict)
+        return eval(code, globals(), locals_dict)
+
+    def resolve(self, locals_dict: dict[str, Any], safe: bool = False) -> str:
+        """ Evaluate the expression against the caller's locals and format the result.
+
+        Args:
+            locals_dict: Caller's local variables (from caller_frame.f_locals)
+            safe: Refuse parts outside the safe mode whitelist (left unresolved)
+
+        Returns:
+            Resolved index value (or original expression if resolution fails)
+        """
+        # Empty index input (after stripping whitespace)
+        if not self.text.strip():
+            return "<EMPTY>"
+
+        if self.is_tuple:
+            resolved_parts: list[str] = []
+            for part, code, is_safe in self.parts:
+                try:
+                    if code is None:
+                        code = compile(part, "<index>", "eval")  # Raises the SyntaxError
+                    if safe and not is_safe:
+                        raise ValueError(f"unsafe expression: {part}")
+                    # Get actual value (e.g., "i" → 0(int))
+                    resolved_parts.append(_format_index_value(self._evaluate(code, safe, locals_dict)))
+                # Handle evaluation failures (keep original expression)
+                except (NameError, TypeError, ValueError, SyntaxError) as e:
+                    po(f"{self.text} eval error: {e}")
+                    resolved_parts.append(part)
+            return f"({','.join(resolved_parts)})"
 
-def _resolve_index(index_str: str, locals_dict: dict[str, V]) -> str:
+        # Handle single index/expression
+        _, code, is_safe = self.parts[0]
+        if code is None or (safe and not is_safe):
+            return self.text
+        try:
+            # Evaluate simple expressions (e.g. "i+1", "len(list)")
+            return _format_index_value(self._evaluate(code, safe, locals_dict))
+        except:
+            # Return original if evaluation fails
+            return self.text
+
+
+@lru_cache(maxsize=512)
+def _compile_index(index_str: str) -> _IndexExpression:
+    """ Parse and compile an index expression (LRU cached by expression text)."""
+    return _IndexExpression(index_str)
+
+
+def _resolve_index(index_str: str, locals_dict: dict[str, V], safe: bool | None = None) -> str:
     """ Resolve index string with variables/expressions to actual values
     Converts variable references/expressions to their stringified values (e.g., i=5 → "5").
     Enhanced: Clearly distinguish empty strings ("") from space-only strings ("  ") with unique markers.
     Handles comma-separated indexes (e.g. "i,j" → "(0,1)")
+    Expressions are compiled once and kept in an LRU cache (_compile_index).
 
     Args:
         index_str: Index expression string (e.g., "i", "i+1", "5")
         locals_dict: Caller's local variables (from caller_frame.f_locals)
+        safe: Only allow names, attributes, subscripts and arithmetic
+            (None = global setting, see set_safe_index_eval)
 
     Returns:
         Resolved index value (or original expression if resolution fails)
@@ -144,250 +682,3663 @@ def _resolve_index(index_str: str, locals_dict: dict[str, V]) -> str:
         - Normal strings → quoted (e.g., "  test  " → "'  test  '")
         - Other values → regular string (e.g., 5 → "5", None → "None")
 
-    WARNING: Uses eval() directly - DO NOT use with untrusted input!
+    WARNING: Without safe mode uses eval() - DO NOT use with untrusted input!
     """
-    # Helper: Special string formatting for empty/space-only strings
-    def format_special_string(value: V) -> str:
-        """ Format values to distinguish string types from non-str types.
-        
-        Args:
-            value: Original value (before string conversion)
-        
-        Returns:
-            Formatted string with special markers for empty/space-only strings
-        """
-        # Case 1: Non-string values (int, None, float, etc.) → direct string conversion
-        if not isinstance(value, str):
-            return str(value)
+    return _compile_index(index_str).resolve(
+        locals_dict, _safe_index_eval if safe is None else safe
+    )
 
-        # Case 2: Exact empty string ("")
-        if value == "":
-            return "<EMPTY>"
 
-        # Case 3: String with only whitespace (spaces/tabs/newlines)
-        stripped = value.strip()
-        if stripped == "":
-            return f"<SPACE:{len(value)}>"  # Mark space count (e.g., "<SPACE:2>")
-        
-        # Case 4: Normal string (has non-whitespace content) → quote it
-        return f"'{value}'"
+# Whitespace (including line breaks) inside a multi-line argument expression
+_MULTILINE_GAP = re.compile(r"\s*\n\s*")
 
-    # Step 1: Handle empty index input (after stripping whitespace)
-    if not index_str.strip():
-        return "<EMPTY>"
 
-    # Step 2: Evaluate expression (preserve original type)
-    # Handle comma-separated indexes first (numpy-style tuple indexing)
-    if "," in index_str:
-        parts = [p.strip() for p in index_str.split(",")]
-        resolved_parts = []
-        for part in parts:
-            try:
-                # Get actual value (e.g., "i" → 0(int))
-                resolved_val = eval(part, globals(), locals_dict)
-                resolved_parts.append(format_special_string(resolved_val))
-            # Step 3: Handle evaluation failures (return original expression formatted)
-            except (NameError, TypeError, ValueError, SyntaxError) as e:
-                po(f"{index_str} eval error: {e}")
-                resolved_parts.append(part)
-        return f"({','.join(resolved_parts)})"
-
-    # Handle single index/expression
+def _call_expression(caller_frame: Any, filename: str) -> tuple[ast.Call, str] | None:
+    """ Locate the exact call expression the caller frame is executing.
+    The source range of the current instruction (co_positions at f_lasti) spans the
+    whole call, so multi-line calls and several calls on one line are told apart.
+
+    Args:
+        caller_frame: Frame that called pv()/pe()
+        filename: Source file of the frame
+
+    Returns:
+        (parsed call node, call source text) or None if the source is unavailable
+    """
     try:
-        # Evaluate simple expressions (e.g. "i+1", "len(list)")
-        resolved_val = eval(index_str, globals(), locals_dict)
-        return format_special_string(resolved_val)
-    except:
-        # Return original if evaluation fails
-        return index_str
+        code = caller_frame.f_code
+        positions = next(itertools.islice(code.co_positions(), caller_frame.f_lasti // 2, None))
+        lineno, end_lineno, col, end_col = positions
+        if lineno is None or end_lineno is None or col is None or end_col is None:
+            return None
+        lines = linecache.getlines(filename, caller_frame.f_globals)[lineno - 1:end_lineno]
+        if len(lines) != end_lineno - lineno + 1:
+            return None
+        # Column offsets are UTF-8 byte offsets
+        encoded = [line.encode("utf8") for line in lines]
+        encoded[-1] = encoded[-1][:end_col]
+        encoded[0] = encoded[0][col:]
+        source = b"".join(encoded).decode("utf8")
+        node = ast.parse(source, mode="eval").body
+    except (StopIteration, TypeError, ValueError, SyntaxError, UnicodeDecodeError, AttributeError):
+        return None
+    return (node, source) if isinstance(node, ast.Call) else None
+
+
+def _argument_source(source: str, node: ast.AST) -> str:
+    """ Source text of one node of a call (line breaks collapsed to one space)."""
+    segment = ast.get_source_segment(source, node) or ""
+    return _MULTILINE_GAP.sub(" ", segment) if "\n" in segment else segment
+
+
+# Per-call-site caches: (code object, instruction offset) → parsed pv()/pe() call.
+# The source of a call site never changes, so it is read and parsed only on the
+# first call; later calls only evaluate the index expressions.
+# LRU-bounded: exec()/eval()-generated code or reloaded modules create new code
+# objects, which must not accumulate (nor be kept alive) forever.
+_SITE_CACHE_SIZE = 1024
+# pv: (location, base name, compiled indexes or None if the name has no index)
+_pv_sites: OrderedDict[tuple[CodeType, int], tuple[str, str, tuple[_IndexExpression, ...] | None]] = OrderedDict()
+# pe: (location, expression text)
+_pe_sites: OrderedDict[tuple[CodeType, int], tuple[str, str]] = OrderedDict()
+
+
+def _lookup_site(
+    sites: OrderedDict[tuple[CodeType, int], T],
+    caller_frame: Any,
+    parse: Callable[[Any], T]
+) -> T:
+    """ LRU lookup of the parsed call at the caller's current instruction
+    (parsed on a miss; the least recently used site is evicted beyond _SITE_CACHE_SIZE).
+
+    Args:
+        sites: Call-site cache (_pv_sites or _pe_sites)
+        caller_frame: Frame of the pv()/pe() caller
+        parse: Cache miss path (_parse_pv_site or _parse_pe_site)
+
+    Returns:
+        Cached or newly parsed call site
+    """
+    site_key = (caller_frame.f_code, caller_frame.f_lasti)
+    try:
+        sites.move_to_end(site_key)
+        return sites[site_key]
+    except KeyError:
+        # Missing (or evicted by another thread meanwhile): parse again
+        site = sites[site_key] = parse(caller_frame)
+        while len(sites) > _SITE_CACHE_SIZE:
+            _ = sites.popitem(last=False)
+        return site
+
+
+def _parse_pv_site(caller_frame: Any) -> tuple[str, str, tuple[_IndexExpression, ...] | None]:
+    """ Read and parse the caller's pv() call (cache miss path of pv).
+    Uses the AST of the exact call expression; falls back to a regex scan of
+    the caller's line when the source cannot be parsed.
+
+    Args:
+        caller_frame: Frame that called pv()
+
+    Returns:
+        (location string, variable base name, compiled index expressions or None)
+    """
+    var_name: str = ""
+    # Get caller location (lineno@filename)
+    frame_info = inspect.getframeinfo(caller_frame)
+    location_str = f"{frame_info.lineno}@{frame_info.filename}"
+
+    if found := _call_expression(caller_frame, frame_info.filename):
+        call, source = found
+        if not call.args:
+            return (location_str, "", None)
+        # Walk the subscript chain a[i][j] from the outside in
+        node: ast.expr = call.args[0]
+        index_parts: list[str] = []
+        while isinstance(node, ast.Subscript):
+            index_parts.append(_argument_source(source, node.slice))
+            node = node.value
+        var_name = _argument_source(source, node)
+        if not index_parts:
+            return (location_str, var_name, None)
+        return (location_str, var_name,
+                tuple(_compile_index(idx_part) for idx_part in reversed(index_parts)))
+
+    # Extract caller code lines (list of lines where pv() was called)
+    caller_code_lines = frame_info.code_context or []
+    # Iterate through caller lines to find pv() invocation
+    for line in caller_code_lines:
+        # Clean line: remove comments (everything after #) and extra whitespace
+        cleaned_line = _COMMENT_PATTERN.sub("", line).strip()
+        # Matches: pv(var), pv( var ), pv(var, end=""), pv( var , end='')
+        if match := _PV_PATTERN.search(cleaned_line):
+            # Extract variable name (ignore end= parameter if present)
+            var_name = match.group(1).split(", end")[0].strip()
+            break   # Stop after first match (avoids multiple line false positives)
+
+    # Extract all index parts (works for a[i][j], a[i,j] and a[i])
+    index_matches = _INDEX_PATTERN.findall(var_name)
+    if index_matches and var_name:
+        # Base name is everything before the first [
+        return (location_str, var_name.split("[")[0],
+                tuple(_compile_index(idx_part) for idx_part in index_matches))
+    return (location_str, var_name, None)
+
 
 def pv(*args: object, endstr: str = "\n") -> None:
     """ Print variable name (with resolved indexes), value, and caller location
     Supports multi-level/indexed variables (e.g., a[i][j], a[i,j], a[i]).
 
-    Args:
-        args: Variable/value to print (can be any object, including indexed collections)
-        endstr: Trailing character for the print statement (default: newline)
+    Args:
+        args: Variable/value to print (can be any object, including indexed collections)
+        endstr: Trailing character for the print statement (default: newline)
+
+    Returns:
+        None
+
+    Key Features:
+        1. Extracts variable name from caller code (via regex, once per call site)
+        2. Resolves index variables to their actual values (e.g., i=5 → a[5])
+        3. Handles 3 index formats: double-level (a[i][j]), comma-separated (a[i,j]), single-level (a[i])
+        4. Preserves memory safety (deletes frame references)
+    """
+    # Globally disabled: skip all work
+    if not _debug_print_enabled:
+        return
+
+    # Initialize variable name (empty = not found)
+    location_str: str = "unknown@unknown"
+    var_name: str = ""
+
+    # Get current/ caller frames
+    current_frame = inspect.currentframe()
+    caller_frame = current_frame.f_back if current_frame else None
+
+    if caller_frame:
+        location_str, var_name, indexes = _lookup_site(_pv_sites, caller_frame, _parse_pv_site)
+
+        # Rebuild variable name with resolved indexes
+        if indexes:
+            locals_dict = caller_frame.f_locals
+            var_name += "".join([f"[{index.resolve(locals_dict, _safe_index_eval)}]" for index in indexes])
+
+    if current_frame:
+        del current_frame
+    if caller_frame:
+        del caller_frame
+
+    # Print final output
+    value_str = ", ".join(str(arg) for arg in args) if args else ""
+    _debug_output.write(location_str, f"{var_name} = {value_str}", endstr)
+
+
+def _parse_pe_site(caller_frame: Any) -> tuple[str, str]:
+    """ Read and parse the caller's pe() call (cache miss path of pe).
+    Uses the AST of the exact call expression; falls back to a regex scan of
+    the caller's line when the source cannot be parsed.
+
+    Args:
+        caller_frame: Frame that called pe()
+
+    Returns:
+        (location string, expression text; "expression" if not found)
+    """
+    exp_name: str = "expression"
+    frame_info = inspect.getframeinfo(caller_frame)
+    location_str = f"{frame_info.lineno}@{frame_info.filename}"
+
+    if found := _call_expression(caller_frame, frame_info.filename):
+        call, source = found
+        if call.args:
+            exp_name = _argument_source(source, call.args[0])
+        return (location_str, exp_name)
+
+    # Iterate through caller lines to find pe() invocation
+    for line in frame_info.code_context or []:
+        # Clean line: remove comments and extra whitespace
+        cleaned_line = _COMMENT_PATTERN.sub("", line).strip()
+        # Match pe(any_expression) where any_expression can have nested ()
+        if match := _PE_PATTERN.search(cleaned_line):
+            # Extract expression (remove trailing commas if present)
+            exp_name = match.group(1).rstrip(',').strip()
+            break   # Stop after first match
+    return (location_str, exp_name)
+
+
+def pe(exp: object, end: str = "\n") -> None:
+    """ Print expression and its evaluated result (debugging-focused).
+    Extracts the original expression string from caller code (supports nested functions).
+
+    Args:
+        exp: Evaluated expression result (any object)
+        end: Trailing character for the print statement (default: newline)
+
+    Returns:
+        None
+
+    Key Features:
+        1. Uses balanced parentheses regex to handle nested functions (e.g., pe(len(filter(...))))
+        2. Extracts original expression string from caller code (once per call site)
+        3. Gracefully handles missing frame info (uses "expression" as fallback name)
+    """
+    # Globally disabled: skip all work
+    if not _debug_print_enabled:
+        return
+
+    # Initialize expression name (fallback = "expression")
+    exp_name: str = "expression"
+    location_str: str = "unknown@unknown"
+
+    # Get current/caller frame
+    current_frame = inspect.currentframe()
+    caller_frame = current_frame.f_back if current_frame else None
+
+    if caller_frame:
+        location_str, exp_name = _lookup_site(_pe_sites, caller_frame, _parse_pe_site)
+
+    # Clean up frame references (memory safety)
+    if caller_frame:
+        del caller_frame
+    if current_frame:
+        del current_frame
+
+    # Print final output
+    _debug_output.write(location_str, f"{exp_name} = {exp}", end)
+
+
+
+# ------------------------------------------------------------------------------
+# Execution Time Statistics (time_calc stats mode)
+# ------------------------------------------------------------------------------
+def _format_ns(ns: float) -> str:
+    """ Format a nanosecond duration with a readable unit (ns/us/ms/s)."""
+    if ns < 1_000:
+        return f"{ns:.0f}ns"
+    if ns < 1_000_000:
+        return f"{ns / 1_000:.3f}us"
+    if ns < 1_000_000_000:
+        return f"{ns / 1_000_000:.3f}ms"
+    return f"{ns / 1_000_000_000:.3f}s"
+
+
+class TimingStats():
+    """ Aggregated execution-time statistics for one function.
+    Exact count/total/min/max/mean plus p50/p95/p99 estimated from a
+    fixed-size reservoir sample (memory stays bounded for any call count).
+
+    Attributes:
+        name: Qualified function name (registry key)
+        count: Number of recorded calls
+        total_ns: Sum of all durations (nanoseconds)
+        min_ns: Shortest duration (nanoseconds, 0 before the first sample)
+        max_ns: Longest duration (nanoseconds)
+    """
+    def __init__(self, name: str, reservoir_size: int = 1024):
+        """ Create an empty statistics record.
+
+        Args:
+            name: Qualified function name
+            reservoir_size: Maximum number of samples kept for percentiles
+        """
+        self.name: str = name
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.min_ns: int = 0
+        self.max_ns: int = 0
+        self._reservoir_size: int = max(1, reservoir_size)
+        self._samples: list[int] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, elapsed_ns: int):
+        """ Record one call duration (thread-safe).
+
+        Args:
+            elapsed_ns: Duration in nanoseconds (perf_counter_ns delta)
+        """
+        with self._lock:
+            self.count += 1
+            self.total_ns += elapsed_ns
+            if self.count == 1 or elapsed_ns < self.min_ns:
+                self.min_ns = elapsed_ns
+            if elapsed_ns > self.max_ns:
+                self.max_ns = elapsed_ns
+
+            # Reservoir sampling (Algorithm R): uniform sample of all calls
+            if len(self._samples) < self._reservoir_size:
+                self._samples.append(elapsed_ns)
+            else:
+                slot = random.randrange(self.count)
+                if slot < self._reservoir_size:
+                    self._samples[slot] = elapsed_ns
+
+    def reset(self):
+        """ Discard all recorded samples (decorated functions keep recording here)."""
+        with self._lock:
+            self.count = 0
+            self.total_ns = 0
+            self.min_ns = 0
+            self.max_ns = 0
+            self._samples.clear()
+
+    @property
+    def mean_ns(self) -> float:
+        """Mean duration in nanoseconds (0 before the first sample)."""
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """ Estimate a percentile of the call durations.
+
+        Args:
+            q: Percentile in range 0-100 (e.g., 95 for p95)
+
+        Returns:
+            Estimated duration in nanoseconds (0 before the first sample)
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        # Nearest-rank on the sorted reservoir
+        rank = min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))
+        return float(samples[rank])
+
+    def as_dict(self) -> dict[str, float | int | str]:
+        """ Return a snapshot of all statistics (durations in nanoseconds)."""
+        return {
+            "name": self.name,
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "mean_ns": self.mean_ns,
+            "p50_ns": self.percentile(50),
+            "p95_ns": self.percentile(95),
+            "p99_ns": self.percentile(99),
+        }
+
+    def summary(self) -> str:
+        """ Return a one-line human-readable summary."""
+        return (
+            f"{self.name}: count={self.count} total={_format_ns(self.total_ns)} "
+            f"min={_format_ns(self.min_ns)} mean={_format_ns(self.mean_ns)} "
+            f"p50={_format_ns(self.percentile(50))} p95={_format_ns(self.percentile(95))} "
+            f"p99={_format_ns(self.percentile(99))} max={_format_ns(self.max_ns)}"
+        )
+
+
+# Registry: qualified function name → aggregated timing statistics
+_timing_registry: dict[str, TimingStats] = {}
+_timing_registry_lock: threading.Lock = threading.Lock()
+
+
+def _register_timing_stats(name: str) -> TimingStats:
+    """ Get or create the registry entry for a function (called at decoration time)."""
+    with _timing_registry_lock:
+        stats = _timing_registry.get(name)
+        if stats is None:
+            stats = _timing_registry[name] = TimingStats(name)
+        return stats
+
+
+def get_timing_stats(name: str | None = None) -> TimingStats | dict[str, TimingStats] | None:
+    """ Look up aggregated timing statistics.
+
+    Args:
+        name: Qualified function name ("module.qualname"); None returns all entries
+
+    Returns:
+        The matching TimingStats (None if unknown), or a copy of the whole registry
+    """
+    with _timing_registry_lock:
+        if name is None:
+            return dict(_timing_registry)
+        return _timing_registry.get(name)
+
+
+def reset_timing_stats():
+    """ Clear the samples of every registered function (registrations are kept)."""
+    with _timing_registry_lock:
+        for stats in _timing_registry.values():
+            stats.reset()
+
+
+def timing_report(sort_by: str = "total_ns") -> str:
+    """ Build a multi-line report of all functions with recorded calls.
+
+    Args:
+        sort_by: as_dict() key to sort by, descending (default: "total_ns")
+
+    Returns:
+        One summary line per function (empty string if nothing was recorded)
+    """
+    with _timing_registry_lock:
+        entries = [stats for stats in _timing_registry.values() if stats.count]
+    entries.sort(key=lambda stats: stats.as_dict()[sort_by], reverse=True)
+    return "\n".join(stats.summary() for stats in entries)
+
+
+def dump_timing_stats(logger: "Logit | None" = None, sort_by: str = "total_ns"):
+    """ Emit the timing report, one record per function.
+
+    Args:
+        logger: Logit instance receiving INFO records (None = print to console)
+        sort_by: as_dict() key to sort by, descending
+    """
+    report = timing_report(sort_by)
+    if not report:
+        return
+    for line in report.splitlines():
+        if logger is not None:
+            logger.info(line)
+        else:
+            print(line)
+
+
+# ------------------------------------------------------------------------------
+# Coroutine / Generator Timing
+# ------------------------------------------------------------------------------
+class _SpanTimes():
+    """ Timing of one call of a (possibly suspendable) function.
+
+    Attributes:
+        start_ns: perf_counter_ns when the function body started
+        total_ns: Wall time from start to completion (set by stop())
+        running_ns: Time spent executing the body (split mode only)
+        suspended_ns: Time spent suspended at yield/await (split mode only)
+        split: Whether running/suspended time was measured
+        location: (lineno, filename) of the call site (None = not captured)
+    """
+    __slots__ = ("start_ns", "total_ns", "running_ns", "suspended_ns", "split", "location")
+
+    def __init__(self, split: bool = False, location: tuple[int | str, str] | None = None):
+        self.start_ns: int = time.perf_counter_ns()
+        self.total_ns: int = 0
+        self.running_ns: int = 0
+        self.suspended_ns: int = 0
+        self.split: bool = split
+        self.location: tuple[int | str, str] | None = location
+
+    def stop(self):
+        """ Record completion (total wall time)."""
+        self.total_ns = time.perf_counter_ns() - self.start_ns
+
+    def describe(self) -> str:
+        """ Human-readable duration (e.g., "0.500000 seconds (running: ..., suspended: ...)")."""
+        text = f"{self.total_ns / 1e9:.6f} seconds"
+        if self.split:
+            text += (f" (running: {self.running_ns / 1e9:.6f} seconds,"
+                     f" suspended: {self.suspended_ns / 1e9:.6f} seconds)")
+        return text
+
+
+def _drive_timed(iterator: Generator[Any, Any, R], times: _SpanTimes) -> Generator[Any, Any, R]:
+    """ Delegate to a generator/await iterator like "yield from", splitting time
+    spent inside it (running) from time spent at its yield points (suspended).
+
+    Args:
+        iterator: Generator or coroutine __await__ iterator to drive
+        times: Timing record updated in place
+
+    Returns:
+        The iterator's return value (StopIteration.value)
+    """
+    send_value: Any = None
+    pending: BaseException | None = None
+    while True:
+        step_start = time.perf_counter_ns()
+        try:
+            if pending is not None:
+                exc, pending = pending, None
+                value = iterator.throw(exc)
+            else:
+                value = iterator.send(send_value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            times.running_ns += time.perf_counter_ns() - step_start
+
+        suspend_start = time.perf_counter_ns()
+        try:
+            send_value = yield value
+        except GeneratorExit:
+            iterator.close()
+            raise
+        except BaseException as e:
+            # Forward exceptions thrown into us (e.g., task cancellation)
+            pending = e
+        finally:
+            times.suspended_ns += time.perf_counter_ns() - suspend_start
+
+
+class _TimedAwaitable():
+    """ Awaitable wrapper that splits running/suspended time of another awaitable."""
+    __slots__ = ("_awaitable", "_times")
+
+    def __init__(self, awaitable: Awaitable[R], times: _SpanTimes):
+        self._awaitable: Awaitable[R] = awaitable
+        self._times: _SpanTimes = times
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        return (yield from _drive_timed(self._awaitable.__await__(), self._times))
+
+
+def _is_suspendable(func: Callable[..., object]) -> bool:
+    """ Check whether func is a coroutine, generator or async generator function."""
+    return (inspect.iscoroutinefunction(func)
+            or inspect.isasyncgenfunction(func)
+            or inspect.isgeneratorfunction(func))
+
+
+def _wrap_suspendable(
+    func: Callable[P, R],
+    on_start: Callable[[tuple[int | str, str] | None], None] | None,
+    on_finish: Callable[[_SpanTimes], None],
+    split: bool = False,
+    locate: bool = False
+) -> Callable[P, R]:
+    """ Wrap a coroutine, generator or async generator function so that timing
+    covers the real run to completion (not just creating the coroutine/generator).
+
+    Args:
+        func: Suspendable function to wrap (see _is_suspendable)
+        on_start: Called with the call-site location when the body actually starts
+            running (None = nothing)
+        on_finish: Called with the timing record on completion, error or close
+        split: Measure running vs. suspended time separately
+        locate: Capture the call-site location (passed to on_start and stored in
+            the timing record). Coroutines are located where they are called,
+            generators where they are first iterated.
+
+    Returns:
+        Callable[P, R]: Wrapper of the same kind as func
+    """
+    if inspect.iscoroutinefunction(func):
+        async def run_coroutine(
+            location: tuple[int | str, str] | None, args: tuple[Any, ...], kwargs: dict[str, Any]
+        ) -> Any:
+            if on_start is not None:
+                on_start(location)
+            times = _SpanTimes(split, location)
+            try:
+                if split:
+                    return await _TimedAwaitable(func(*args, **kwargs), times)
+                return await func(*args, **kwargs)
+            finally:
+                times.stop()
+                on_finish(times)
+
+        if locate:
+            # Plain function returning the coroutine: the call site is still on the stack
+            @wraps(func)
+            def located_coroutine_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                return run_coroutine(_get_caller_location(2), args, kwargs)
+            return cast(Callable[P, R], inspect.markcoroutinefunction(located_coroutine_wrapper))
+
+        @wraps(func)
+        async def coroutine_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+            return await run_coroutine(None, args, kwargs)
+        return cast(Callable[P, R], coroutine_wrapper)
+
+    if inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def async_generator_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+            location = _get_caller_location(2) if locate else None
+            if on_start is not None:
+                on_start(location)
+            times = _SpanTimes(split, location)
+            agen = cast(Any, func(*args, **kwargs))
+            try:
+                send_value: Any = None
+                pending: BaseException | None = None
+                while True:
+                    if pending is not None:
+                        step, pending = agen.athrow(pending), None
+                    else:
+                        step = agen.asend(send_value)
+                    try:
+                        value = await (_TimedAwaitable(step, times) if split else step)
+                    except StopAsyncIteration:
+                        return
+
+                    suspend_start = time.perf_counter_ns()
+                    try:
+                        send_value = yield value
+                    except GeneratorExit:
+                        raise
+                    except BaseException as e:
+                        pending = e
+                    finally:
+                        if split:
+                            times.suspended_ns += time.perf_counter_ns() - suspend_start
+            finally:
+                await agen.aclose()
+                times.stop()
+                on_finish(times)
+        return cast(Callable[P, R], async_generator_wrapper)
+
+    @wraps(func)
+    def generator_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+        location = _get_caller_location(2) if locate else None
+        if on_start is not None:
+            on_start(location)
+        times = _SpanTimes(split, location)
+        try:
+            generator = cast(Generator[Any, Any, Any], func(*args, **kwargs))
+            if split:
+                return (yield from _drive_timed(generator, times))
+            return (yield from generator)
+        finally:
+            times.stop()
+            on_finish(times)
+    return cast(Callable[P, R], generator_wrapper)
+
+
+# ------------------------------------------------------------------------------
+# Span Tracing (time_calc trace mode)
+# ------------------------------------------------------------------------------
+class CallTreeNode():
+    """ One node of the aggregated call tree (same function under the same call path).
+
+    Attributes:
+        name: Function qualified name
+        count: Number of completed calls
+        inclusive_ns: Total time including child spans (nanoseconds)
+        exclusive_ns: Self time, excluding child spans (nanoseconds)
+        children: Child nodes by name
+    """
+    def __init__(self, name: str):
+        self.name: str = name
+        self.count: int = 0
+        self.inclusive_ns: int = 0
+        self.exclusive_ns: int = 0
+        self.children: dict[str, CallTreeNode] = {}
+
+    def child(self, name: str) -> "CallTreeNode":
+        """ Get or create the child node for name (thread-safe)."""
+        node = self.children.get(name)
+        if node is None:
+            with _trace_lock:
+                node = self.children.setdefault(name, CallTreeNode(name))
+        return node
+
+    def as_dict(self) -> dict[str, object]:
+        """ Return the subtree as nested dictionaries (durations in nanoseconds)."""
+        return {
+            "name": self.name,
+            "count": self.count,
+            "inclusive_ns": self.inclusive_ns,
+            "exclusive_ns": self.exclusive_ns,
+            "children": [node.as_dict() for node in self.children.values()],
+        }
+
+    def render(self, depth: int = 0) -> list[str]:
+        """ Render the subtree as indented text lines (children by inclusive time)."""
+        lines = [
+            f"{'  ' * depth}{self.name} count={self.count} "
+            f"inclusive={_format_ns(self.inclusive_ns)} self={_format_ns(self.exclusive_ns)}"
+        ]
+        for node in sorted(self.children.values(), key=lambda n: n.inclusive_ns, reverse=True):
+            lines.extend(node.render(depth + 1))
+        return lines
+
+
+class _Span():
+    """ One active traced call."""
+    __slots__ = ("node", "parent", "start_ns", "child_ns")
+
+    def __init__(self, node: CallTreeNode, parent: "_Span | None"):
+        self.node: CallTreeNode = node
+        self.parent: _Span | None = parent
+        self.start_ns: int = time.perf_counter_ns()
+        self.child_ns: int = 0
+
+
+# Innermost active span of the current thread / asyncio task
+_current_span: ContextVar[_Span | None] = ContextVar("pyutilities_logit_span", default=None)
+
+# Aggregated call tree (children of the root are top-level spans)
+_trace_root: CallTreeNode = CallTreeNode("<root>")
+_trace_lock: threading.Lock = threading.Lock()
+
+# Raw span events for Chrome trace export: (name, start_ns, duration_ns, thread id)
+_trace_events: list[tuple[str, int, int, int]] = []
+_TRACE_MAX_EVENTS = 100_000
+
+
+def _span_start(name: str, activate: bool = True) -> tuple[_Span, Token[_Span | None] | None]:
+    """ Open a span as a child of the current span.
+
+    Args:
+        name: Function qualified name
+        activate: Make the new span current (children attach to it)
+
+    Returns:
+        (span, contextvar token or None when not activated)
+    """
+    parent = _current_span.get()
+    node = (parent.node if parent else _trace_root).child(name)
+    span = _Span(node, parent)
+    token = _current_span.set(span) if activate else None
+    return span, token
+
+
+def _span_finish(span: _Span, token: Token[_Span | None] | None, duration_ns: int | None = None):
+    """ Close a span: aggregate inclusive/self time and record the raw event.
+
+    Args:
+        span: Span returned by _span_start
+        token: Token returned by _span_start (None = span was not activated)
+        duration_ns: Explicit duration (default: now - span start)
+    """
+    if duration_ns is None:
+        duration_ns = time.perf_counter_ns() - span.start_ns
+    if token is not None:
+        _current_span.reset(token)
+
+    node = span.node
+    with _trace_lock:
+        node.count += 1
+        node.inclusive_ns += duration_ns
+        # Overlapping children (e.g., asyncio.gather) can exceed the parent duration
+        node.exclusive_ns += max(0, duration_ns - span.child_ns)
+        if span.parent is not None:
+            span.parent.child_ns += duration_ns
+        if len(_trace_events) < _TRACE_MAX_EVENTS:
+            _trace_events.append((node.name, span.start_ns, duration_ns, threading.get_ident()))
+
+
+def get_call_tree() -> CallTreeNode:
+    """ Return the root of the aggregated call tree (its children are top-level spans)."""
+    return _trace_root
+
+
+def trace_report() -> str:
+    """ Render the aggregated call tree as indented text (one line per node)."""
+    with _trace_lock:
+        roots = sorted(_trace_root.children.values(), key=lambda n: n.inclusive_ns, reverse=True)
+        return "\n".join(line for node in roots for line in node.render())
+
+
+def chrome_trace() -> dict[str, object]:
+    """ Build a Chrome trace-event document ("X" complete events, microseconds).
+    Load the JSON written by dump_chrome_trace() in chrome://tracing or Perfetto.
+    """
+    pid = os.getpid()
+    with _trace_lock:
+        events = list(_trace_events)
+    return {
+        "traceEvents": [
+            {
+                "name": name, "cat": "time_calc", "ph": "X",
+                "ts": start_ns / 1000, "dur": duration_ns / 1000,
+                "pid": pid, "tid": tid,
+            }
+            for name, start_ns, duration_ns, tid in events
+        ],
+        "displayTimeUnit": "ms",
+    }
+
+
+def dump_chrome_trace(path: str):
+    """ Write the recorded spans as Chrome trace-event JSON.
+
+    Args:
+        path: Output file path
+    """
+    with open(path, 'w', encoding='utf8') as opened_file:
+        json.dump(chrome_trace(), opened_file)
+
+
+def reset_trace():
+    """ Discard the aggregated call tree and recorded span events."""
+    with _trace_lock:
+        _trace_root.children.clear()
+        _trace_events.clear()
+
+
+def _trace_wrapper(func: Callable[P, R]) -> Callable[P, R]:
+    """ Build the time_calc trace-mode wrapper (records spans, no per-call output).
+    Plain functions and coroutines become the parent of spans opened inside them;
+    generators are recorded as leaf spans when they finish.
+
+    Args:
+        func: Function to decorate
+
+    Returns:
+        Callable[P, R]: Wrapped function recording into the call tree
+    """
+    name = func.__qualname__
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def coroutine_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+            span, token = _span_start(name)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _span_finish(span, token)
+        return cast(Callable[P, R], coroutine_wrapper)
+
+    if _is_suspendable(func):
+        # The consumer runs between yields, so the generator must not become
+        # the current span; record it under the span active when it finishes
+        def record_generator(times: _SpanTimes):
+            span, _ = _span_start(name, activate=False)
+            span.start_ns = times.start_ns
+            _span_finish(span, None, times.total_ns)
+        return _wrap_suspendable(func, None, record_generator)
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        span, token = _span_start(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _span_finish(span, token)
+    return wrapper
+
+
+# ------------------------------------------------------------------------------
+# Sampling Profiler
+# ------------------------------------------------------------------------------
+class SamplingProfiler():
+    """ Low-overhead statistical profiler running on a background thread.
+    Periodically snapshots sys._current_frames(), aggregates the collapsed stacks
+    and writes flamegraph-compatible folded output ("outer;inner;leaf count").
+
+    Usage:
+        with SamplingProfiler(interval=0.001, output="hot.folded"):
+            hot_section()
+
+    Attributes:
+        interval: Seconds between samples
+        samples: Number of stacks recorded so far
+        _all_threads: Sample every thread (False = only the thread that called start())
+        _stacks: Collapsed stack (outermost first) → sample count
+        _labels: Code object → frame label cache (avoids re-formatting per sample)
+        _lock: Guards _stacks/samples between the sampler thread and readers
+    """
+    def __init__(
+        self,
+        interval: float = 0.005,
+        all_threads: bool = False,
+        max_depth: int = 128,
+        output: str = ""
+    ):
+        """ Configure the profiler (sampling starts with start() or "with").
+
+        Args:
+            interval: Seconds between samples (default: 5ms = 200Hz)
+            all_threads: Sample every thread instead of only the starting thread
+            max_depth: Maximum frames recorded per stack (innermost kept)
+            output: Folded output file written on stop() (empty = don't write)
+        """
+        self.interval: float = interval
+        self.samples: int = 0
+        self._all_threads: bool = all_threads
+        self._max_depth: int = max_depth
+        self._output: str = output
+        self._stacks: dict[tuple[str, ...], int] = {}
+        self._labels: dict[CodeType, str] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._target_ident: int | None = None
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """ Start sampling (no-op if already running)."""
+        if self._thread is not None:
+            return
+        self._target_ident = None if self._all_threads else threading.get_ident()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop sampling and write the folded output file (if configured)."""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        if self._output:
+            self.write_folded(self._output)
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object):
+        self.stop()
+
+    def _label(self, code: CodeType) -> str:
+        """ Frame label "qualname (file:firstline)", cached per code object."""
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename.replace("\\", "/").rsplit("/", 1)[-1]
+            label = f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        """ Record one collapsed stack per sampled thread."""
+        own_ident = threading.get_ident()
+        frames = sys._current_frames()
+        keys: list[tuple[str, ...]] = []
+        try:
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                if self._target_ident is not None and ident != self._target_ident:
+                    continue
+                stack: list[str] = []
+                current = frame
+                while current is not None and len(stack) < self._max_depth:
+                    stack.append(self._label(current.f_code))
+                    current = current.f_back
+                stack.reverse()
+                keys.append(tuple(stack))
+        finally:
+            # Release frame references (critical for memory management)
+            del frames
+        # Stacks are built outside the lock; only the counter updates are guarded
+        with self._lock:
+            for key in keys:
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+            self.samples += len(keys)
+
+    def _run(self):
+        """ Sampler thread main loop."""
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def folded(self) -> str:
+        """ Return the aggregated stacks in folded format (one "a;b;c count" per line).
+        Safe while sampling (works on a copy taken under the lock).
+        """
+        with self._lock:
+            stacks = list(self._stacks.items())
+        stacks.sort(key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in stacks)
+
+    def write_folded(self, path: str):
+        """ Write the folded stacks to path (input for flamegraph.pl / speedscope).
+
+        Args:
+            path: Output file path
+        """
+        with open(path, 'w', encoding='utf8') as opened_file:
+            _ = opened_file.write(self.folded() + "\n")
+
+    def reset(self):
+        """ Discard all recorded samples."""
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+
+# ------------------------------------------------------------------------------
+# Execution Time Decorator
+# ------------------------------------------------------------------------------
+@overload
+def time_calc(
+    func: Callable[P, R],
+    *,
+    enabled: bool = True,
+    stats: bool = False,
+    logger: "Logit | None" = None,
+    report_interval: float = 60.0,
+    split_suspended: bool = False,
+    trace: bool = False
+) -> Callable[P, R]: ...
+@overload
+def time_calc(
+    func: None = None,
+    *,
+    enabled: bool = True,
+    stats: bool = False,
+    logger: "Logit | None" = None,
+    report_interval: float = 60.0,
+    split_suspended: bool = False,
+    trace: bool = False
+) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
+def time_calc(
+    func: Callable[P, R] | None = None,
+    *,
+    enabled: bool = True,
+    stats: bool = False,
+    logger: "Logit | None" = None,
+    report_interval: float = 60.0,
+    split_suspended: bool = False,
+    trace: bool = False
+) -> Callable[P, R] | Callable[[Callable[P, R]], Callable[P, R]]:
+    """ Decorator to measure and print a function's execution time.
+    Preserves original function metadata (name, docstring, signature) via @wraps.
+    Usable bare (@time_calc) or with options (@time_calc(stats=True)).
+
+    Args:
+        func: Function to decorate (any callable with parameters P and return type R)
+        enabled: False returns func unchanged (no wrapper frame, zero overhead)
+        stats: Aggregate perf_counter_ns samples into the timing registry instead of
+            printing every call (see get_timing_stats/timing_report)
+        logger: Stats mode only - Logit receiving a periodic summary record
+        report_interval: Stats mode only - seconds between summaries sent to logger
+        split_suspended: Coroutines/generators only - also measure time spent
+            running vs. suspended at await/yield
+        trace: Record parent/child spans into the aggregated call tree instead of
+            printing (see trace_report/dump_chrome_trace)
+
+    Returns:
+        Callable[P, R]: Wrapped function with timing logic
+        (or a decorator when called with options only)
+
+    Features:
+        1. Precise timing (6 decimal places for seconds)
+        2. No side effects (returns original function's result)
+        3. Preserves function metadata (critical for debugging/introspection)
+        4. Stats mode: count/total/min/max/mean/p50/p95/p99 with bounded memory
+        5. Coroutine, generator and async generator functions are timed until
+           they complete (not just until the coroutine/generator is created)
+        6. Trace mode: nested calls build a call tree with inclusive/self time
+    """
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        # Disabled at decoration time: hand back the original function
+        if not enabled:
+            return func
+
+        if trace:
+            return _trace_wrapper(func)
+
+        if stats:
+            return _stats_wrapper(func, logger, report_interval, split_suspended)
+
+        if _is_suspendable(func):
+            def print_times(times: _SpanTimes):
+                print(f"{func.__name__} execution time: {times.describe()}")
+            return _wrap_suspendable(func, None, print_times, split_suspended)
+
+        # Preserve original function metadata (prevents loss of __name__, __doc__, etc.)
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            # Record start time (Unix timestamp in seconds)
+            start_time = time.time()
+            try:
+                # Execute the original function (pass all positional/keyword args)
+                # Return original function result (no side effects)
+                return func(*args, **kwargs)
+            finally:
+                # Calculate elapsed time
+                end_time = time.time()
+                exec_time = end_time - start_time
+                # Print execution time (6 decimal places for precision)
+                print(f"{func.__name__} execution time: {exec_time:.6f} seconds")
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def _stats_wrapper(
+    func: Callable[P, R],
+    logger: "Logit | None",
+    report_interval: float,
+    split_suspended: bool = False
+) -> Callable[P, R]:
+    """ Build the time_calc stats-mode wrapper (records samples, no per-call output).
+
+    Args:
+        func: Function to decorate
+        logger: Logit receiving periodic summaries (None = no periodic output)
+        report_interval: Seconds between periodic summaries
+        split_suspended: Coroutines/generators only - also record running and
+            suspended time as "<name>:running" / "<name>:suspended" entries
+
+    Returns:
+        Callable[P, R]: Wrapped function recording into the timing registry
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    stats = _register_timing_stats(name)
+    # Summaries are logged at the decorated function (the wrapper's caller is arbitrary)
+    location = _definition_location(func)
+    interval_ns = int(report_interval * 1_000_000_000)
+    # Deadline for the next periodic summary (shared by all calls of this wrapper)
+    next_report = [time.perf_counter_ns() + interval_ns]
+
+    if _is_suspendable(func):
+        running_stats = _register_timing_stats(f"{name}:running") if split_suspended else None
+        suspended_stats = _register_timing_stats(f"{name}:suspended") if split_suspended else None
+
+        def record_times(times: _SpanTimes):
+            stats.add(times.total_ns)
+            if running_stats is not None and suspended_stats is not None:
+                running_stats.add(times.running_ns)
+                suspended_stats.add(times.suspended_ns)
+            now_ns = time.perf_counter_ns()
+            if logger is not None and now_ns >= next_report[0]:
+                next_report[0] = now_ns + interval_ns
+                logger._log_at(location, LogLevel.INFO, stats.summary)
+        return _wrap_suspendable(func, None, record_times, split_suspended)
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        start_ns = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end_ns = time.perf_counter_ns()
+            stats.add(end_ns - start_ns)
+            if logger is not None and end_ns >= next_report[0]:
+                next_report[0] = end_ns + interval_ns
+                logger._log_at(location, LogLevel.INFO, stats.summary)
+    return wrapper
+
+
+# ------------------------------------------------------------------------------
+# Memory Allocation Profiling (mem_calc / MemoryProfile)
+# ------------------------------------------------------------------------------
+def _format_bytes(size: float) -> str:
+    """ Format a byte count with a readable unit (B/KiB/MiB/GiB)."""
+    sign = "-" if size < 0 else ""
+    size = abs(size)
+    if size < 1024:
+        return f"{sign}{size:.0f}B"
+    if size < 1024 ** 2:
+        return f"{sign}{size / 1024:.1f}KiB"
+    if size < 1024 ** 3:
+        return f"{sign}{size / 1024 ** 2:.1f}MiB"
+    return f"{sign}{size / 1024 ** 3:.2f}GiB"
+
+
+class MemoryStats():
+    """ Aggregated allocation statistics for one function or code block.
+    Peak/net bytes are exact over the profiled calls; allocation sites are summed
+    across calls and bounded (the smallest sites are dropped beyond max_sites).
+
+    Attributes:
+        name: Qualified function name or block name (registry key)
+        calls: Number of calls, including calls skipped by sampling
+        count: Number of profiled calls
+        total_peak: Sum of the per-call peak allocation (bytes above the start level)
+        max_peak: Largest per-call peak (bytes)
+        total_net: Sum of the per-call net allocation (bytes still allocated at the end)
+        min_net: Smallest per-call net allocation (bytes, 0 before the first sample)
+        max_net: Largest per-call net allocation (bytes)
+    """
+    def __init__(self, name: str, max_sites: int = 64):
+        """ Create an empty statistics record.
+
+        Args:
+            name: Qualified function name or block name
+            max_sites: Maximum number of allocation sites kept
+        """
+        self.name: str = name
+        self.calls: int = 0
+        self.count: int = 0
+        self.total_peak: int = 0
+        self.max_peak: int = 0
+        self.total_net: int = 0
+        self.min_net: int = 0
+        self.max_net: int = 0
+        self._max_sites: int = max(1, max_sites)
+        # "file:line" → [net bytes, allocated blocks] summed over profiled calls
+        self._sites: dict[str, list[int]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def sampled(self, sample_every: int) -> bool:
+        """ Count one call and return whether it is profiled (1 call in sample_every)."""
+        with self._lock:
+            self.calls += 1
+            return sample_every <= 1 or (self.calls - 1) % sample_every == 0
+
+    def add(self, peak: int, net: int, sites: list[tuple[str, int, int]]):
+        """ Record one profiled call (thread-safe).
+
+        Args:
+            peak: Peak allocation above the start level (bytes)
+            net: Allocation still held at the end (bytes, may be negative)
+            sites: (site, size, blocks) of the call's top allocation sites
+        """
+        with self._lock:
+            self.count += 1
+            self.total_peak += peak
+            self.total_net += net
+            self.max_peak = max(self.max_peak, peak)
+            if self.count == 1 or net < self.min_net:
+                self.min_net = net
+            if self.count == 1 or net > self.max_net:
+                self.max_net = net
+            for site, size, blocks in sites:
+                totals = self._sites.get(site)
+                if totals is None:
+                    self._sites[site] = [size, blocks]
+                else:
+                    totals[0] += size
+                    totals[1] += blocks
+            if len(self._sites) > self._max_sites:
+                # Keep the largest half (bounded memory for any number of sites)
+                kept = sorted(self._sites.items(), key=lambda item: item[1][0], reverse=True)
+                self._sites = dict(kept[:self._max_sites // 2 or 1])
+
+    def reset(self):
+        """ Discard all recorded samples (decorated functions keep recording here)."""
+        with self._lock:
+            self.calls = 0
+            self.count = 0
+            self.total_peak = 0
+            self.max_peak = 0
+            self.total_net = 0
+            self.min_net = 0
+            self.max_net = 0
+            self._sites.clear()
+
+    @property
+    def mean_peak(self) -> float:
+        """Mean peak allocation in bytes (0 before the first sample)."""
+        return self.total_peak / self.count if self.count else 0.0
+
+    @property
+    def mean_net(self) -> float:
+        """Mean net allocation in bytes (0 before the first sample)."""
+        return self.total_net / self.count if self.count else 0.0
+
+    def top_sites(self, limit: int = 5) -> list[tuple[str, int, int]]:
+        """ Return the sites with the largest summed allocation.
+
+        Args:
+            limit: Maximum number of sites returned
+
+        Returns:
+            (site "file:line", net bytes, allocated blocks), largest first
+        """
+        with self._lock:
+            sites = sorted(self._sites.items(), key=lambda item: item[1][0], reverse=True)
+        return [(site, size, blocks) for site, (size, blocks) in sites[:limit]]
+
+    def as_dict(self) -> dict[str, object]:
+        """ Return a snapshot of all statistics (sizes in bytes)."""
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "count": self.count,
+            "total_peak": self.total_peak,
+            "mean_peak": self.mean_peak,
+            "max_peak": self.max_peak,
+            "total_net": self.total_net,
+            "mean_net": self.mean_net,
+            "min_net": self.min_net,
+            "max_net": self.max_net,
+            "top_sites": self.top_sites(),
+        }
+
+    def summary(self) -> str:
+        """ Return a one-line human-readable summary."""
+        text = (
+            f"{self.name}: calls={self.calls} profiled={self.count} "
+            f"peak mean={_format_bytes(self.mean_peak)} max={_format_bytes(self.max_peak)} "
+            f"net mean={_format_bytes(self.mean_net)} min={_format_bytes(self.min_net)} "
+            f"max={_format_bytes(self.max_net)}"
+        )
+        if sites := self.top_sites(3):
+            text += " top: " + ", ".join(f"{site} {_format_bytes(size)}" for site, size, _ in sites)
+        return text
+
+
+# Registry: qualified function name / block name → aggregated allocation statistics
+_memory_registry: dict[str, MemoryStats] = {}
+_memory_registry_lock: threading.Lock = threading.Lock()
+
+
+def _register_memory_stats(name: str) -> MemoryStats:
+    """ Get or create the registry entry for a function or block."""
+    with _memory_registry_lock:
+        stats = _memory_registry.get(name)
+        if stats is None:
+            stats = _memory_registry[name] = MemoryStats(name)
+        return stats
+
+
+def get_memory_stats(name: str | None = None) -> MemoryStats | dict[str, MemoryStats] | None:
+    """ Look up aggregated allocation statistics.
+
+    Args:
+        name: Qualified function name ("module.qualname") or block name; None returns all entries
+
+    Returns:
+        The matching MemoryStats (None if unknown), or a copy of the whole registry
+    """
+    with _memory_registry_lock:
+        if name is None:
+            return dict(_memory_registry)
+        return _memory_registry.get(name)
+
+
+def reset_memory_stats():
+    """ Clear the samples of every registered function/block (registrations are kept)."""
+    with _memory_registry_lock:
+        for stats in _memory_registry.values():
+            stats.reset()
+
+
+def memory_report(sort_by: str = "total_peak") -> str:
+    """ Build a multi-line report of all functions/blocks with profiled calls.
+
+    Args:
+        sort_by: Numeric as_dict() key to sort by, descending (default: "total_peak")
+
+    Returns:
+        One summary line per function/block (empty string if nothing was recorded)
+    """
+    with _memory_registry_lock:
+        entries = [stats for stats in _memory_registry.values() if stats.count]
+    entries.sort(key=lambda stats: cast(float, stats.as_dict()[sort_by]), reverse=True)
+    return "\n".join(stats.summary() for stats in entries)
+
+
+def dump_memory_stats(logger: "Logit | None" = None, sort_by: str = "total_peak"):
+    """ Emit the allocation report, one record per function/block.
+
+    Args:
+        logger: Logit instance receiving INFO records (None = print to console)
+        sort_by: Numeric as_dict() key to sort by, descending
+    """
+    report = memory_report(sort_by)
+    if not report:
+        return
+    for line in report.splitlines():
+        if logger is not None:
+            logger.info(line)
+        else:
+            print(line)
+
+
+class _MemoryMark():
+    """ Start state of one profiled call.
+
+    Attributes:
+        start: Traced memory when the call started (bytes)
+        peak: Highest traced memory seen before a nested call reset the peak
+        snapshot: Snapshot at the start (None = allocation sites not collected)
+    """
+    __slots__ = ("start", "peak", "snapshot")
+
+    def __init__(self, start: int, snapshot: tracemalloc.Snapshot | None):
+        self.start: int = start
+        self.peak: int = start
+        self.snapshot: tracemalloc.Snapshot | None = snapshot
+
+
+# Profiled calls in progress (all threads; tracemalloc is process-wide)
+_memory_marks: list[_MemoryMark] = []
+# Whether tracemalloc was started here (stopped again when the last profiled call ends)
+_memory_owns_tracing: bool = False
+_memory_lock: threading.Lock = threading.Lock()
+
+# Bookkeeping of the profiler itself (snapshot lists, marks) is not an allocation
+# site of the profiled code
+_MEMORY_IGNORED_FILES = frozenset({tracemalloc.__file__, __file__})
+
+
+def _memory_start(top_sites: int) -> _MemoryMark:
+    """ Begin profiling one call: start tracemalloc if needed and reset its peak.
+    Open marks first take over the current peak, so nested and concurrent profiled
+    calls keep a correct peak despite the shared reset.
+
+    Args:
+        top_sites: Number of allocation sites to report (0 = no snapshots)
+
+    Returns:
+        Mark passed to _memory_stop()
+    """
+    global _memory_owns_tracing
+    with _memory_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory_owns_tracing = True
+        # Allocate the snapshot and mark first: they then exist at start and end (no net effect)
+        mark = _MemoryMark(0, tracemalloc.take_snapshot() if top_sites > 0 else None)
+        current, peak = tracemalloc.get_traced_memory()
+        for open_mark in _memory_marks:
+            open_mark.peak = max(open_mark.peak, peak)
+        tracemalloc.reset_peak()
+        mark.start = mark.peak = current
+        _memory_marks.append(mark)
+    return mark
+
+
+def _memory_stop(mark: _MemoryMark, top_sites: int) -> tuple[int, int, list[tuple[str, int, int]]]:
+    """ Finish profiling one call (stops tracemalloc after the last profiled call
+    if it was started by _memory_start).
+
+    Args:
+        mark: Mark returned by _memory_start()
+        top_sites: Number of allocation sites to report
+
+    Returns:
+        (peak bytes, net bytes, [(site "file:line", net bytes, blocks), ...])
+    """
+    global _memory_owns_tracing
+    with _memory_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _memory_marks.remove(mark)
+        sites: list[tuple[str, int, int]] = []
+        if mark.snapshot is not None:
+            # Filter the grouped statistics, not the traces (Snapshot.filter_traces
+            # matches every trace in Python)
+            for stat in tracemalloc.take_snapshot().compare_to(mark.snapshot, "lineno"):
+                if len(sites) >= top_sites:
+                    break
+                frame = stat.traceback[0]
+                if stat.size_diff > 0 and frame.filename not in _MEMORY_IGNORED_FILES:
+                    sites.append((f"{frame.filename}:{frame.lineno}", stat.size_diff, stat.count_diff))
+        if not _memory_marks and _memory_owns_tracing:
+            tracemalloc.stop()
+            _memory_owns_tracing = False
+    return (max(peak, mark.peak) - mark.start, current - mark.start, sites)
+
+
+class _MemoryReporter():
+    """ Output of profiled calls: one line per call, or registry aggregation with
+    a periodic summary (stats mode).
+
+    Attributes:
+        name: Function/block name in per-call output lines
+        stats: Registry entry (call counter for sampling, aggregation in stats mode)
+    """
+    def __init__(
+        self,
+        name: str,
+        stats_mode: bool,
+        logger: "Logit | None",
+        report_interval: float,
+        key: str | None = None,
+        location: tuple[int | str, str] | None = None
+    ):
+        self.name: str = name
+        # Where periodic summaries are logged (the function/block, not this module)
+        self._location: tuple[int | str, str] | None = location
+        # Qualified key: same-named functions of other modules/classes keep their own counters
+        self.stats: MemoryStats = _register_memory_stats(key or name)
+        self._stats_mode: bool = stats_mode
+        self._logger: Logit | None = logger
+        self._interval_ns: int = int(report_interval * 1_000_000_000)
+        # Deadline for the next periodic summary
+        self._next_report: int = time.perf_counter_ns() + self._interval_ns
+
+    def record(self, peak: int, net: int, sites: list[tuple[str, int, int]]):
+        """ Report one profiled call."""
+        if not self._stats_mode:
+            line = f"{self.name} memory: peak={_format_bytes(peak)} net={_format_bytes(net)}"
+            if sites:
+                line += " top: " + ", ".join(f"{site} {_format_bytes(size)}" for site, size, _ in sites)
+            print(line)
+            return
+        self.stats.add(peak, net, sites)
+        now_ns = time.perf_counter_ns()
+        if self._logger is not None and now_ns >= self._next_report:
+            self._next_report = now_ns + self._interval_ns
+            self._logger._log_at(self._location, LogLevel.INFO, self.stats.summary)
+
+
+class MemoryProfile():
+    """ Context manager profiling the allocations of a code block (tracemalloc).
+    tracemalloc is started on entry if it is not already tracing, and stopped again
+    when the last profiled block/call ends, so unprofiled code runs at full speed.
+    Allocations of other threads during the block are included (tracemalloc is
+    process-wide). Allocation sites need two tracemalloc snapshots per profiled
+    use (milliseconds each, growing with the number of live traced blocks), so
+    they are only collected when top_sites > 0.
+
+    Usage:
+        with MemoryProfile("load config", top_sites=5) as profile:
+            config = load()
+        print(profile.peak_bytes, profile.net_bytes, profile.sites)
+
+    Attributes:
+        name: Block name (registry key in stats mode)
+        sampled: Whether the last use of the block was profiled
+        peak_bytes: Peak allocation above the level at entry (bytes)
+        net_bytes: Allocation still held at exit (bytes, may be negative)
+        sites: (site "file:line", net bytes, blocks) of the top allocation sites
+    """
+    def __init__(
+        self,
+        name: str = "block",
+        *,
+        stats: bool = False,
+        sample_every: int = 100,
+        top_sites: int = 0,
+        logger: "Logit | None" = None,
+        report_interval: float = 60.0
+    ):
+        """ Configure the profiled block.
+
+        Args:
+            name: Block name used in output and as registry key
+            stats: Aggregate into the memory registry instead of printing each profiled use
+                (see get_memory_stats/memory_report)
+            sample_every: Profile one use out of this many, starting with the first
+                (counted per name; 1 = profile every use)
+            top_sites: Number of allocation sites reported (0 = skip the snapshots;
+                each profiled use with sites takes two snapshots, ~ms apiece)
+            logger: Stats mode only - Logit receiving a periodic summary record
+            report_interval: Stats mode only - seconds between summaries sent to logger
+        """
+        self.name: str = name
+        self.sampled: bool = False
+        self.peak_bytes: int = 0
+        self.net_bytes: int = 0
+        self.sites: list[tuple[str, int, int]] = []
+        self._every: int = max(1, sample_every)
+        self._top_sites: int = max(0, top_sites)
+        self._reporter: _MemoryReporter = _MemoryReporter(
+            name, stats, logger, report_interval, location=_get_caller_location(2)
+        )
+        self._mark: _MemoryMark | None = None
+
+    def __enter__(self) -> "MemoryProfile":
+        self.sampled = self._reporter.stats.sampled(self._every)
+        if self.sampled:
+            self._mark = _memory_start(self._top_sites)
+        return self
+
+    def __exit__(self, *exc_info: object):
+        if self._mark is None:
+            return
+        mark, self._mark = self._mark, None
+        self.peak_bytes, self.net_bytes, self.sites = _memory_stop(mark, self._top_sites)
+        self._reporter.record(self.peak_bytes, self.net_bytes, self.sites)
+
+
+@overload
+def mem_calc(
+    func: Callable[P, R],
+    *,
+    enabled: bool = True,
+    stats: bool = False,
+    sample_every: int = 100,
+    top_sites: int = 0,
+    logger: "Logit | None" = None,
+    report_interval: float = 60.0
+) -> Callable[P, R]: ...
+@overload
+def mem_calc(
+    func: None = None,
+    *,
+    enabled: bool = True,
+    stats: bool = False,
+    sample_every: int = 100,
+    top_sites: int = 0,
+    logger: "Logit | None" = None,
+    report_interval: float = 60.0
+) -> Callable[[Callable[P, R]], Callable[P, R]]: ...
+def mem_calc(
+    func: Callable[P, R] | None = None,
+    *,
+    enabled: bool = True,
+    stats: bool = False,
+    sample_every: int = 100,
+    top_sites: int = 0,
+    logger: "Logit | None" = None,
+    report_interval: float = 60.0
+) -> Callable[P, R] | Callable[[Callable[P, R]], Callable[P, R]]:
+    """ Decorator to measure a function's memory allocations (tracemalloc).
+    Reports peak and net allocated bytes per call (and the top allocation sites with top_sites > 0).
+    Usable bare (@mem_calc) or with options (@mem_calc(stats=True, sample_every=1000)).
+    The profiled call runs under tracemalloc (every allocation is traced, typically
+    10x+ slower for allocation-heavy code), so only 1 call in 100 is profiled by default.
+    Allocation sites cost two tracemalloc snapshots per profiled call (milliseconds each),
+    so they are off by default.
+
+    Args:
+        func: Function to decorate (any callable with parameters P and return type R)
+        enabled: False returns func unchanged (no wrapper frame, zero overhead)
+        stats: Aggregate into the memory registry instead of printing each profiled call
+            (see get_memory_stats/memory_report)
+        sample_every: Profile one call out of this many, starting with the first;
+            the other calls run without tracemalloc (1 = profile every call)
+        top_sites: Number of allocation sites reported (0 = skip the snapshots;
+            each profiled call with sites takes two snapshots, ~ms apiece)
+        logger: Stats mode only - Logit receiving a periodic summary record
+        report_interval: Stats mode only - seconds between summaries sent to logger
+
+    Returns:
+        Callable[P, R]: Wrapped function with allocation profiling
+        (or a decorator when called with options only)
+
+    Raises:
+        TypeError: If func is a coroutine/generator function (other tasks'
+            allocations would be attributed to it while it is suspended)
+    """
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        # Disabled at decoration time: hand back the original function
+        if not enabled:
+            return func
+
+        if _is_suspendable(func):
+            raise TypeError(f"mem_calc does not support coroutine/generator functions: {func.__qualname__}")
+
+        key = f"{func.__module__}.{func.__qualname__}"
+        reporter = _MemoryReporter(key if stats else func.__name__, stats, logger, report_interval,
+                                   key, _definition_location(func))
+        every = max(1, sample_every)
+        site_count = max(0, top_sites)
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            # Unsampled calls run without tracemalloc
+            if not reporter.stats.sampled(every):
+                return func(*args, **kwargs)
+            mark = _memory_start(site_count)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                reporter.record(*_memory_stop(mark, site_count))
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+# ------------------------------------------------------------------------------
+# Logging System (Class-Based Decorator)
+# ------------------------------------------------------------------------------
+class LogLevel(IntEnum):
+    """ Enumeration for log severity levels (typed for safety).
+    Higher integer values = more severe log levels.
+
+    Attributes:
+        INFO: General informational messages (default)
+        WARN: Warning messages (non-critical issues)
+        ERROR: Error messages (critical failures)
+    """
+    # Lowest severity: general info (e.g., "Function X called")
+    INFO = 1
+    # Medium severity: warnings (e.g., "Low memory")
+    WARN = 2
+    # Highest severity: errors (e.g., "File not found")
+    ERROR = 3
+
+
+# ------------------------------------------------------------------------------
+# Log Context Fields
+# ------------------------------------------------------------------------------
+class _BoundContext():
+    """ Immutable set of context fields active in the current thread/task.
+    The text suffix is built once per bind; the JSON fragment once per context on
+    first use, so emitting a record only appends cached strings.
+
+    Attributes:
+        fields: Merged fields (outer contexts first, inner ones override)
+        text: Cached " key=value ..." suffix for text output
+        json: Cached ',"key":value...' fragment for JSON Lines output (None = not built)
+    """
+    __slots__ = ("fields", "text", "json")
+
+    def __init__(self, fields: dict[str, object]):
+        self.fields: dict[str, object] = fields
+        self.text: str = "".join(f" {key}={value}" for key, value in fields.items())
+        self.json: str | None = None
+
+
+# Context fields of the current thread/task (None = nothing bound)
+_log_context: ContextVar[_BoundContext | None] = ContextVar("pyutilities_log_context", default=None)
+
+
+class LogContext():
+    """ Context manager binding key/value fields to every record logged inside it
+    (by any Logit instance), e.g. request and trace ids. Stored in contextvars, so
+    bindings follow asyncio tasks and never leak between threads; contexts nest.
+
+    Usage:
+        with LogContext(request_id=rid):
+            logger.info("handled")      # "... [INFO]: handled request_id=..."
+
+    Attributes:
+        _fields: Fields added by this context
+        _token: Reset token of the active binding (None = not entered)
+    """
+    def __init__(self, **fields: object):
+        """ Store the fields (bound on __enter__).
+
+        Args:
+            **fields: Key/value fields added to records logged inside the context
+        """
+        self._fields: dict[str, object] = fields
+        self._token: Token[_BoundContext | None] | None = None
+
+    def __enter__(self) -> "LogContext":
+        parent = _log_context.get()
+        merged = {**parent.fields, **self._fields} if parent is not None else dict(self._fields)
+        self._token = _log_context.set(_BoundContext(merged))
+        return self
+
+    def __exit__(self, *exc_info: object):
+        if self._token is not None:
+            _log_context.reset(self._token)
+            self._token = None
+
+
+def get_log_context() -> dict[str, object]:
+    """ Return a copy of the context fields bound in the current thread/task."""
+    context = _log_context.get()
+    return dict(context.fields) if context is not None else {}
+
+
+# ------------------------------------------------------------------------------
+# JSON Lines Records
+# ------------------------------------------------------------------------------
+# C-accelerated JSON string escaping ("text" → "\"text\"", non-ASCII kept as is)
+_encode_json_str: Callable[[str], str] = json.encoder.encode_basestring
+
+# Keys written by Logit itself (per-call fields with these names get a "field_" prefix)
+_JSON_RESERVED_KEYS = frozenset(("ts", "level", "line", "file", "msg"))
+
+
+def _json_finite(value: object, depth: int = 0) -> object:
+    """ Copy of a field value with non-finite floats replaced by their str()
+    ("nan", "inf"): NaN/Infinity are not valid JSON and break strict readers.
+
+    Args:
+        value: Field value that failed to encode with allow_nan=False
+        depth: Nesting depth (containers nested deeper than 32 levels become str())
+
+    Returns:
+        JSON-encodable replacement (unchanged if nothing needed replacing)
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else str(value)
+    if depth > 32:
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _json_finite(item, depth + 1) for key, item in cast(dict[object, object], value).items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_finite(item, depth + 1) for item in cast(list[object], value)]
+    return value
+
+
+class JsonLineEncoder():
+    """ Precompiled JSON Lines encoder for log records.
+    Builds each line by concatenating pre-encoded fragments (constant key/level
+    prefixes, cached field keys, C-level string escaping) instead of assembling a
+    dict per record and running the generic json.dumps machinery.
+
+    Line layout:
+        {"ts":"...","level":"INFO","line":42,"file":"...","msg":"...",<fields>}
+    """
+    def __init__(self):
+        # Generic encoder for field values that are not str/int/float/bool/None
+        self._fallback: json.JSONEncoder = json.JSONEncoder(
+            ensure_ascii=False, separators=(",", ":"), default=str, allow_nan=False
+        )
+        # Per-level prefix: '{"ts":' is followed by the timestamp, then this
+        self._level_parts: dict[LogLevel, str] = {
+            level: f',"level":"{level.name}"' for level in LogLevel
+        }
+        # Field key → encoded ',"key":' fragment
+        self._key_parts: dict[str, str] = {}
+
+    def _key_part(self, key: str) -> str:
+        """ Encoded ',"key":' fragment for a per-call field (cached)."""
+        part = self._key_parts.get(key)
+        if part is None:
+            name = f"field_{key}" if key in _JSON_RESERVED_KEYS else key
+            part = self._key_parts[key] = f",{_encode_json_str(name)}:"
+        return part
+
+    def _value(self, value: object) -> str:
+        """ Encode one field value (fast paths for common scalar types)."""
+        if isinstance(value, str):
+            return _encode_json_str(value)
+        if value is None:
+            return "null"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if type(value) is int:
+            return str(value)
+        try:
+            return self._fallback.encode(value)
+        except ValueError:
+            # NaN/Infinity somewhere in the value: written as strings instead
+            return self._fallback.encode(_json_finite(value))
+
+    def encode(
+        self,
+        timestr: str,
+        level: LogLevel,
+        location: tuple[int | str, str] | None,
+        text: str,
+        fields: dict[str, object] | None = None,
+        context: _BoundContext | None = None
+    ) -> str:
+        """ Encode one record as a single JSON line (no trailing newline).
+
+        Args:
+            timestr: Formatted timestamp
+            level: Severity level
+            location: (lineno, filename) of the caller (None = omitted)
+            text: Final message text
+            fields: Per-call key/value fields (flattened into the object)
+            context: Bound context fields (written before the per-call fields; a key
+                set in both is written once, with the per-call value)
+
+        Returns:
+            JSON object text
+        """
+        if context is not None and fields and not fields.keys().isdisjoint(context.fields):
+            # Overridden context key: merge once instead of using the cached fragment
+            fields, context = {**context.fields, **fields}, None
+        parts = ['{"ts":', _encode_json_str(timestr), self._level_parts[level]]
+        if location is not None:
+            lineno, filename = location
+            parts.append(',"line":')
+            parts.append(self._value(lineno))
+            parts.append(',"file":')
+            parts.append(self._value(filename))
+        parts.append(',"msg":')
+        parts.append(_encode_json_str(text))
+        if context is not None:
+            if context.json is None:
+                context.json = "".join(
+                    self._key_part(key) + self._value(value) for key, value in context.fields.items()
+                )
+            parts.append(context.json)
+        if fields:
+            for key, value in fields.items():
+                parts.append(self._key_part(key))
+                parts.append(self._value(value))
+        parts.append("}")
+        return "".join(parts)
+
+
+def read_json_lines(
+    path: str,
+    min_level: LogLevel | None = None
+) -> Generator[dict[str, Any], None, None]:
+    """ Stream records back from a JSON Lines log file (plain, .gz or .xz).
+    Reads one line at a time (constant memory); blank or corrupt lines are skipped.
+
+    Args:
+        path: Log file path (rotated ".gz"/".xz" files are decompressed on the fly)
+        min_level: Only yield records with at least this level (None = all)
+
+    Yields:
+        dict[str, Any]: One decoded record per log line
+    """
+    opener = gzip.open if path.endswith(".gz") else lzma.open if path.endswith(".xz") else open
+    decoder = json.JSONDecoder()
+    # Level names accepted by min_level (string compare avoids an enum lookup per line)
+    wanted = {level.name for level in LogLevel if min_level is None or level >= min_level}
+    with opener(path, 'rt', encoding='utf8') as opened_file:
+        for line in opened_file:
+            if not line.strip():
+                continue
+            try:
+                record = decoder.decode(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("level") in wanted:
+                yield cast(dict[str, Any], record)
+
+
+# ------------------------------------------------------------------------------
+# Cached Timestamps
+# ------------------------------------------------------------------------------
+# "000" ... "999": fraction digits by table lookup (no per-record format spec parsing)
+_THREE_DIGITS: tuple[str, ...] = tuple(f"{i:03d}" for i in range(1000))
+
+
+class TimestampCache():
+    """ Log timestamp formatter that calls strftime at most once per second.
+    The "YYYY-MM-DD HH:MM:SS" part (with the "." of the fraction) is cached for the
+    current second; sub-second digits are appended from the integer nanosecond clock
+    by table lookup, so a cache hit costs one divmod and two or three concatenations.
+
+    Output examples:
+        local, "s":  2026-01-23 12:34:56
+        local, "ms": 2026-01-23 12:34:56.789
+        UTC,   "us": 2026-01-23T12:34:56.789012Z  (ISO-8601)
+
+    Attributes:
+        _precision: Fractional-second precision ("s", "ms" or "us")
+        _utc: Whether timestamps are UTC ISO-8601 instead of local time
+        _pattern: strftime pattern of the date/time part
+        _suffix: Text appended after the fraction ("Z" in UTC mode)
+        _cached: (second since the epoch, date/time text + "." or suffix) of the last formatted
+            second ((-1, "") = empty); replaced as a whole so threads never see a
+            second paired with another second's text
+    """
+    def __init__(self, precision: TimestampPrecision = "s", utc: bool = False):
+        """ Initialize the cache.
+
+        Args:
+            precision: Fractional-second precision ("s", "ms" or "us")
+            utc: Emit UTC ISO-8601 ("T" separator, "Z" suffix) instead of local time
+
+        Raises:
+            ValueError: If precision is not one of "s", "ms", "us"
+        """
+        if precision not in ("s", "ms", "us"):
+            raise ValueError(f"Unknown timestamp precision: {precision!r}")
+        self._precision: TimestampPrecision = precision
+        self._utc: bool = utc
+        self._pattern: str = '%Y-%m-%dT%H:%M:%S' if utc else '%Y-%m-%d %H:%M:%S'
+        self._suffix: str = "Z" if utc else ""
+        self._cached: tuple[int, str] = (-1, "")
+
+    def format(self, created: float | None = None) -> str:
+        """ Format a record creation time.
+
+        Args:
+            created: time.time() value (None = now, read from time.time_ns())
+
+        Returns:
+            Formatted timestamp
+        """
+        if created is None:
+            second, nanos = divmod(time.time_ns(), 1_000_000_000)
+        else:
+            second = math.floor(created)
+            # Rounded: float fractions such as .789 are stored as .78899999...
+            nanos = min(round((created - second) * 1_000_000_000), 999_999_999)
+
+        # Reformat the date/time part only when the second changes
+        # (one read and one store of the pair: safe against concurrent refreshes)
+        cached_second, prefix = self._cached
+        if second != cached_second:
+            prefix = time.strftime(
+                self._pattern, time.gmtime(second) if self._utc else time.localtime(second)
+            )
+            prefix += "." if self._precision != "s" else self._suffix
+            self._cached = (second, prefix)
+
+        if self._precision == "ms":
+            return prefix + _THREE_DIGITS[nanos // 1_000_000] + self._suffix
+        if self._precision == "us":
+            millis, micros = divmod(nanos // 1_000, 1_000)
+            return prefix + _THREE_DIGITS[millis] + _THREE_DIGITS[micros] + self._suffix
+        return prefix
+
+
+# ------------------------------------------------------------------------------
+# Log Storm Suppression
+# ------------------------------------------------------------------------------
+class RateLimiter():
+    """ Token-bucket rate limiter keyed by arbitrary hashable keys.
+    Each key owns a bucket holding up to burst tokens, refilled at rate tokens per
+    second; a record consumes one token or is suppressed (and counted). Lookups
+    are a single dict access, so a suppressed record costs less than formatting it.
+
+    Attributes:
+        _rate: Tokens added per second to every bucket
+        _burst: Bucket capacity (records allowed back-to-back)
+        _max_keys: Maximum tracked keys (oldest key is evicted beyond this)
+        _buckets: Key → [tokens, last refill time, suppressed count]
+        _lock: Guards _buckets across logging threads
+        suppressed: Total records suppressed since creation
+    """
+    def __init__(self, rate: float, burst: int = 10, max_keys: int = 10000):
+        """ Initialize the rate limiter.
+
+        Args:
+            rate: Sustained records per second allowed per key
+            burst: Records allowed back-to-back before limiting starts
+            max_keys: Maximum tracked keys (pending counts of evicted keys are lost)
+
+        Raises:
+            ValueError: If rate is not positive or burst/max_keys is below 1
+        """
+        if rate <= 0 or burst < 1 or max_keys < 1:
+            raise ValueError(f"Invalid rate limit: rate={rate}, burst={burst}, max_keys={max_keys}")
+        self._rate: float = rate
+        self._burst: float = float(burst)
+        self._max_keys: int = max_keys
+        self._buckets: dict[Hashable, list[float]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self.suppressed: int = 0
+
+    def allow(self, key: Hashable) -> int:
+        """ Consume one token of key's bucket.
+
+        Args:
+            key: Bucket key (e.g. call site + message template)
+
+        Returns:
+            -1 if the record is suppressed, otherwise the number of records of this
+            key suppressed since its last allowed record
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self._max_keys:
+                    # Dicts keep insertion order: evict the oldest key in O(1)
+                    del self._buckets[next(iter(self._buckets))]
+                self._buckets[key] = [self._burst - 1.0, now, 0.0]
+                return 0
+            tokens = bucket[0] + (now - bucket[1]) * self._rate
+            if tokens > self._burst:
+                tokens = self._burst
+            bucket[1] = now
+            if tokens < 1.0:
+                bucket[0] = tokens
+                bucket[2] += 1.0
+                self.suppressed += 1
+                return -1
+            bucket[0] = tokens - 1.0
+            repeated = int(bucket[2])
+            bucket[2] = 0.0
+            return repeated
+
+    def drain(self) -> list[tuple[Hashable, int]]:
+        """ Collect (and reset) the pending suppressed counts of all keys.
+
+        Returns:
+            list[tuple[Hashable, int]]: (key, suppressed count) for keys with suppressions
+        """
+        pending: list[tuple[Hashable, int]] = []
+        with self._lock:
+            for key, bucket in self._buckets.items():
+                if bucket[2]:
+                    pending.append((key, int(bucket[2])))
+                    bucket[2] = 0.0
+        return pending
+
+    def reset(self):
+        """ Forget all buckets and the suppressed total."""
+        with self._lock:
+            self._buckets.clear()
+            self.suppressed = 0
+
+
+def _message_key(msg: LogMessage) -> Hashable:
+    """ Rate-limit key part of a message: the template string, or the code object of a
+    callable (a new lambda per call still maps to one key per call site)."""
+    if isinstance(msg, str):
+        return msg
+    return getattr(msg, "__code__", msg)
+
+
+def _message_label(key: Hashable) -> str:
+    """ Human-readable label of a _message_key() value for summary records."""
+    if isinstance(key, CodeType):
+        return f"<{key.co_name}>"
+    return str(key)
+
+
+# ------------------------------------------------------------------------------
+# Rotating Log File
+# ------------------------------------------------------------------------------
+class RotatingFile():
+    """ Append-mode log file kept open between writes, with optional rotation.
+    Rotates when the file reaches max_bytes and/or every rotate_interval seconds,
+    keeps at most backup_count rotated files and compresses them on a background
+    thread (the writing thread only renames the file).
+
+    Rotated files are named "<path>.<YYYYmmdd-HHMMSS>[-N]" plus ".gz"/".xz".
+
+    Attributes:
+        path: Path of the active log file
+        _max_bytes: Size limit of the active file (0 = no size rotation)
+        _rotate_interval: Seconds between time-based rotations (0 = no time rotation)
+        _backup_count: Rotated files to keep (0 = keep all)
+        _compress: Compression of rotated files (None = plain text)
+        _lock: Serializes writes and rotation
+        _pending: Rotated files queued for compression (not yet counted by retention)
+        _last_rotated: (timestamp, counter) of the last rotated name (names never repeat,
+            so a name freed by retention cannot come back as the "oldest" file)
+    """
+    # Suffix of files still being compressed (ignored by retention)
+    _TMP_SUFFIX = ".tmp"
+    # Extension added per compression type
+    _EXTENSIONS = {"gzip": ".gz", "lzma": ".xz"}
+    # Suffix of rotated files after "<basename>." (other files such as the
+    # "<path>.idx" search index are never counted or deleted by retention)
+    _ROTATED_SUFFIX = re.compile(r"(\d{8}-\d{6})(?:-(\d+))?(?:\.gz|\.xz)?")
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 0,
+        rotate_interval: float = 0.0,
+        backup_count: int = 0,
+        compress: CompressionType = None
+    ):
+        """ Open the log file (append mode) and configure rotation.
+
+        Args:
+            path: Path to the log file
+            max_bytes: Rotate before a write would exceed this size (0 = disabled)
+            rotate_interval: Rotate every N seconds (0 = disabled)
+            backup_count: Maximum rotated files kept (0 = unlimited)
+            compress: "gzip", "lzma" or None
+
+        Raises:
+            ValueError: If compress is not a known compression type
+        """
+        if compress is not None and compress not in self._EXTENSIONS:
+            raise ValueError(f"Unknown compression type: {compress}")
+
+        self.path: str = path
+        self._max_bytes: int = max(0, max_bytes)
+        self._rotate_interval: float = max(0.0, rotate_interval)
+        self._backup_count: int = max(0, backup_count)
+        self._compress: CompressionType = compress
+        self._lock: threading.RLock = threading.RLock()
+        self._compress_queue: queue.Queue[str | None] | None = None
+        self._compress_thread: threading.Thread | None = None
+        self._pending: set[str] = set()
+        self._last_rotated: tuple[str, int] = ("", 0)
+
+        self._file = open(path, 'a', encoding='utf8')
+        self._size: int = self._file.tell()
+        self._next_rollover: float = self._compute_next_rollover()
+
+    def _compute_next_rollover(self) -> float:
+        """ Timestamp of the next time-based rotation (inf when disabled)."""
+        if not self._rotate_interval:
+            return float("inf")
+        return time.time() + self._rotate_interval
+
+    def write(self, text: str):
+        """ Append text (rotating first if a limit is reached) and flush it.
+
+        Args:
+            text: Text to append (normally one or more newline-terminated lines)
+        """
+        with self._lock:
+            # utf-8 size estimate without encoding twice (exact for ASCII)
+            length = len(text)
+            if (self._max_bytes and self._size and self._size + length > self._max_bytes) \
+                    or time.time() >= self._next_rollover:
+                self.rotate()
+            _ = self._file.write(text)
+            self._file.flush()
+            self._size += length
+
+    def rotate(self):
+        """ Close the active file, rename it aside and reopen an empty one.
+        Compression and retention run on the background compressor thread.
+        """
+        with self._lock:
+            self._file.close()
+            rotated = self._rotated_name()
+            if os.path.exists(self.path):
+                os.replace(self.path, rotated)
+            self._file = open(self.path, 'a', encoding='utf8')
+            self._size = 0
+            self._next_rollover = self._compute_next_rollover()
+
+        if self._compress:
+            self._submit_compression(rotated)
+        else:
+            self._apply_retention()
+
+    def _rotated_name(self) -> str:
+        """ Unused "<path>.<timestamp>[-N]" name for the file being rotated
+        (N increases within one second, even after retention deleted earlier files).
+        """
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime())
+        base = f"{self.path}.{stamp}"
+        extension = self._EXTENSIONS[self._compress] if self._compress else ""
+        last_stamp, last_counter = self._last_rotated
+        counter = last_counter + 1 if stamp == last_stamp else 0
+        candidate = f"{base}-{counter}" if counter else base
+        while os.path.exists(candidate) or os.path.exists(candidate + extension):
+            counter += 1
+            candidate = f"{base}-{counter}"
+        self._last_rotated = (stamp, counter)
+        return candidate
+
+    def rotated_files(self) -> list[str]:
+        """ Return rotated (finished) files of this log, oldest first.
+        Ordered by the rotation time and counter in the name (the mtime of a
+        compressed file is when it was compressed); files still queued for
+        compression are not listed.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        prefix = os.path.basename(self.path) + "."
+        with self._lock:
+            pending = set(self._pending)
+        ordered: list[tuple[str, int, str]] = []
+        for name in os.listdir(directory):
+            if not name.startswith(prefix):
+                continue
+            match = self._ROTATED_SUFFIX.fullmatch(name, len(prefix))
+            path = os.path.join(directory, name)
+            if match is None or path in pending:
+                continue
+            # Numeric counter: "-10" is newer than "-2"
+            ordered.append((match.group(1), int(match.group(2) or 0), path))
+        ordered.sort()
+        return [path for _, _, path in ordered]
+
+    def _apply_retention(self):
+        """ Delete the oldest rotated files beyond backup_count."""
+        if not self._backup_count:
+            return
+        files = self.rotated_files()
+        for old_file in files[:max(0, len(files) - self._backup_count)]:
+            try:
+                os.remove(old_file)
+            except OSError:
+                pass
+
+    def _submit_compression(self, rotated: str):
+        """ Queue a rotated file for compression (starts the compressor thread lazily)."""
+        if self._compress_thread is None:
+            self._compress_queue = queue.Queue()
+            self._compress_thread = threading.Thread(
+                target=self._compress_worker, name="RotatingFileCompressor", daemon=True
+            )
+            self._compress_thread.start()
+        assert self._compress_queue is not None
+        with self._lock:
+            self._pending.add(os.path.abspath(rotated))
+        self._compress_queue.put(rotated)
+
+    def _compress_worker(self):
+        """ Compressor thread: compress rotated files, then apply retention."""
+        assert self._compress_queue is not None
+        while True:
+            rotated = self._compress_queue.get()
+            try:
+                if rotated is None:
+                    return
+                try:
+                    self._compress_file(rotated)
+                finally:
+                    with self._lock:
+                        self._pending.discard(os.path.abspath(rotated))
+                self._apply_retention()
+            except OSError as e:
+                print(f"[Log Rotation Error]: {type(e).__name__}: {str(e)}")
+            finally:
+                self._compress_queue.task_done()
+
+    def _compress_file(self, rotated: str):
+        """ Compress one rotated file to "<rotated>.gz/.xz" and remove the original."""
+        assert self._compress is not None
+        target = rotated + self._EXTENSIONS[self._compress]
+        opener = gzip.open if self._compress == "gzip" else lzma.open
+        with open(rotated, 'rb') as source, opener(target + self._TMP_SUFFIX, 'wb') as dest:
+            shutil.copyfileobj(source, dest)
+        os.replace(target + self._TMP_SUFFIX, target)
+        os.remove(rotated)
+
+    def wait_compression(self):
+        """ Block until every queued rotated file has been compressed."""
+        if self._compress_queue is not None:
+            self._compress_queue.join()
+
+    def flush(self):
+        """ Flush the active file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        """ Close the active file and finish pending compression. Idempotent."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        if self._compress_thread is not None and self._compress_queue is not None:
+            self._compress_queue.put(None)
+            self._compress_thread.join()
+            self._compress_thread = None
+
+
+# ------------------------------------------------------------------------------
+# Multi-Process Log Collector
+# ------------------------------------------------------------------------------
+def _collector_main(
+    record_queue: "multiprocessing.Queue[str | None]",
+    path: str,
+    batch_size: int,
+    rotation: dict[str, Any]
+):
+    """ Writer process main loop: drain chunks from all workers and write them in batches.
+
+    Args:
+        record_queue: Queue shared with the worker processes; each item is a chunk
+            of whole newline-terminated lines (None = stop)
+        path: Log file path
+        batch_size: Maximum chunks written per batch
+        rotation: RotatingFile keyword arguments (max_bytes, rotate_interval, ...)
+    """
+    log_file = RotatingFile(path, **rotation)
+    try:
+        stop = False
+        while not stop:
+            item = record_queue.get()
+            batch: list[str] = []
+            if item is None:
+                stop = True
+            else:
+                batch.append(item)
+            while not stop and len(batch) < batch_size:
+                try:
+                    item = record_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+            if batch:
+                log_file.write("".join(batch))
+    finally:
+        log_file.close()
+
+
+class _QueueTarget():
+    """ AsyncFileWriter target sending each written chunk to a LogCollector queue.
+    Lets worker processes batch records locally (one queue message per batch).
+    """
+    def __init__(self, record_queue: "multiprocessing.Queue[str | None]"):
+        self._queue: multiprocessing.Queue[str | None] = record_queue
+
+    def write(self, text: str):
+        self._queue.put(text)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        # The queue belongs to the LogCollector
+        pass
+
+
+class LogCollector():
+    """ Single writer process collecting log records from many worker processes.
+    Workers never open the log file; batches of whole lines travel over a
+    multiprocessing queue, so output is never interleaved and there is no file
+    lock contention.
+
+    Usage:
+        collector = LogCollector("app.log")
+        collector.start()
+        # in each worker (e.g., Pool initializer receiving collector.queue):
+        logger = Logit(collector=collector.queue)
+        ...
+        # worker exit flushes automatically (or call logger.close() explicitly)
+        collector.stop()
+
+    Attributes:
+        queue: Queue to hand to worker processes (pass to Logit(collector=...))
+        _process: Writer process (None until start())
+    """
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 512,
+        max_bytes: int = 0,
+        rotate_interval: float = 0.0,
+        backup_count: int = 0,
+        compress: CompressionType = None,
+        start_method: str | None = None
+    ):
+        """ Create the shared queue (the writer process starts with start()).
+
+        Args:
+            path: Log file path written by the collector process
+            batch_size: Maximum records written per batch
+            max_bytes, rotate_interval, backup_count, compress: Rotation settings
+                (see RotatingFile; all disabled by default)
+            start_method: multiprocessing start method (None = platform default)
+        """
+        self._context = multiprocessing.get_context(start_method)
+        self.queue: multiprocessing.Queue[str | None] = self._context.Queue()
+        self._path: str = path
+        self._batch_size: int = max(1, batch_size)
+        self._rotation: dict[str, Any] = {
+            "max_bytes": max_bytes, "rotate_interval": rotate_interval,
+            "backup_count": backup_count, "compress": compress,
+        }
+        self._process: multiprocessing.process.BaseProcess | None = None
+
+    def start(self):
+        """ Start the writer process (no-op if already running)."""
+        if self._process is not None:
+            return
+        self._process = self._context.Process(
+            target=_collector_main,
+            args=(self.queue, self._path, self._batch_size, self._rotation),
+            name="LogCollector", daemon=True
+        )
+        self._process.start()
+
+    def stop(self, timeout: float | None = None):
+        """ Write every record sent so far, then stop the writer process.
+
+        Args:
+            timeout: Seconds to wait for the writer process (None = wait forever)
+        """
+        if self._process is None:
+            return
+        self.queue.put(None)
+        self._process.join(timeout)
+        self._process = None
+
+    def __enter__(self) -> "LogCollector":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object):
+        self.stop()
+
+
+# ------------------------------------------------------------------------------
+# Asynchronous File Writer
+# ------------------------------------------------------------------------------
+def _enqueue(target: "queue.Queue[object]", item: object, policy: OverflowPolicy) -> int:
+    """ Put item on a (possibly bounded) queue, applying the overflow policy when full.
+
+    Args:
+        target: Destination queue
+        item: Item to enqueue
+        policy: "block" waits for space, "drop_newest" discards item,
+            "drop_oldest" evicts queued items until item fits
+
+    Returns:
+        Number of items discarded
+    """
+    if policy == "block":
+        target.put(item)
+        return 0
+
+    try:
+        target.put_nowait(item)
+        return 0
+    except queue.Full:
+        if policy == "drop_newest":
+            return 1
+    # drop_oldest: evict queued records until the new one fits
+    dropped = 0
+    while True:
+        try:
+            _ = target.get_nowait()
+            target.task_done()
+            dropped += 1
+        except queue.Empty:
+            pass
+        try:
+            target.put_nowait(item)
+            return dropped
+        except queue.Full:
+            continue
+
+
+class AsyncFileWriter():
+    """ Background writer thread that keeps a log file open and batches writes.
+    Callers only enqueue formatted lines; opening, writing and flushing the file
+    happen on a dedicated daemon thread.
+
+    Attributes:
+        _file: Output target (RotatingFile, or a LogCollector queue target)
+        _policy: Overflow policy when the queue is full (see OverflowPolicy)
+        _batch_size: Maximum number of lines written per batch
+        _queue: Bounded FIFO of pending lines
+        _lock: Held by the writer thread while a batch is written to disk
+        dropped: Number of records discarded by the overflow policy
+    """
+    # Sentinel telling the writer thread to exit
+    _STOP = object()
+
+    def __init__(
+        self,
+        path: "str | _QueueTarget",
+        queue_size: int = 10000,
+        policy: OverflowPolicy = "block",
+        batch_size: int = 256,
+        max_bytes: int = 0,
+        rotate_interval: float = 0.0,
+        backup_count: int = 0,
+        compress: CompressionType = None
+    ):
+        """ Open the log file and start the writer thread.
+
+        Args:
+            path: Path to the log file (appended to, created if missing),
+                or a ready output target
+            queue_size: Maximum number of pending records (0 = unbounded)
+            policy: Overflow policy when the queue is full (default: "block")
+            batch_size: Maximum number of lines written per batch
+            max_bytes, rotate_interval, backup_count, compress: Rotation settings
+                (see RotatingFile; all disabled by default)
+
+        Raises:
+            ValueError: If policy is not a known overflow policy
+        """
+        if policy not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        self._policy: OverflowPolicy = policy
+        self._batch_size: int = max(1, batch_size)
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max(0, queue_size))
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+        self.dropped: int = 0
+
+        # Keep the file open for the writer's whole lifetime (no per-record open/close)
+        self._file: RotatingFile | _QueueTarget = path if isinstance(path, _QueueTarget) \
+            else RotatingFile(path, max_bytes, rotate_interval, backup_count, compress)
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="AsyncFileWriter", daemon=True
+        )
+        self._thread.start()
+        # Make sure queued records reach the disk at interpreter exit
+        self._finalizer = _exit_finalizer(self, "close")
+
+    def put(self, line: str):
+        """ Enqueue one formatted log line (without trailing newline).
+        Applies the overflow policy when the queue is full.
+
+        Args:
+            line: Formatted log line
+        """
+        if self._closed:
+            return
+        self.dropped += _enqueue(self._queue, line, self._policy)
+
+    def flush(self):
+        """ Block until every record enqueued so far has been written and flushed."""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """ Drain pending records, stop the writer thread and close the file.
+        Idempotent (safe to call multiple times).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.cancel()
+
+        # Blocking put: the stop sentinel must never be dropped
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._file.close()
+
+    def _run(self):
+        """ Writer thread main loop: collect a batch, write it, flush the file."""
+        while True:
+            item = self._queue.get()
+            batch: list[str] = []
+            stop = item is self._STOP
+            if not stop:
+                batch.append(cast(str, item))
+
+            # Drain whatever else is already queued (up to batch_size)
+            while not stop and len(batch) < self._batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                else:
+                    batch.append(cast(str, item))
+
+            if batch:
+                with self._lock:
+                    try:
+                        self._file.write("\n".join(batch) + "\n")
+                    except (OSError, ValueError) as e:
+                        print(f"[Log Writer Error]: {type(e).__name__}: {str(e)}")
+
+            # Mark the whole batch (plus the sentinel, if seen) as processed
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+
+            if stop:
+                return
+
+
+# ------------------------------------------------------------------------------
+# Output Sinks
+# ------------------------------------------------------------------------------
+class LogRecord():
+    """ One emitted log record, formatted once and shared by every sink.
+
+    Attributes:
+        created: Creation time (time.time())
+        level: Severity level
+        location: (lineno, filename) of the caller (None = location disabled)
+        text: Final message text
+        fields: Per-call key/value fields (None = no fields)
+        line: Formatted log line (text or JSON Lines, without trailing newline)
+    """
+    __slots__ = ("created", "level", "location", "text", "fields", "line")
+
+    def __init__(
+        self,
+        created: float,
+        level: LogLevel,
+        location: tuple[int | str, str] | None,
+        text: str,
+        fields: dict[str, object] | None,
+        line: str
+    ):
+        self.created: float = created
+        self.level: LogLevel = level
+        self.location: tuple[int | str, str] | None = location
+        self.text: str = text
+        self.fields: dict[str, object] | None = fields
+        self.line: str = line
+
+
+class LogSink():
+    """ Base class of Logit output sinks.
+    Subclasses implement write() for a batch of records (and optionally _flush()/
+    _close()). The base class applies the sink's own level threshold and, with
+    async_queue, runs write() on a dedicated thread so a slow sink never delays
+    the caller or the other sinks.
+
+    Attributes:
+        level: Minimum severity written by this sink
+        _policy: Overflow policy of the asynchronous queue
+        _batch_size: Maximum records passed to one write() call
+        _queue: Bounded FIFO of pending records (None = synchronous sink)
+        _lock: Serializes write()/_flush() calls
+        _poll_interval: Seconds after which an idle sink thread calls _flush_due()
+            (None = wait for records indefinitely)
+        dropped: Records discarded by the overflow policy
+        errors: write() calls that raised (the batch is lost, the sink keeps running)
+    """
+    # Sentinel telling the sink thread to exit
+    _STOP = object()
+
+    def __init__(
+        self,
+        level: LogLevel = LogLevel.INFO,
+        async_queue: bool = False,
+        queue_size: int = 10000,
+        policy: OverflowPolicy = "block",
+        batch_size: int = 256
+    ):
+        """ Initialize the sink (and start its thread in asynchronous mode).
+
+        Args:
+            level: Minimum severity written by this sink (default: LogLevel.INFO)
+            async_queue: Write from a dedicated background thread (default: False)
+            queue_size: Maximum pending records in asynchronous mode (0 = unbounded)
+            policy: Overflow policy when the queue is full (default: "block")
+            batch_size: Maximum records passed to one write() call
+
+        Raises:
+            ValueError: If policy is not a known overflow policy
+        """
+        if policy not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.level: LogLevel = level
+        self._policy: OverflowPolicy = policy
+        self._batch_size: int = max(1, batch_size)
+        self._lock: threading.Lock = threading.Lock()
+        self._closed: bool = False
+        self.dropped: int = 0
+        self.errors: int = 0
+        # Subclasses may set _poll_interval before calling this constructor
+        self._poll_interval: float | None = getattr(self, "_poll_interval", None)
+        self._queue: queue.Queue[object] | None = None
+        self._thread: threading.Thread | None = None
+        if async_queue:
+            self._queue = queue.Queue(maxsize=max(0, queue_size))
+            self._thread = threading.Thread(
+                target=self._run, name=type(self).__name__, daemon=True
+            )
+            self._thread.start()
+        # Queued or buffered records (e.g. SQLiteSink batches) reach their destination
+        # at interpreter exit, in synchronous mode too
+        self._finalizer = _exit_finalizer(self, "close")
+
+    def emit(self, record: LogRecord):
+        """ Accept one record (ignored below the sink's level or after close()).
+
+        Args:
+            record: Record to write
+        """
+        if record.level < self.level or self._closed:
+            return
+        if self._queue is None:
+            self._write_batch([record])
+        else:
+            self.dropped += _enqueue(self._queue, record, self._policy)
+
+    def write(self, records: list[LogRecord]):
+        """ Write a batch of records (implemented by subclasses).
+
+        Args:
+            records: Records in emission order
+        """
+        raise NotImplementedError
+
+    def _flush(self):
+        """ Push buffered output to its destination (subclass hook, no-op by default)."""
+
+    def _flush_due(self):
+        """ Called by the sink thread after each batch and when idle for _poll_interval;
+        subclasses that buffer by count/time push only what is due (default: _flush())."""
+        self._flush()
+
+    def _close(self):
+        """ Release the sink's resources (subclass hook, no-op by default)."""
+
+    def flush(self):
+        """ Block until every record emitted so far has been written and flushed."""
+        if self._queue is not None and self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        """ Write pending records, stop the sink thread and release resources.
+        Idempotent (safe to call multiple times).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.cancel()
+        if self._queue is not None and self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+        with self._lock:
+            self._flush()
+            self._close()
+
+    def _write_batch(self, records: list[LogRecord]):
+        """ Call write() under the sink lock; errors are reported, never raised."""
+        with self._lock:
+            try:
+                self.write(records)
+            except Exception as e:
+                self.errors += 1
+                print(f"[Log Sink Error]: {type(self).__name__}: {type(e).__name__}: {str(e)}")
+
+    def _run(self):
+        """ Sink thread main loop: collect a batch, write it."""
+        sink_queue = cast("queue.Queue[object]", self._queue)
+        while True:
+            try:
+                item = sink_queue.get(timeout=self._poll_interval)
+            except queue.Empty:
+                with self._lock:
+                    self._flush_due()
+                continue
+            batch: list[LogRecord] = []
+            stop = item is self._STOP
+            if not stop:
+                batch.append(cast(LogRecord, item))
+
+            # Drain whatever else is already queued (up to batch_size)
+            while not stop and len(batch) < self._batch_size:
+                try:
+                    item = sink_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                else:
+                    batch.append(cast(LogRecord, item))
+
+            if batch:
+                self._write_batch(batch)
+                with self._lock:
+                    self._flush_due()
+
+            for _ in range(len(batch) + (1 if stop else 0)):
+                sink_queue.task_done()
+
+            if stop:
+                return
+
+
+class ConsoleSink(LogSink):
+    """ Sink printing records to a text stream (sys.stdout by default).
+
+    Attributes:
+        _stream: Output stream (None = sys.stdout, looked up at write time)
+    """
+    def __init__(self, stream: TextIO | None = None, level: LogLevel = LogLevel.INFO, **options: Any):
+        """ Initialize the console sink.
+
+        Args:
+            stream: Output stream (None = the current sys.stdout)
+            level: Minimum severity written by this sink
+            **options: Queue options (see LogSink)
+        """
+        self._stream: TextIO | None = stream
+        super().__init__(level, **options)
+
+    @override
+    def write(self, records: list[LogRecord]):
+        _ = (self._stream or sys.stdout).write("".join(record.line + "\n" for record in records))
+
+    @override
+    def _flush(self):
+        (self._stream or sys.stdout).flush()
+
+
+class FileSink(LogSink):
+    """ Sink appending records to a log file kept open between writes.
+
+    Attributes:
+        _file: Open (optionally rotating) log file
+    """
+    def __init__(
+        self,
+        path: str,
+        level: LogLevel = LogLevel.INFO,
+        max_bytes: int = 0,
+        rotate_interval: float = 0.0,
+        backup_count: int = 0,
+        compress: CompressionType = None,
+        **options: Any
+    ):
+        """ Open the log file.
+
+        Args:
+            path: Log file path (appended to, created if missing)
+            level: Minimum severity written by this sink
+            max_bytes, rotate_interval, backup_count, compress: Rotation settings
+                (see RotatingFile; all disabled by default)
+            **options: Queue options (see LogSink)
+        """
+        self._file: RotatingFile = RotatingFile(path, max_bytes, rotate_interval, backup_count, compress)
+        super().__init__(level, **options)
+
+    @override
+    def write(self, records: list[LogRecord]):
+        self._file.write("".join(record.line + "\n" for record in records))
+
+    @override
+    def _flush(self):
+        self._file.flush()
+
+    @override
+    def _close(self):
+        self._file.close()
+
+
+class RotatingFileSink(FileSink):
+    """ FileSink with size/time rotation enabled (rotation arguments are positional)."""
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 0,
+        rotate_interval: float = 0.0,
+        backup_count: int = 0,
+        compress: CompressionType = None,
+        level: LogLevel = LogLevel.INFO,
+        **options: Any
+    ):
+        """ Open the rotating log file.
+
+        Args:
+            path: Log file path
+            max_bytes: Rotate when the file reaches this size (0 = never)
+            rotate_interval: Rotate every N seconds (0 = never)
+            backup_count: Rotated files to keep (0 = keep all)
+            compress: Compress rotated files on a background thread ("gzip"/"lzma")
+            level: Minimum severity written by this sink
+            **options: Queue options (see LogSink)
+        """
+        super().__init__(path, level, max_bytes, rotate_interval, backup_count, compress, **options)
+
+
+class MemorySink(LogSink):
+    """ Sink keeping records in memory (tests, diagnostics endpoints).
+
+    Attributes:
+        records: Stored records, oldest first (bounded by capacity)
+    """
+    def __init__(self, capacity: int = 0, level: LogLevel = LogLevel.INFO, **options: Any):
+        """ Initialize the memory sink.
+
+        Args:
+            capacity: Maximum records kept, oldest are discarded (0 = unbounded)
+            level: Minimum severity kept by this sink
+            **options: Queue options (see LogSink)
+        """
+        self.records: deque[LogRecord] = deque(maxlen=capacity if capacity > 0 else None)
+        super().__init__(level, **options)
+
+    @override
+    def write(self, records: list[LogRecord]):
+        self.records.extend(records)
+
+    @property
+    def lines(self) -> list[str]:
+        """Formatted lines of the stored records."""
+        return [record.line for record in self.records]
+
+    def clear(self):
+        """ Discard the stored records."""
+        self.records.clear()
+
+
+class SocketSink(LogSink):
+    """ Sink shipping newline-terminated lines over TCP (one stream) or UDP (one
+    datagram per record). Asynchronous by default: network latency stays off the
+    caller's thread. A broken TCP connection is re-established once per batch.
+
+    Attributes:
+        _address: (host, port) of the receiver
+        _protocol: "tcp" or "udp"
+        _timeout: Socket timeout in seconds
+        _sock: Connected socket (None = not connected yet)
+    """
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        protocol: SocketProtocol = "tcp",
+        level: LogLevel = LogLevel.INFO,
+        timeout: float = 5.0,
+        async_queue: bool = True,
+        **options: Any
+    ):
+        """ Initialize the socket sink (the connection is opened on first write).
+
+        Args:
+            host: Receiver host name or address
+            port: Receiver port
+            protocol: "tcp" (default) or "udp"
+            level: Minimum severity sent by this sink
+            timeout: Socket timeout in seconds
+            async_queue: Send from a dedicated background thread (default: True)
+            **options: Other queue options (see LogSink)
+
+        Raises:
+            ValueError: If protocol is not "tcp" or "udp"
+        """
+        if protocol not in ("tcp", "udp"):
+            raise ValueError(f"Unknown socket protocol: {protocol}")
+        self._address: tuple[str, int] = (host, port)
+        self._protocol: SocketProtocol = protocol
+        self._timeout: float = timeout
+        self._sock: socket.socket | None = None
+        super().__init__(level, async_queue=async_queue, **options)
+
+    def _connect(self) -> socket.socket:
+        """ Open the socket (TCP: connect to the receiver)."""
+        if self._protocol == "tcp":
+            sock = socket.create_connection(self._address, timeout=self._timeout)
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock = sock
+        return sock
+
+    @override
+    def write(self, records: list[LogRecord]):
+        if self._protocol == "udp":
+            sock = self._sock or self._connect()
+            for record in records:
+                _ = sock.sendto(record.line.encode("utf8"), self._address)
+            return
+
+        data = "".join(record.line + "\n" for record in records).encode("utf8")
+        for attempt in range(2):
+            sock = self._sock or self._connect()
+            try:
+                sock.sendall(data)
+                return
+            except OSError:
+                # Receiver restarted: reconnect once, then give up on this batch
+                self._close()
+                if attempt:
+                    raise
+
+    @override
+    def _close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+# Log table schema of SQLiteSink (table name is validated before substitution)
+_SQLITE_LOG_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS {table} (ts REAL, level INTEGER, lineno INTEGER, "
+    "filename TEXT, msg TEXT, fields TEXT)",
+    "CREATE INDEX IF NOT EXISTS {table}_ts ON {table} (ts)",
+    "CREATE INDEX IF NOT EXISTS {table}_level ON {table} (level, ts)",
+    "CREATE INDEX IF NOT EXISTS {table}_location ON {table} (filename, lineno, ts)",
+)
+
+
+def _check_table_name(table: str) -> str:
+    """ Validate an SQL table name (it is substituted into statements, not bound)."""
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+        raise ValueError(f"Invalid table name: {table!r}")
+    return table
+
+
+def _log_query(
+    table: str,
+    start: float | None,
+    end: float | None,
+    min_level: LogLevel | None,
+    filename: str | None,
+    lineno: int | None,
+    limit: int | None
+) -> tuple[str, list[object]]:
+    """ Build the SELECT statement (and its parameters) of a log table query."""
+    conditions: list[str] = []
+    params: list[object] = []
+    for condition, value in (
+        ("ts >= ?", start), ("ts < ?", end),
+        ("level >= ?", None if min_level is None else int(min_level)),
+        ("filename = ?", filename), ("lineno = ?", lineno),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    sql = f"SELECT ts, level, lineno, filename, msg, fields FROM {_check_table_name(table)}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY ts"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def _log_row(row: Any) -> dict[str, Any]:
+    """ Convert a log table row to a record dict (level as LogLevel, fields decoded)."""
+    ts, level, lineno, filename, msg, fields = row
+    return {
+        "ts": ts, "level": LogLevel(level), "lineno": lineno, "filename": filename,
+        "msg": msg, "fields": json.loads(fields) if fields else {},
+    }
+
+
+def query_log_db(
+    database: str,
+    table: str = "logs",
+    start: float | None = None,
+    end: float | None = None,
+    min_level: LogLevel | None = None,
+    filename: str | None = None,
+    lineno: int | None = None,
+    limit: int | None = None
+) -> Generator[dict[str, Any], None, None]:
+    """ Stream records from a SQLiteSink database, oldest first (uses the table indexes).
+
+    Args:
+        database: Database path
+        table: Log table name
+        start: Only records created at or after this time.time() value
+        end: Only records created before this time.time() value
+        min_level: Only records with at least this level
+        filename: Only records logged from this file
+        lineno: Only records logged from this line (use with filename)
+        limit: Maximum records returned (None = all)
+
+    Yields:
+        dict[str, Any]: Records with ts, level, lineno, filename, msg and fields keys
+    """
+    # Imported on use: plain logging does not depend on the database wrapper
+    from .sqlite import SQLite
+
+    sql, params = _log_query(table, start, end, min_level, filename, lineno, limit)
+    db = SQLite()
+    _ = db.open(database, factory=sqlite3.Connection)
+    try:
+        for row in db.each(sql, params):
+            yield _log_row(row)
+    finally:
+        _ = db.close()
+
+
+class SQLiteSink(LogSink):
+    """ Sink inserting records into an indexed SQLite table through the project's
+    SQLite wrapper. Records are buffered and written with one executemany() per
+    transaction once commit_records are pending or the oldest pending record is
+    commit_interval seconds old (and on flush()/close()), so at most the records of
+    the last commit_interval seconds are lost on a crash.
+
+    Table columns (indexed by ts, (level, ts) and (filename, lineno, ts)):
+        ts REAL, level INTEGER, lineno INTEGER, filename TEXT, msg TEXT, fields TEXT (JSON)
+
+    Attributes:
+        _db: Open SQLite wrapper
+        _table: Log table name
+        _insert_sql: Prepared INSERT statement for the table
+        _commit_records: Pending records that trigger a commit
+        _commit_interval: Maximum age (seconds) of pending records before a commit
+        _pending: Rows waiting for the next transaction
+        _first_pending: time.monotonic() when the oldest pending row was added
+        _timer: Synchronous mode - timer committing aged rows when no further record
+            arrives (None = not armed)
+    """
+    def __init__(
+        self,
+        database: str,
+        table: str = "logs",
+        level: LogLevel = LogLevel.INFO,
+        commit_records: int = 500,
+        commit_interval: float = 0.1,
+        **options: Any
+    ):
+        """ Open the database and create the log table and its indexes if needed.
+
+        Args:
+            database: Database path (or ":memory:")
+            table: Table name (letters, digits and underscores)
+            level: Minimum severity stored by this sink
+            commit_records: Write a transaction once this many records are pending
+            commit_interval: Write a transaction once the oldest pending record is this
+                many seconds old (checked by the sink thread in asynchronous mode, by a
+                timer thread armed while rows are pending otherwise)
+            **options: Queue options (see LogSink)
+
+        Raises:
+            ValueError: If table is not a valid identifier
+        """
+        self._table: str = _check_table_name(table)
+        self._commit_records: int = max(1, commit_records)
+        self._commit_interval: float = max(0.0, commit_interval)
+        self._pending: list[tuple[object, ...]] = []
+        self._first_pending: float = 0.0
+        self._timer: threading.Timer | None = None
+        # Wake the idle sink thread in time to commit aged records
+        self._poll_interval: float | None = self._commit_interval or None
+
+        # Imported on use: plain logging does not depend on the database wrapper
+        from .sqlite import SQLite
+
+        self._db: "SQLite" = SQLite()
+        # The sink thread (not the creating thread) performs the inserts
+        _ = self._db.open(database, check_same_thread=False, factory=sqlite3.Connection)
+        for statement in _SQLITE_LOG_SCHEMA:
+            _ = self._db.execute1(statement.format(table=table))
+        self._insert_sql: str = f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?)"
+        super().__init__(level, **options)
+
+    @staticmethod
+    def _encode_fields(fields: dict[str, object]) -> str:
+        """ Encode the fields column as strict JSON (NaN/Infinity written as strings)."""
+        try:
+            return json.dumps(fields, ensure_ascii=False, default=str, allow_nan=False)
+        except ValueError:
+            return json.dumps(_json_finite(fields), ensure_ascii=False, default=str)
+
+    @override
+    def write(self, records: list[LogRecord]):
+        if not self._pending:
+            self._first_pending = time.monotonic()
+        for record in records:
+            lineno, filename = record.location if record.location is not None else (None, None)
+            fields = self._encode_fields(record.fields) if record.fields else None
+            self._pending.append(
+                (record.created, int(record.level), lineno, filename, record.text, fields)
+            )
+        if self._queue is None:
+            self._flush_due()
+            if self._pending and self._timer is None and self._commit_interval:
+                # No sink thread: commit the rows even if no further record arrives
+                self._timer = threading.Timer(self._commit_interval, self._commit_aged)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _commit_aged(self):
+        """ Timer callback (synchronous mode): commit the rows pending since it was armed."""
+        with self._lock:
+            self._timer = None
+            if self._closed:
+                return
+            try:
+                self._flush()
+            except Exception as e:
+                self.errors += 1
+                print(f"[Log Sink Error]: {type(self).__name__}: {type(e).__name__}: {str(e)}")
+
+    @override
+    def _flush_due(self):
+        if self._pending and (
+            len(self._pending) >= self._commit_records
+            or time.monotonic() - self._first_pending >= self._commit_interval
+        ):
+            self._flush()
+
+    @override
+    def _flush(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        _ = self._db.executemany(self._insert_sql, rows)
+        self._db.commit()
+
+    @override
+    def _close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        _ = self._db.close()
+
+    def query(
+        self,
+        start: float | None = None,
+        end: float | None = None,
+        min_level: LogLevel | None = None,
+        filename: str | None = None,
+        lineno: int | None = None,
+        limit: int | None = None
+    ) -> list[dict[str, Any]]:
+        """ Query the records written so far (pending records are committed first).
+        Arguments as in query_log_db().
+
+        Returns:
+            list[dict[str, Any]]: Matching records, oldest first
+        """
+        self.flush()
+        sql, params = _log_query(self._table, start, end, min_level, filename, lineno, limit)
+        with self._lock:
+            return [_log_row(row) for row in self._db.each(sql, params)]
+
+
+# ------------------------------------------------------------------------------
+# Log File Search
+# ------------------------------------------------------------------------------
+# Record start: text timestamp, or the "ts" key of a JSON Lines record
+_LINE_TIMESTAMP = re.compile(rb'(?:\{"ts":")?(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)')
+# Record level: text "[LEVEL]: " or JSON Lines "level":"LEVEL"
+_LINE_LEVEL = re.compile(rb'\[(INFO|WARN|ERROR)\]: |"level":"(INFO|WARN|ERROR)"')
+
+
+class LogIndex():
+    """ Time-range and level search over a (possibly multi-GB) Logit log file.
+    The file is memory-mapped and a sparse index (one "timestamp → byte offset"
+    entry per index_interval bytes) is kept in "<path>.idx"; a query binary-searches
+    the index and scans only the blocks overlapping the requested time range.
+    The index is extended incrementally while the file grows and rebuilt when the
+    file was replaced (e.g. rotated).
+
+    Supports text and JSON Lines output of Logit (local or UTC timestamps). Lines
+    without a timestamp (multi-line messages) belong to the preceding record.
+    Compressed rotated files must be decompressed first.
+
+    Attributes:
+        _path: Log file path
+        _index_path: Index file path
+        _interval: Bytes between two index entries
+        _keys: Indexed timestamps ("YYYY-MM-DD HH:MM:SS", "T" replaced by " ")
+        _offsets: Byte offsets of the records the timestamps belong to
+        _size: File size covered by the index
+        _head: First bytes of the file when indexed (detects replaced files)
+        _utc: Whether the file uses UTC ISO-8601 timestamps
+    """
+    # Bytes compared to detect a replaced (rotated) file
+    _HEAD_SIZE = 64
+
+    def __init__(self, path: str, index_interval: int = 1 << 16, index_path: str | None = None):
+        """ Initialize the index (loaded or built lazily by the first query).
+
+        Args:
+            path: Log file path (plain text or JSON Lines)
+            index_interval: Bytes between two index entries (smaller = faster queries,
+                larger index)
+            index_path: Index file path (default: "<path>.idx")
+        """
+        self._path: str = path
+        self._index_path: str = index_path or f"{path}.idx"
+        self._interval: int = max(1024, index_interval)
+        self._keys: list[str] = []
+        self._offsets: list[int] = []
+        self._size: int = 0
+        self._head: str = ""
+        self._utc: bool = False
+        self._loaded: bool = False
+
+    @property
+    def entries(self) -> list[tuple[str, int]]:
+        """(timestamp, byte offset) pairs of the sparse index."""
+        return list(zip(self._keys, self._offsets))
+
+    def _load(self):
+        """ Read the saved index (missing or corrupt index files are ignored)."""
+        self._loaded = True
+        try:
+            with open(self._index_path, 'r', encoding='utf8') as index_file:
+                saved = cast(dict[str, Any], json.load(index_file))
+            if saved.get("interval") != self._interval:
+                return
+            self._keys = [str(key) for key, _ in saved["entries"]]
+            self._offsets = [int(offset) for _, offset in saved["entries"]]
+            self._size, self._head, self._utc = int(saved["size"]), str(saved["head"]), bool(saved["utc"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self._keys, self._offsets, self._size, self._head = [], [], 0, ""
+
+    def _save(self):
+        """ Write the index next to the log file (atomically, via a temporary file)."""
+        saved = {
+            "interval": self._interval, "size": self._size, "head": self._head, "utc": self._utc,
+            "entries": [[key, offset] for key, offset in zip(self._keys, self._offsets)],
+        }
+        tmp_path = f"{self._index_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf8') as index_file:
+                json.dump(saved, index_file, separators=(",", ":"))
+            os.replace(tmp_path, self._index_path)
+        except OSError as e:
+            # A read-only directory only costs the index rebuild next time
+            print(f"[Log Index Error]: {type(e).__name__}: {str(e)}")
+
+    @staticmethod
+    def _next_record(data: mmap.mmap, pos: int, size: int) -> tuple[int, bytes] | None:
+        """ Find the first record start (line with a timestamp) at or after pos.
+
+        Returns:
+            (offset, timestamp bytes) or None when no record follows
+        """
+        while pos < size:
+            match = _LINE_TIMESTAMP.match(data, pos)
+            if match:
+                return pos, match.group(1)
+            newline = data.find(b"\n", pos)
+            if newline < 0:
+                return None
+            pos = newline + 1
+        return None
+
+    def update(self, rebuild: bool = False) -> int:
+        """ Bring the index up to date with the file (and save it when it changed).
+
+        Args:
+            rebuild: Discard the existing index first
+
+        Returns:
+            Number of index entries
+        """
+        if not self._loaded:
+            self._load()
+        try:
+            size = os.path.getsize(self._path)
+        except OSError:
+            size = 0
+        if size == 0:
+            self._keys, self._offsets, self._size, self._head = [], [], 0, ""
+            return 0
+
+        with open(self._path, 'rb') as log_file, \
+                mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            head = data[:self._HEAD_SIZE].hex()
+            if rebuild or size < self._size or not head.startswith(self._head):
+                self._keys, self._offsets, self._size = [], [], 0
+            if size == self._size and self._head:
+                return len(self._keys)
+            self._head = head
 
-    Returns:
-        None
+            # Continue after the last entry (or from the start of a new index)
+            pos = self._offsets[-1] + self._interval if self._offsets else 0
+            while pos < size:
+                if self._offsets:
+                    # Jump into the next block and resynchronize on a line start
+                    newline = data.find(b"\n", pos - 1)
+                    if newline < 0:
+                        break
+                    pos = newline + 1
+                found = self._next_record(data, pos, size)
+                if found is None:
+                    break
+                offset, stamp = found
+                if not self._keys:
+                    self._utc = b"T" in stamp
+                self._keys.append(stamp.decode("ascii").replace("T", " "))
+                self._offsets.append(offset)
+                pos = offset + self._interval
+            self._size = size
+        self._save()
+        return len(self._keys)
 
-    Key Features:
-        1. Extracts variable name from caller code (via regex)
-        2. Resolves index variables to their actual values (e.g., i=5 → a[5])
-        3. Handles 3 index formats: double-level (a[i][j]), comma-separated (a[i,j]), single-level (a[i])
-        4. Preserves memory safety (deletes frame references)
-    """
-    # Initialize variable name (empty = not found)
-    location_str: str = "unknown@unknown"
-    var_name: str = ""
+    def _time_key(self, value: str | float | None) -> str | None:
+        """ Normalize a query bound to an index key (string prefixes compare correctly)."""
+        if value is None or isinstance(value, str):
+            return None if value is None else value.replace("T", " ").rstrip("Z")
+        moment = time.gmtime(value) if self._utc else time.localtime(value)
+        return time.strftime('%Y-%m-%d %H:%M:%S', moment)
 
-    # Get current/ caller frames
-    current_frame = inspect.currentframe()
-    caller_frame = current_frame.f_back if current_frame else None
+    def search(
+        self,
+        start: str | float | None = None,
+        end: str | float | None = None,
+        min_level: LogLevel | None = None
+    ) -> Generator[str, None, None]:
+        """ Stream the records of a time range, optionally filtered by level.
 
-    if caller_frame:
-        # Get caller location (lineno@filename)
-        frame_info = inspect.getframeinfo(caller_frame)
-        location_str = f"{frame_info.lineno}@{frame_info.filename}"
-
-        # Extract caller code lines (list of lines where pv() was called)
-        # caller_code_lines = inspect.getframeinfo(caller_frame)[3]
-        caller_code_lines = frame_info.code_context or []
-        if caller_code_lines:
-            # Iterate through caller lines to find pv() invocation
-            for line in caller_code_lines:
-                 # Clean line: remove comments (everything after #) and extra whitespace
-                cleaned_line = re.sub(r"#.*$", "", line).strip()
-                # Regex pattern to match pv(...) (supports spaces inside parentheses)
-                # Matches: pv(var), pv( var ), pv(var, end=""), pv( var , end='')
-                # pv_pattern = r'\bpv\s*\(\s*(.+?)\s*(?:,|)\s*\)'
-                pv_pattern = r"pv\(\s*(.+?)\s*\)"
-                if match := re.search(pv_pattern, cleaned_line):
-                    # Extract variable name (ignore end= parameter if present)
-                    var_name = match.group(1).split(", end")[0].strip()
-                    break   # Stop after first match (avoids multiple line false positives)
+        Args:
+            start: Inclusive lower bound - timestamp text (any prefix, e.g.
+                "2026-01-23 12") or time.time() value; None = from the beginning
+            end: Exclusive upper bound, same forms as start; None = to the end
+            min_level: Only records with at least this level (None = all)
 
-        # --------------------------
-        # Universal Index Resolution (All Formats)
-        # --------------------------
-        # Extract all index parts using regex (works for all formats)
-        index_matches = re.findall(r"\[(.*?)\]", var_name)
-        if index_matches and var_name:
-            # Get base name (everything before first [)
-            base_name = var_name.split("[")[0]
-            resolved_indexes = []
-
-            # Resolve each index part individually
-            for idx_part in index_matches:
-                resolved_idx = _resolve_index(idx_part, caller_frame.f_locals)
-                resolved_indexes.append(f"[{resolved_idx}]")
-            
-            # Rebuild variable name with resolved indexes
-            var_name = base_name + "".join(resolved_indexes)
+        Yields:
+            str: Matching log lines (without newline); continuation lines of a
+                matching record are yielded after it
+        """
+        _ = self.update()
+        if not self._keys:
+            return
+        start_key, end_key = self._time_key(start), self._time_key(end)
+        wanted = {level.name.encode() for level in LogLevel if min_level is None or level >= min_level}
 
-    if current_frame:
-        del current_frame
-    if caller_frame:
-        del caller_frame 
+        # Scan from the block before the first entry >= start up to the first entry > end
+        first = 0 if start_key is None else max(0, bisect.bisect_left(self._keys, start_key) - 1)
+        last = len(self._keys) if end_key is None else bisect.bisect_right(self._keys, end_key)
+        begin = self._offsets[first]
+        stop = self._offsets[last] if last < len(self._offsets) else self._size
 
-    # Print final output
-    value_str = ", ".join(str(arg) for arg in args) if args else ""
-    print(f"{location_str} {var_name} = {value_str}", end=endstr)
+        with open(self._path, 'rb') as log_file, \
+                mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = begin
+            selected = False
+            while pos < stop:
+                newline = data.find(b"\n", pos, stop)
+                line_end = newline if newline >= 0 else stop
+                match = _LINE_TIMESTAMP.match(data, pos, line_end)
+                if match:
+                    stamp = match.group(1).decode("ascii").replace("T", " ")
+                    selected = (start_key is None or stamp >= start_key) and \
+                               (end_key is None or stamp < end_key)
+                    if selected and min_level is not None:
+                        level_match = _LINE_LEVEL.search(data, pos, line_end)
+                        selected = level_match is not None and \
+                            (level_match.group(1) or level_match.group(2)) in wanted
+                if selected:
+                    yield data[pos:line_end].decode("utf8", errors="replace").rstrip("\r")
+                pos = line_end + 1
 
 
-def pe(exp: object, end: str = "\n") -> None:
-    """ Print expression and its evaluated result (debugging-focused).
-    Extracts the original expression string from caller code (supports nested functions).
+def search_log(
+    path: str,
+    start: str | float | None = None,
+    end: str | float | None = None,
+    min_level: LogLevel | None = None
+) -> Generator[str, None, None]:
+    """ Stream the lines of a Logit log file within [start, end) (see LogIndex.search()).
 
     Args:
-        exp: Evaluated expression result (any object)
-        end: Trailing character for the print statement (default: newline)
-
-    Returns:
-        None
+        path: Log file path
+        start: Inclusive lower bound (timestamp text prefix or time.time() value)
+        end: Exclusive upper bound (same forms as start)
+        min_level: Only records with at least this level
 
-    Key Features:
-        1. Uses balanced parentheses regex to handle nested functions (e.g., pe(len(filter(...))))
-        2. Extracts original expression string from caller code
-        3. Gracefully handles missing frame info (uses "expression" as fallback name)
+    Yields:
+        str: Matching log lines
     """
-    # Initialize expression name (fallback = "expression")
-    exp_name: str = "expression"
-    location_str: str = "unknown@unknown"
+    yield from LogIndex(path).search(start, end, min_level)
 
-    # Get current/caller frame
-    current_frame = inspect.currentframe()
-    caller_frame = current_frame.f_back if current_frame else None
 
-    if caller_frame:
-        frame_info = inspect.getframeinfo(caller_frame)
-        location_str = f"{frame_info.lineno}@{frame_info.filename}"
-
-        # Extract caller code lines
-        # caller_code_lines = inspect.getframeinfo(caller_frame)[3]
-        caller_code_lines = frame_info.code_context or []
-
-        if caller_code_lines:
-            # Regex pattern for balanced parentheses (handles nested functions)
-            # Matches: pe(any_expression) where any_expression can have nested ()
-            pattern = r"\bpe\s*\(([^()]*+(?:\([^()]*+\)[^()]*+)*+)\)"
-            # pe_pattern = r"pe\(\s*((?:[^()]+|\((?:[^()]+|\([^()]*\))*\))*)\s*\)"
-
-            # Iterate through caller lines to find pe() invocation
-            for line in caller_code_lines:
-                # Clean line: remove comments and extra whitespace
-                cleaned_line = re.sub(r"#.*$", "", line).strip()
-                # Match pe() expression
-                if match := re.search(pattern, cleaned_line):
-                    # Extract expression (remove trailing commas if present)
-                    exp_name = match.group(1).rstrip(',').strip()
-                    break   # Stop after first match
+def search_main(argv: list[str] | None = None) -> int:
+    """ Console entry point: pyutilities-logsearch LOGFILE [--start T] [--end T] [--level L].
 
-    # Clean up frame references (memory safety)
-    if caller_frame:
-        del caller_frame
-    if current_frame:
-        del current_frame
+    Args:
+        argv: Command line arguments (None = sys.argv[1:])
 
-    # Print final output
-    print(f"{location_str} {exp_name} = {exp}", end=end)
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="pyutilities-logsearch",
+        description="Search a Logit log file by time range and level (indexed, streaming)."
+    )
+    _ = parser.add_argument("logfile", help="Logit log file (text or JSON Lines)")
+    _ = parser.add_argument("--start", help='inclusive start, e.g. "2026-01-23 12:00" (any prefix)')
+    _ = parser.add_argument("--end", help="exclusive end (same format as --start)")
+    _ = parser.add_argument("--level", choices=[level.name for level in LogLevel],
+                            help="minimum level")
+    _ = parser.add_argument("--interval", type=int, default=1 << 16,
+                            help="bytes between index entries (default: 65536)")
+    _ = parser.add_argument("--rebuild", action="store_true", help="rebuild the index first")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.logfile):
+        print(f"[Log Search Error]: No such file: {args.logfile}", file=sys.stderr)
+        return 1
+    index = LogIndex(args.logfile, args.interval)
+    if args.rebuild:
+        _ = index.update(rebuild=True)
+    min_level = LogLevel[args.level] if args.level else None
+    try:
+        for line in index.search(args.start, args.end, min_level):
+            _ = sys.stdout.write(line + "\n")
+    except BrokenPipeError:
+        # Output piped into head/less that exited early
+        return 0
+    return 0
 
 
 # ------------------------------------------------------------------------------
-# Execution Time Decorator
+# Call Capture (Logit decorator)
 # ------------------------------------------------------------------------------
-def time_calc(func: Callable[P, R]) -> Callable[P, R]:
-    """ Decorator to measure and print a function's execution time.
-    Preserves original function metadata (name, docstring, signature) via @wraps.
+# Placeholder written instead of redacted argument values
+_REDACTED = "***"
 
-    Args:
-        func: Function to decorate (any callable with parameters P and return type R)
 
-    Returns:
-        Callable[P, R]: Wrapped function with timing logic
+class _BoundedRepr(reprlib.Repr):
+    """ reprlib.Repr that also limits subclasses of the builtin containers.
+    reprlib dispatches on the type name, so a list subclass would otherwise fall
+    back to the full builtins.repr() of every item.
+    """
+    def repr1(self, x: object, level: int) -> str:
+        """ Dispatch on the first builtin base class that has a limited repr."""
+        for cls in type(x).__mro__[:-1]:
+            method = getattr(self, f"repr_{cls.__name__}", None)
+            if method is not None and cls.__module__ in ("builtins", "array", "collections"):
+                return method(x, level)
+        return self.repr_instance(x, level)
 
-    Features:
-        1. Precise timing (6 decimal places for seconds)
-        2. No side effects (returns original function's result)
-        3. Preserves function metadata (critical for debugging/introspection)
+
+class _CallCapture():
+    """ Per-decorated-function helper describing calls with bounded cost.
+    Parameter names are resolved once at decoration time; values are rendered
+    with a reprlib.Repr whose limits bound both the output size and the work done
+    (only the first few items of a container are visited).
+
+    Attributes:
+        _repr: Size-limited repr (strings/other objects cut to max_repr characters)
+        _max_total: Maximum length of a whole argument list
+        _names: Names of the positional parameters, in order
+        _redact: Parameter names whose values are never rendered
+        _every: Log one call out of this many (1 = every call)
+        _counter: Call counter used for sampling (itertools.count is atomic)
     """
-    # Preserve original function metadata (prevents loss of __name__, __doc__, etc.)
-    @wraps(func)
-    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        # Record start time (Unix timestamp in seconds)
-        start_time = time.time()
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        redact: Collection[str] = (),
+        max_repr: int = 80,
+        sample_every: int = 1
+    ):
+        """ Inspect func's signature and configure the repr limits.
+
+        Args:
+            func: Decorated function
+            redact: Parameter names whose values are replaced by "***"
+            max_repr: Maximum characters per rendered value
+            sample_every: Log one call out of this many
+        """
+        self._repr: reprlib.Repr = _BoundedRepr(
+            maxlevel=3, maxtuple=6, maxlist=6, maxarray=6, maxdict=6, maxset=6,
+            maxfrozenset=6, maxdeque=6, maxstring=max(8, max_repr), maxlong=max(8, max_repr),
+            maxother=max(8, max_repr)
+        )
+        self._max_total: int = max(8, max_repr) * 4
         try:
-            # Execute the original function (pass all positional/keyword args)
-            # Return original function result (no side effects)
-            return func(*args, **kwargs)
-        finally:
-            # Calculate elapsed time
-            end_time = time.time()
-            exec_time = end_time - start_time
-            # Print execution time (6 decimal places for precision)
-            print(f"{func.__name__} execution time: {exec_time:.6f} seconds")
-    return wrapper
+            parameters = inspect.signature(func).parameters.values()
+            self._names: tuple[str, ...] = tuple(
+                parameter.name for parameter in parameters
+                if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+            )
+        except (TypeError, ValueError):
+            # Builtins/extension callables without an introspectable signature
+            self._names = ()
+        self._redact: frozenset[str] = frozenset(redact)
+        self._every: int = max(1, sample_every)
+        self._counter: Iterator[int] = itertools.count()
 
+    def sampled(self) -> bool:
+        """ Whether the current call is logged (always True without sampling)."""
+        return self._every == 1 or next(self._counter) % self._every == 0
 
-# ------------------------------------------------------------------------------
-# Logging System (Class-Based Decorator)
-# ------------------------------------------------------------------------------
-class LogLevel(IntEnum):
-    """ Enumeration for log severity levels (typed for safety).
-    Higher integer values = more severe log levels.
+    def value(self, value: object) -> str:
+        """ Render one value with the configured size limits."""
+        try:
+            return self._repr.repr(value)
+        except Exception as e:
+            # A broken __repr__ must never break the decorated call
+            return f"<repr failed: {type(e).__name__}>"
 
-    Attributes:
-        INFO: General informational messages (default)
-        WARN: Warning messages (non-critical issues)
-        ERROR: Error messages (critical failures)
+    def arguments(self, args: tuple[object, ...], kwargs: dict[str, object]) -> str:
+        """ Render a call's arguments as "name=value, ..." (redacted names as "***").
+
+        Args:
+            args: Positional arguments
+            kwargs: Keyword arguments
+
+        Returns:
+            Argument list text (truncated to the total size limit)
+        """
+        parts: list[str] = []
+        for index, value in enumerate(args):
+            name = self._names[index] if index < len(self._names) else None
+            if name is None:
+                parts.append(self.value(value))
+            else:
+                parts.append(f"{name}={_REDACTED if name in self._redact else self.value(value)}")
+        for name, value in kwargs.items():
+            parts.append(f"{name}={_REDACTED if name in self._redact else self.value(value)}")
+        text = ", ".join(parts)
+        if len(text) > self._max_total:
+            text = text[:self._max_total - 3] + "..."
+        return text
+
+    def exception(self, error: BaseException) -> str:
+        """ Render an exception as "Type: message" (message size-limited)."""
+        return f"{type(error).__name__}: {self._repr.repr(str(error))[1:-1]}"
+
+
+def _format_message(msg: LogMessage, args: tuple[object, ...]) -> str:
+    """ Build the final message text of a log record (called after level gating).
+
+    Args:
+        msg: Message string, printf-style template or zero-argument callable
+        args: printf-style arguments (applied with % when non-empty)
+
+    Returns:
+        Formatted message (or a "[Format Error]" note if formatting fails)
     """
-    # Lowest severity: general info (e.g., "Function X called")
-    INFO = 1
-    # Medium severity: warnings (e.g., "Low memory")
-    WARN = 2
-    # Highest severity: errors (e.g., "File not found")
-    ERROR = 3
+    try:
+        if callable(msg):
+            return str(msg())
+        if args:
+            return msg % args
+        return msg
+    except Exception as e:
+        # Broken log calls must never take down the caller
+        return f"[Format Error]: {type(e).__name__}: {e} ({msg!r}, {args!r})"
 
 
 class Logit():
@@ -403,36 +4354,327 @@ class Logit():
     Attributes:
         _level: Minimum log level to output (e.g., LogLevel.WARN → ignore INFO)
         _logfile: Path to log file (empty = no file output)
+        _writer: Background file writer (None = synchronous file output)
+        _file: Rotating log file used in synchronous mode (None = no rotation)
+        _ring: Flight-recorder ring buffer (None = disabled)
+        _ring_formatted: Whether the ring stores formatted lines
+        _ring_trigger: Level that dumps the ring buffer
+        _json: JSON Lines encoder (None = text output)
+        _timestamps: Cached timestamp formatter
+        _limiter: Log storm rate limiter (None = disabled)
+        _sinks: Output sinks (None = built-in console/file output)
+        _capture_args/_capture_result/_capture_exceptions: Decorator call capture switches
+        _redact: Parameter names never rendered by call capture
+        _max_repr: Maximum characters per captured value
+        _sample_every: Decorator logs one call out of this many
+        _location: Whether caller location is captured for each record
+        _enabled: Whether this logger emits anything at all
+        _timing: Whether decorated functions log their duration
+        _split_suspended: Whether durations are split into running/suspended time
     """
-    def __init__(self, level: LogLevel = LogLevel.INFO, logfile: str = ""):
+    def __init__(
+        self,
+        level: LogLevel = LogLevel.INFO,
+        logfile: str = "",
+        async_write: bool = False,
+        queue_size: int = 10000,
+        overflow: OverflowPolicy = "block",
+        location: bool = True,
+        enabled: bool = True,
+        timing: bool = False,
+        split_suspended: bool = False,
+        max_bytes: int = 0,
+        rotate_interval: float = 0.0,
+        backup_count: int = 0,
+        compress: CompressionType = None,
+        collector: "LogCollector | multiprocessing.Queue[str | None] | None" = None,
+        ring_size: int = 0,
+        ring_formatted: bool = False,
+        ring_trigger: LogLevel = LogLevel.ERROR,
+        output_format: OutputFormat = "text",
+        timestamp_precision: TimestampPrecision = "s",
+        utc: bool = False,
+        rate_limit: float = 0.0,
+        rate_burst: int = 10,
+        sinks: "list[LogSink] | None" = None,
+        capture_args: bool = False,
+        capture_result: bool = False,
+        capture_exceptions: bool = False,
+        redact: Collection[str] = (),
+        max_repr: int = 80,
+        sample_every: int = 1
+    ):
         """ Initialize Logit decorator with log level and file path.
 
         Args:
             level: Minimum log severity to output (default: LogLevel.INFO)
             logfile: Path to log file (empty string = disable file logging)
+            async_write: Write the log file from a background thread (default: False)
+            queue_size: Maximum pending records in asynchronous mode (0 = unbounded)
+            overflow: Policy when the asynchronous queue is full
+                ("block", "drop_oldest" or "drop_newest")
+            location: Capture caller location (lineno@filename) for every record
+                (default: True; False skips frame inspection entirely)
+            enabled: False silences this logger; decorated functions are returned
+                unchanged (no wrapper frame)
+            timing: Decorated functions also log their time to completion
+            split_suspended: With timing, coroutines/generators also report time
+                spent running vs. suspended at await/yield
+            max_bytes: Rotate the log file when it reaches this size (0 = never)
+            rotate_interval: Rotate the log file every N seconds (0 = never)
+            backup_count: Rotated files to keep (0 = keep all)
+            compress: Compress rotated files on a background thread ("gzip"/"lzma")
+            collector: LogCollector (or its queue) receiving file records instead of
+                logfile; use in worker processes for multi-process safe output
+                (records are batched by a local writer thread, see queue_size/overflow)
+            ring_size: Flight-recorder mode - keep the last N records below ring_trigger
+                in memory only; they are emitted when a ring_trigger record arrives or
+                dump_ring() is called (0 = disabled)
+            ring_formatted: Store formatted lines (snapshot of the message) instead of
+                raw (time, level, msg, args, location) tuples formatted on dump
+            ring_trigger: Level that dumps the ring buffer (default: LogLevel.ERROR)
+            output_format: "text" (default) or "json" for JSON Lines records
+                (per-call fields become top-level keys)
+            timestamp_precision: Timestamp precision ("s", "ms" or "us")
+            utc: UTC ISO-8601 timestamps ("2026-01-23T12:34:56Z") instead of local time
+            rate_limit: Log storm suppression - sustained records per second allowed for
+                each (level, call site, message template); excess records are dropped
+                and summarized as "repeated N times" (0 = disabled)
+            rate_burst: Records of one key allowed back-to-back before limiting starts
+            sinks: Output sinks replacing the built-in console/file output; every record
+                is formatted once and handed to each sink (own level and queue per sink).
+                A logfile is then written by an added FileSink (async_write = its own
+                queue thread, with the rotation settings above)
+            capture_args: Decorated functions log their arguments ("f(a=1, b='x') was called")
+            capture_result: Decorated functions log their return value
+            capture_exceptions: Decorated functions log exceptions they raise (at ERROR
+                level, then re-raise); with timing, result/exception lines carry the duration
+            redact: Parameter names whose values are logged as "***"
+            max_repr: Maximum characters per captured value (reprlib-style truncation;
+                containers are cut after a few items, bounding the repr cost)
+            sample_every: Decorated functions log one call out of this many (1 = all)
+
+        Raises:
+            ValueError: If sinks are combined with a collector (records would never
+                reach it)
         """
+        if sinks is not None and collector is not None:
+            raise ValueError("sinks cannot be combined with a collector")
+        self._enabled: bool = enabled
+        self._timing: bool = timing
+        self._split_suspended: bool = split_suspended
         self._level: LogLevel = level
         self._logfile: str = logfile
+        self._location: bool = location
+        self._writer: AsyncFileWriter | None = None
+        self._file: RotatingFile | None = None
+        self._ring: deque[str | LogRecord | tuple[float, LogLevel, LogMessage, tuple[object, ...],
+                                      tuple[int | str, str] | None,
+                                      dict[str, object], _BoundContext | None]] | None = (
+            deque(maxlen=ring_size) if ring_size > 0 else None
+        )
+        self._ring_formatted: bool = ring_formatted
+        self._ring_trigger: LogLevel = ring_trigger
+        self._json: JsonLineEncoder | None = (
+            JsonLineEncoder() if output_format == "json" else None
+        )
+        self._timestamps: TimestampCache = TimestampCache(timestamp_precision, utc)
+        self._limiter: RateLimiter | None = (
+            RateLimiter(rate_limit, rate_burst) if rate_limit > 0 else None
+        )
+        self._sinks: list[LogSink] | None = list(sinks) if sinks is not None else None
+        if self._sinks is not None and logfile:
+            # Sinks replace the built-in file output: the logfile becomes one of them
+            self._sinks.append(FileSink(
+                logfile, max_bytes=max_bytes, rotate_interval=rotate_interval,
+                backup_count=backup_count, compress=compress,
+                async_queue=async_write, queue_size=queue_size, policy=overflow
+            ))
+            logfile = ""
+        self._capture_args: bool = capture_args
+        self._capture_result: bool = capture_result
+        self._capture_exceptions: bool = capture_exceptions
+        self._redact: Collection[str] = redact
+        self._max_repr: int = max_repr
+        self._sample_every: int = max(1, sample_every)
+        if collector is not None:
+            # Batch records locally, one collector queue message per batch
+            record_queue = collector.queue if isinstance(collector, LogCollector) else collector
+            self._writer = AsyncFileWriter(_QueueTarget(record_queue), queue_size, overflow)
+        elif async_write and logfile:
+            self._writer = AsyncFileWriter(
+                logfile, queue_size, overflow,
+                max_bytes=max_bytes, rotate_interval=rotate_interval,
+                backup_count=backup_count, compress=compress
+            )
+        elif logfile and (max_bytes or rotate_interval):
+            # Rotation needs the size/age of a file kept open between records
+            self._file = RotatingFile(logfile, max_bytes, rotate_interval, backup_count, compress)
 
     def __call__(self, func: Callable[P, R]) -> Callable[P, R]:
         """ Make Logit a decorator: wrap target function with logging logic.
         Logs a "function called" message before executing the target function.
+        Coroutine/generator functions are logged when their body starts running,
+        and (with timing) when they complete.
 
         Args:
             func: Function to decorate (any callable with parameters P and return type R)
 
         Returns:
             Callable[P, R]: Wrapped function with logging logic
+            (the original function itself when the logger is disabled)
         """
+        # Disabled at decoration time: no wrapper, no per-call overhead
+        if not self._enabled:
+            return func
+
+        # Argument/result/exception capture or call sampling
+        if (self._capture_args or self._capture_result or self._capture_exceptions
+                or self._sample_every > 1):
+            return self._capture_wrapper(func)
+
+        # Coroutine / generator / async generator: track the real run to completion,
+        # logged at the call site captured by the wrapper (not at this module)
+        if _is_suspendable(func):
+            def log_called(location: tuple[int | str, str] | None):
+                # Log function invocation (uses decorator's configured log level)
+                self._log_at(location, self._level, "%s() was called", func.__name__)
+
+            def log_finished(times: _SpanTimes):
+                self._log_at(times.location, self._level, "%s() finished in %s",
+                             func.__name__, times.describe())
+
+            return _wrap_suspendable(
+                func, log_called,
+                log_finished if self._timing else lambda times: None,
+                self._split_suspended, self._location
+            )
+
         # Preserve original function metadata
         @wraps(func)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
             # Log function invocation (uses decorator's configured log level)
-            self._log(self._level, f"{func.__name__}() was called")
-            # Execute original function and return result
-            return func(*args, **kwargs)
+            self._log(self._level, "%s() was called", func.__name__)
+            if not self._timing:
+                # Execute original function and return result
+                return func(*args, **kwargs)
+
+            times = _SpanTimes()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                times.stop()
+                # Logged inline so that the caller location is the call site
+                self._log(self._level, "%s() finished in %s", func.__name__, times.describe())
         return wrapper  # Return wrapped function
 
+    def _capture_wrapper(self, func: Callable[P, R]) -> Callable[P, R]:
+        """ Build the call-capture wrapper (see capture_* / sample_every options).
+        Sync and coroutine functions get arguments, result, exception and duration;
+        generators (sync/async) log their arguments when created and their run as
+        usual (results are not captured).
+
+        Args:
+            func: Function to decorate
+
+        Returns:
+            Callable[P, R]: Wrapped function
+        """
+        capture = _CallCapture(func, self._redact, self._max_repr, self._sample_every)
+        name = func.__name__
+        level = self._level
+        capture_args, capture_result = self._capture_args, self._capture_result
+        capture_exceptions, timing = self._capture_exceptions, self._timing
+
+        def duration(times: _SpanTimes | None) -> str:
+            if times is None:
+                return ""
+            times.stop()
+            return f" in {times.describe()}"
+
+        def log_outcome(
+            location: tuple[int | str, str] | None,
+            times: _SpanTimes | None,
+            result: object = None,
+            error: BaseException | None = None
+        ):
+            suffix = duration(times)
+            if error is not None and capture_exceptions:
+                self._log_at(location, LogLevel.ERROR, "%s() raised %s%s", name, capture.exception(error), suffix)
+            elif error is None and capture_result:
+                self._log_at(location, level, "%s() returned %s%s", name, capture.value(result), suffix)
+            elif times is not None:
+                self._log_at(location, level, "%s() finished%s", name, suffix)
+
+        if inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func):
+            def log_finished(times: _SpanTimes):
+                self._log_at(times.location, level, "%s() finished in %s", name, times.describe())
+
+            timed = _wrap_suspendable(
+                func, None, log_finished if timing else lambda times: None,
+                self._split_suspended, self._location
+            )
+
+            @wraps(func)
+            def generator_wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                if not capture.sampled():
+                    return func(*args, **kwargs)
+                self._log(level, "%s(%s) was called", name,
+                          capture.arguments(args, kwargs) if capture_args else "")
+                return timed(*args, **kwargs)
+            return generator_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            split = self._split_suspended
+
+            async def run_coroutine(
+                location: tuple[int | str, str] | None, args: tuple[Any, ...], kwargs: dict[str, Any]
+            ) -> Any:
+                self._log_at(location, level, "%s(%s) was called", name,
+                             capture.arguments(args, kwargs) if capture_args else "")
+                times = _SpanTimes(split) if timing else None
+                try:
+                    awaitable = cast(Awaitable[Any], func(*args, **kwargs))
+                    result = await (_TimedAwaitable(awaitable, times) if times and split else awaitable)
+                except BaseException as e:
+                    log_outcome(location, times, error=e)
+                    raise
+                log_outcome(location, times, result)
+                return result
+
+            # Plain function returning the coroutine: the call site is still on the stack
+            @wraps(func)
+            def coroutine_wrapper(*args: P.args, **kwargs: P.kwargs) -> Any:
+                if not capture.sampled():
+                    return func(*args, **kwargs)
+                location = _get_caller_location(2) if self._location else None
+                return run_coroutine(location, args, kwargs)
+            return cast(Callable[P, R], inspect.markcoroutinefunction(coroutine_wrapper))
+
+        @wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            if not capture.sampled():
+                return func(*args, **kwargs)
+            self._log(level, "%s(%s) was called", name,
+                      capture.arguments(args, kwargs) if capture_args else "")
+            times = _SpanTimes() if timing else None
+            # Outcome lines are logged inline (not via log_outcome) so that their
+            # caller location is the call site, like the "was called" line
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                if capture_exceptions:
+                    self._log(LogLevel.ERROR, "%s() raised %s%s", name, capture.exception(e), duration(times))
+                elif times is not None:
+                    self._log(level, "%s() finished%s", name, duration(times))
+                raise
+            if capture_result:
+                self._log(level, "%s() returned %s%s", name, capture.value(result), duration(times))
+            elif times is not None:
+                self._log(level, "%s() finished%s", name, duration(times))
+            return result
+        return wrapper
+
     def _notify(self, log_str: str):
         """Reserved extension point for notifications (e.g., email, SMS)
         Override this method in subclasses to add notification logic (no-op by default).
@@ -440,72 +4682,535 @@ class Logit():
         Args:
             log_str: Human-readable log message string
         """
-        # Print to console
-        print(log_str)
+        # Print to console (sinks replace the built-in console output)
+        if self._sinks is None:
+            print(log_str)
+
+    def is_enabled_for(self, level: LogLevel) -> bool:
+        """ Check whether a record of the given level would be emitted.
+        Lets callers skip expensive diagnostic work for filtered levels.
+
+        Args:
+            level: Severity level to check
+
+        Returns:
+            True if the logger is enabled and level ≥ the configured minimum level
+        """
+        return self._enabled and level >= self._level
+
+    def bind(self, **fields: object) -> LogContext:
+        """ Bind context fields (e.g. request_id) for the duration of a with-block.
+        The binding lives in contextvars and applies to every logger in the current
+        thread/task (see LogContext).
+
+        Args:
+            **fields: Key/value fields added to every record logged inside the block
+
+        Returns:
+            LogContext: Context manager to use in a with statement
+        """
+        return LogContext(**fields)
 
-    def _log(self, level: LogLevel, msg: str):
+    def _log(self, level: LogLevel, msg: LogMessage, /, *args: object, **fields: object):
         """ Core logging logic: format and output log messages (console + file).
         Only processes logs with severity ≥ self._level (e.g., WARN ignores INFO).
+        The message is formatted lazily, after the level check has passed.
 
         Args:
             level: Severity level of the log message (LogLevel enum)
-            msg: Human-readable log message string
+            msg: Message string, printf-style template or zero-argument callable
+            *args: printf-style arguments for msg
+            **fields: Key/value fields attached to this record
 
         Key Steps:
             1. Check log level threshold
-            2. Generate timestamp and caller location
-            3. Format log string (timestamp + location + level + message)
-            4. Output to console
-            5. Write to log file (if configured)
-            6. Trigger notification (via _notify)
-        """
-        # Skip logs below the configured severity level
-        if level < self._level:
+            2. Capture caller location (unless disabled)
+            3. Rate limiting: drop storm records, summarize them when the key resumes
+            4. Flight-recorder mode: buffer records below the trigger level and return
+            5. Format message and log string (timestamp + location + level + message)
+            6. Trigger notification / console output (via _notify)
+            7. Write to log file (if configured)
+        """
+        # Skip logs below the configured severity level (or all, when disabled)
+        if level < self._level or not self._enabled:
+            return
+
+        # Caller location must be captured now (frames are gone later)
+        self._log_at(_get_caller_location(3) if self._location else None, level, msg, *args, **fields)
+
+    def _log_at(
+        self,
+        location: tuple[int | str, str] | None,
+        level: LogLevel,
+        msg: LogMessage,
+        /,
+        *args: object,
+        **fields: object
+    ):
+        """ Log a record at an explicit caller location (see _log).
+        Used by wrappers that captured the call site earlier, e.g. when a decorated
+        coroutine finishes long after its caller's frame has gone.
+
+        Args:
+            location: (lineno, filename) to report (None = no location)
+            level, msg, *args, **fields: See _log()
+        """
+        if level < self._level or not self._enabled:
             return
+        if not self._location:
+            location = None
+
+        # Log storm suppression (before any formatting work)
+        if self._limiter is not None:
+            key = (level, location, _message_key(msg))
+            repeated = self._limiter.allow(key)
+            if repeated < 0:
+                return
+            if repeated:
+                self._emit_repeated(key, repeated)
+
+        # Context fields bound in this thread/task (merged at format time)
+        context = _log_context.get()
+
+        # Flight recorder: records below the trigger level only go to the ring buffer
+        if self._ring is not None:
+            if level < self._ring_trigger:
+                if self._ring_formatted:
+                    self._ring.append(self._record(
+                        level, _format_message(msg, args), location, fields=fields, context=context
+                    ))
+                else:
+                    # Unformatted: msg/args are formatted only if the ring is dumped
+                    self._ring.append((time.time(), level, msg, args, location, fields, context))
+                return
+            # Trigger record: emit the recorded context first
+            self.dump_ring()
+
+        # Deferred formatting: only paid for records that are emitted
+        self._emit(self._record(
+            level, _format_message(msg, args), location, fields=fields, context=context
+        ))
+
+    def _record(
+        self,
+        level: LogLevel,
+        text: str,
+        location: tuple[int | str, str] | None,
+        created: float | None = None,
+        fields: dict[str, object] | None = None,
+        context: _BoundContext | None = None
+    ) -> "str | LogRecord":
+        """ Format a record once: the log line, wrapped in a LogRecord when sinks are
+        configured (sinks may need the structured parts as well).
+
+        Args:
+            level, text, location, created, fields, context: See _format_record()
+
+        Returns:
+            Formatted log line, or a LogRecord carrying it (context fields merged
+            into its fields)
+        """
+        if self._sinks is None:
+            return self._format_record(level, text, location, created, fields, context)
+        if created is None:
+            created = time.time()
+        line = self._format_record(level, text, location, created, fields, context)
+        if context is not None:
+            fields = {**context.fields, **fields} if fields else context.fields
+        return LogRecord(created, level, location, text, fields, line)
 
+    def _format_record(
+        self,
+        level: LogLevel,
+        text: str,
+        location: tuple[int | str, str] | None,
+        created: float | None = None,
+        fields: dict[str, object] | None = None,
+        context: _BoundContext | None = None
+    ) -> str:
+        """ Format one log line: "timestamp [location] [LEVEL]: text [key=value ...]"
+        (or one JSON object in JSON Lines mode).
+
+        Args:
+            level: Severity level of the record
+            text: Final message text
+            location: (lineno, filename) of the caller (None = location disabled)
+            created: Record creation time (time.time(); None = now)
+            fields: Per-call key/value fields (None/empty = no fields)
+            context: Bound context fields (cached suffix, written before fields;
+                per-call fields override keys bound in the context)
+
+        Returns:
+            Formatted log line (without trailing newline)
+        """
         # --------------------------
         # Generate Log Metadata
         # --------------------------
-        # Human-readable timestamp (YYYY-MM-DD HH:MM:SS)
-        timestr = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())
-
-        lineno, filename = _get_caller_location(3)
-        if isinstance(lineno, int):
-            location_str = f"{lineno:03d}@{filename}"
-        else:
-            location_str = f"{lineno}@{filename}"
+        # Human-readable timestamp (YYYY-MM-DD HH:MM:SS[.fff]), cached per second
+        timestr = self._timestamps.format(created)
 
         # --------------------------
-        # Format & Output Log
+        # Format Log
         # --------------------------
+        if self._json is not None:
+            return self._json.encode(timestr, level, location, text, fields, context)
+
+        if context is not None and fields and not fields.keys().isdisjoint(context.fields):
+            # A per-call field overrides the bound one: one merged key=value list
+            fields, context = {**context.fields, **fields}, None
+        if context is not None:
+            text += context.text
+        if fields:
+            text += "".join(f" {key}={value}" for key, value in fields.items())
+
         # Use level NAME (e.g., "INFO") instead of integer for readability
-        log_str = f"{timestr} {location_str} [{level.name}]: {msg}"
+        if location is not None:
+            lineno, filename = location
+            if isinstance(lineno, int):
+                location_str = f"{lineno:03d}@{filename}"
+            else:
+                location_str = f"{lineno}@{filename}"
+            return f"{timestr} {location_str} [{level.name}]: {text}"
+        return f"{timestr} [{level.name}]: {text}"
+
+    def _emit(self, entry: "str | LogRecord"):
+        """ Output one formatted record: notification/console, then file (or the sinks).
+
+        Args:
+            entry: Formatted log line (without trailing newline), or a LogRecord
+                when sinks are configured
+        """
+        if isinstance(entry, LogRecord):
+            # Trigger notification logic (extension point), then fan out to every sink
+            self._notify(entry.line)
+            for sink in cast(list[LogSink], self._sinks):
+                sink.emit(entry)
+            return
 
+        log_str = entry
         # Trigger notification logic (extension point)
         self._notify(log_str)
 
+        # Hand off to the background writer (asynchronous/collector mode)
+        if self._writer:
+            self._writer.put(log_str)
+        # Rotating log file (kept open, synchronous mode)
+        elif self._file:
+            self._file.write(log_str + '\n')
         # Write to log file if path is provided
-        if self._logfile:
+        elif self._logfile:
             # Use UTF-8 encoding to support non-ASCII characters
             # Append mode ("a") to preserve existing logs
             with open(self._logfile, 'a', encoding='utf8') as opened_file:
                 # Write log string + newline (ignore return value with _)
                 _ = opened_file.write(log_str + '\n')
 
+    def dump_ring(self) -> int:
+        """ Emit (and clear) the flight-recorder records, oldest first.
+        Called automatically when a record at the trigger level arrives.
+
+        Returns:
+            Number of records emitted (0 when the ring buffer is disabled or empty)
+        """
+        if self._ring is None:
+            return 0
+        emitted = 0
+        while True:
+            try:
+                entry = self._ring.popleft()
+            except IndexError:
+                return emitted
+            if isinstance(entry, tuple):
+                created, level, msg, args, location, fields, context = entry
+                self._emit(self._record(
+                    level, _format_message(msg, args), location, created, fields, context
+                ))
+            else:
+                self._emit(entry)
+            emitted += 1
+
+    def _emit_repeated(self, key: Hashable, count: int):
+        """ Emit the summary record of suppressed records of one rate-limit key.
+
+        Args:
+            key: (level, location, message key) rate-limit key
+            count: Number of suppressed records
+        """
+        level, location, msg_key = cast(tuple[LogLevel, tuple[int | str, str] | None, Hashable], key)
+        self._emit(self._record(
+            level, f"[Suppressed] {_message_label(msg_key)}: repeated {count} times", location
+        ))
+
+    def flush_suppressed(self) -> int:
+        """ Emit summaries for all keys with suppressed records (also done by flush()).
+
+        Returns:
+            Number of summary records emitted
+        """
+        if self._limiter is None:
+            return 0
+        pending = self._limiter.drain()
+        for key, count in pending:
+            self._emit_repeated(key, count)
+        return len(pending)
+
+    @property
+    def dropped(self) -> int:
+        """Number of records discarded by the asynchronous queue overflow policy."""
+        return self._writer.dropped if self._writer else 0
+
+    @property
+    def suppressed(self) -> int:
+        """Number of records discarded by the rate limiter."""
+        return self._limiter.suppressed if self._limiter else 0
+
+    def flush(self):
+        """ Block until all pending asynchronous records are written (no-op in sync mode).
+        Pending rate-limit summaries are emitted first."""
+        _ = self.flush_suppressed()
+        if self._writer:
+            self._writer.flush()
+        elif self._file:
+            self._file.flush()
+        for sink in self._sinks or ():
+            sink.flush()
+
+    def close(self):
+        """ Flush pending records, stop the background writer and close the log file
+        (and every sink)."""
+        _ = self.flush_suppressed()
+        if self._writer:
+            self._writer.close()
+        elif self._file:
+            self._file.close()
+        for sink in self._sinks or ():
+            sink.close()
+
     # --------------------------
     # Convenience Methods (Log Level Shortcuts)
     # --------------------------
-    def info(self, msg: str):
+    # msg may be a printf-style template (formatted with *args) or a zero-argument
+    # callable; neither is evaluated when the level is filtered out.
+    # Keyword arguments are attached to the record as key/value fields (msg is
+    # positional-only, so fields may use any name, including "msg" and "level").
+    def info(self, msg: LogMessage, /, *args: object, **fields: object):
         """Shortcut method to log an INFO-level message."""
-        self._log(LogLevel.INFO, msg)
+        self._log(LogLevel.INFO, msg, *args, **fields)
 
-    def warn(self, msg: str):
+    def warn(self, msg: LogMessage, /, *args: object, **fields: object):
         """Shortcut method to log a WARN-level message."""
-        self._log(LogLevel.WARN, msg)
+        self._log(LogLevel.WARN, msg, *args, **fields)
 
-    def err(self, msg: str):
+    def err(self, msg: LogMessage, /, *args: object, **fields: object):
         """Shortcut method to log an ERROR-level message."""
-        self._log(LogLevel.ERROR, msg)
+        self._log(LogLevel.ERROR, msg, *args, **fields)
+
+
+# ------------------------------------------------------------------------------
+# Asynchronous Email Delivery
+# ------------------------------------------------------------------------------
+class EmailDigestSender():
+    """ Background sender thread that batches log records into digest emails.
+    Records are collected until digest_size records or digest_interval seconds
+    (counted from the first record of the digest) are reached, then sent as one
+    email over a persistent SMTP session. A dropped session is reconnected;
+    failed deliveries are retried with exponential backoff.
+
+    Attributes:
+        _queue: Bounded FIFO of pending records
+        _server: Open SMTP session (None = not connected)
+        _digest_interval: Maximum seconds a record waits for its digest
+        _digest_size: Maximum records per digest email
+        _max_retries: Delivery retries after the first failed attempt
+        _retry_backoff: Delay before the first retry (doubled for each further retry)
+        dropped: Records discarded because the queue was full
+        sent: Digest emails delivered
+        failed: Records whose digest could not be delivered
+    """
+    # Sentinels telling the sender thread to send now / to exit
+    _FLUSH = object()
+    _STOP = object()
+
+    def __init__(
+        self,
+        smtp_server: str,
+        smtp_port: int,
+        username: str,
+        password: str,
+        recipient: str,
+        subject: str = "Log Digest",
+        digest_interval: float = 60.0,
+        digest_size: int = 100,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        queue_size: int = 10000,
+        starttls: bool = True,
+        timeout: float = 10.0
+    ):
+        """ Start the sender thread (the SMTP session is opened on first delivery).
+
+        Args:
+            smtp_server: SMTP host name
+            smtp_port: SMTP port
+            username: Login user name and sender address (empty = no login)
+            password: Login password
+            recipient: Recipient email address
+            subject: Subject prefix (the record count is appended)
+            digest_interval: Maximum seconds a record waits for its digest
+            digest_size: Maximum records per digest email
+            max_retries: Delivery retries after the first failed attempt
+            retry_backoff: Seconds before the first retry (doubled for each further retry)
+            queue_size: Maximum pending records (0 = unbounded); callers never block
+            starttls: Upgrade the session with STARTTLS before login
+            timeout: SMTP socket timeout in seconds
+        """
+        self._smtp_server: str = smtp_server
+        self._smtp_port: int = smtp_port
+        self._username: str = username
+        self._password: str = password
+        self._recipient: str = recipient
+        self._subject: str = subject
+        self._digest_interval: float = max(0.0, digest_interval)
+        self._digest_size: int = max(1, digest_size)
+        self._max_retries: int = max(0, max_retries)
+        self._retry_backoff: float = max(0.0, retry_backoff)
+        self._starttls: bool = starttls
+        self._timeout: float = timeout
+        self._server: smtplib.SMTP | None = None
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max(0, queue_size))
+        self._closed: bool = False
+        self.dropped: int = 0
+        self.sent: int = 0
+        self.failed: int = 0
+
+        self._thread: threading.Thread = threading.Thread(
+            target=self._run, name="EmailDigestSender", daemon=True
+        )
+        self._thread.start()
+        # Send the pending digest at interpreter exit
+        self._finalizer = _exit_finalizer(self, "close")
+
+    def put(self, log_str: str):
+        """ Enqueue one formatted record (never blocks; counts drops when full).
+
+        Args:
+            log_str: Formatted log line
+        """
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(log_str)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """ Send the pending digest now and block until it was delivered (or gave up)."""
+        if self._thread.is_alive():
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """ Send the pending digest, stop the sender thread and quit the SMTP session.
+        Idempotent (safe to call multiple times).
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._finalizer.cancel()
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self):
+        """ Sender thread main loop: collect a digest, deliver it when full, due or flushed."""
+        batch: list[str] = []
+        taken = 0           # Items taken from the queue but not yet marked done
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+                taken += 1
+            except queue.Empty:
+                item = None  # Digest window elapsed
+
+            if isinstance(item, str):
+                if not batch:
+                    deadline = time.monotonic() + self._digest_interval
+                batch.append(item)
+                if len(batch) < self._digest_size:
+                    continue
+            if batch:
+                self._deliver(batch)
+                batch = []
+
+            # Records are only marked done once delivered (flush() waits for them)
+            for _ in range(taken):
+                self._queue.task_done()
+            taken = 0
+
+            if item is self._STOP:
+                self._disconnect()
+                return
+
+    def _connect(self) -> smtplib.SMTP:
+        """ Open, secure and log in a new SMTP session."""
+        server = smtplib.SMTP(self._smtp_server, self._smtp_port, timeout=self._timeout)
+        try:
+            if self._starttls:
+                _ = server.starttls()
+            if self._username:
+                _ = server.login(self._username, self._password)
+        except BaseException:
+            server.close()
+            raise
+        self._server = server
+        return server
+
+    def _disconnect(self):
+        """ Quit the SMTP session (if any), tolerating an already dropped connection."""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            _ = server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _deliver(self, batch: list[str]):
+        """ Send one digest email, reconnecting and retrying with backoff on failure.
+
+        Args:
+            batch: Formatted log records of the digest
+        """
+        msg = MIMEText("\n".join(batch))
+        msg['Subject'] = f"{self._subject} ({len(batch)} records)"
+        msg['From'] = self._username
+        msg['To'] = self._recipient
+
+        error: Exception | None = None
+        for attempt in range(self._max_retries + 1):
+            reused = self._server is not None
+            try:
+                server = self._server or self._connect()
+                _ = server.send_message(msg)
+                self.sent += 1
+                return
+            except (smtplib.SMTPException, OSError) as e:
+                error = e
+                self._disconnect()
+                # An idle session dropped by the server is reconnected right away
+                if not reused and attempt < self._max_retries:
+                    time.sleep(self._retry_backoff * 2 ** attempt)
+            except Exception as e:
+                # Unexpected errors are not retried (but never kill the sender thread)
+                self._disconnect()
+                print(f"[Email Notification Unexpected Error]: {type(e).__name__}: {str(e)}")
+                self.failed += len(batch)
+                return
+
+        error = cast(Exception, error)
+        print(f"[Email Notification Error]: {type(error).__name__}: {str(error)}")
+        self.failed += len(batch)
 
 
 class EmailLogit(Logit):
@@ -518,6 +5223,8 @@ class EmailLogit(Logit):
         _password: password for emali login
         _smtp_server: smtp server without port, (e.g., "smtp.example.com")
         _smtp_port: smtp server port, (e.g., "587")
+        _starttls: Whether the SMTP session is upgraded with STARTTLS
+        _sender: Background digest sender (None = one email per record, sent inline)
     """
     def __init__(
         self, 
@@ -525,7 +5232,13 @@ class EmailLogit(Logit):
         username: str, 
         password: str, 
         smtp_server: str,
-        level: LogLevel = LogLevel.INFO
+        level: LogLevel = LogLevel.INFO,
+        async_delivery: bool = False,
+        digest_interval: float = 60.0,
+        digest_size: int = 100,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        starttls: bool = True
     ):
         """ Initialize EmailLogit with recipient email and log level.
 
@@ -535,6 +5248,14 @@ class EmailLogit(Logit):
             password: password for emali login
             smtp_server: smtp server with port, (e.g., "smtp.example.com: 587")
             level: Minimum log severity to output (default: LogLevel.INFO)
+            async_delivery: Send records from a background thread as digest emails
+                over one reusable SMTP session (default: False, one email per record)
+            digest_interval: Asynchronous mode - maximum seconds a record waits for its digest
+            digest_size: Asynchronous mode - maximum records per digest email
+            max_retries: Asynchronous mode - delivery retries after a failed attempt
+            retry_backoff: Asynchronous mode - seconds before the first retry (doubled
+                for each further retry)
+            starttls: Upgrade the SMTP session with STARTTLS (default: True)
         """
         # Store email/smtp credentials (used in _notify)
         self._email: str = email
@@ -545,6 +5266,16 @@ class EmailLogit(Logit):
         server_parts = smtp_server.split(":")
         self._smtp_server: str = server_parts[0].strip()
         self._smtp_port: int = int(server_parts[1].strip())
+        self._starttls: bool = starttls
+
+        self._sender: EmailDigestSender | None = None
+        if async_delivery:
+            self._sender = EmailDigestSender(
+                self._smtp_server, self._smtp_port, username, password, email,
+                subject=f"[{level.name}] Log Digest",
+                digest_interval=digest_interval, digest_size=digest_size,
+                max_retries=max_retries, retry_backoff=retry_backoff, starttls=starttls
+            )
 
         # Call parent class constructor (disable file logging by default)
         super().__init__(level, "")
@@ -562,8 +5293,11 @@ class EmailLogit(Logit):
         # Always print to console first
         super()._notify(log_str)
 
-        import smtplib
-        from email.mime.text import MIMEText
+        # Asynchronous mode: the sender thread batches records into digests
+        if self._sender is not None:
+            self._sender.put(log_str)
+            return
+
         try:
             # Create email message
             msg = MIMEText(f"Log Notification: {log_str}")
@@ -573,7 +5307,8 @@ class EmailLogit(Logit):
 
             # SMTP connection
             with smtplib.SMTP(self._smtp_server, self._smtp_port, timeout=10) as server:
-                _ = server.starttls()  # Enforce TLS (security)
+                if self._starttls:
+                    _ = server.starttls()  # Enforce TLS (security)
                 _ = server.login(self._username, self._password)
                 _ = server.send_message(msg)
         except smtplib.SMTPException as e:
@@ -582,3 +5317,17 @@ class EmailLogit(Logit):
         except Exception as e:
             # Catch-all for unexpected errors
             print(f"[Email Notification Unexpected Error]: {type(e).__name__}: {str(e)}")
+
+    @override
+    def flush(self):
+        """ Flush file output, then send the pending email digest (asynchronous mode)."""
+        super().flush()
+        if self._sender is not None:
+            self._sender.flush()
+
+    @override
+    def close(self):
+        """ Close file output, then send the pending digest and stop the sender thread."""
+        super().close()
+        if self._sender is not None:
+            self._sender.close()
@@ -8,6 +8,7 @@ This module provides a user-friendly interface for common SQLite tasks:
 - SQLite database version metadata management (user_version PRAGMA)
 - Parameterized SQL queries (supports ?/:key placeholders)
 - Auto-commit and manual-commit execution modes
+- Batched execution of one statement over many parameter sets (executemany)
 - Generator-based result iteration
 - Safe connection cleanup and resource management
 
@@ -19,7 +20,7 @@ Key Features:
 """
 from os import PathLike
 import sqlite3
-from collections.abc import Sequence, Mapping
+from collections.abc import Sequence, Mapping, Iterable
 from typing import Literal, TypeVar, cast
 from collections.abc import Generator
 
@@ -303,6 +304,39 @@ class SQLite:
         # Return True if execution succeeded (cursor object is truthy)
         return bool(execution_result)
 
+    def executemany(self, sql: str, seq_params: Iterable[SQLParameters]):
+        """ Execute one SQL statement for every parameter set, without **automatic commit**.
+        Much faster than calling execute() in a loop for bulk inserts (the statement is
+        prepared once); call commit() to persist the whole batch as one transaction.
+
+        Args:
+            sql: Valid SQLite DML statement with ?/:key placeholders.
+            seq_params: Iterable of parameter sets (sequences or dictionaries, see execute()).
+
+        Returns:
+            int: Number of rows modified (-1 if not reported by SQLite).
+
+        Raises:
+            RuntimeError: If called before open() (no active database connection).
+            sqlite3.Error: For SQL execution errors (e.g., syntax error, constraint violation)
+                (no exception handling in this method).
+
+        Example:
+            >>> db.open(":memory:", factory=sqlite3.Connection)
+            >>> db.execute1("CREATE TABLE users (id INT, name TEXT)")
+            >>> db.executemany("INSERT INTO users VALUES (?, ?)", [(1, "Alice"), (2, "Bob")])  # 2
+            >>> db.commit()  # Persist the batch
+        """
+        if not self._conn:
+            raise RuntimeError("Call open() first to initialize connection!")
+
+        # Create cursor, execute the statement once per parameter set (no commit)
+        cursor = self._conn.cursor()
+        _ = cursor.executemany(sql, (params if params is not None else () for params in seq_params))
+        row_count = cursor.rowcount
+        cursor.close()
+        return row_count
+
     def commit(self):
         """ Manually commit all pending changes from execute() calls to the database.
 
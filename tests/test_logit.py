@@ -3,10 +3,26 @@
 """ 
     uv run pytest --cov=src.pyutilities.logit .\tests\test_logit.py -v
 """
+import io
+import os
+import sys
+import json
 import time
+import asyncio
+import gzip
+import lzma
+import threading
+import gc
+import weakref
+import multiprocessing.util
 import inspect
 import types
 import smtplib
+import socket
+import socketserver
+import sqlite3
+import subprocess
+import tracemalloc
 
 from unittest.mock import (
     Mock,
@@ -27,9 +43,28 @@ from pytest import (
 # Import the module
 from src.pyutilities.logit import (
     _get_caller_location,
-    _resolve_index,
+    _code_filename,
+    _filename_cache,
+    _resolve_index, _compile_index,
+    _pv_sites, _pe_sites,
     po, pv, pe, time_calc,
     LogLevel, Logit, EmailLogit,
+    AsyncFileWriter, RotatingFile, LogCollector,
+    set_debug_print, is_debug_print_enabled,
+    set_safe_index_eval, is_safe_index_eval_enabled,
+    DebugOutput, set_debug_output, get_debug_output, flush_debug_output,
+    TimingStats, get_timing_stats, reset_timing_stats, timing_report, dump_timing_stats,
+    get_call_tree, trace_report, chrome_trace, dump_chrome_trace, reset_trace,
+    SamplingProfiler,
+    JsonLineEncoder, read_json_lines,
+    TimestampCache, RateLimiter,
+    EmailDigestSender,
+    LogRecord, LogSink, ConsoleSink, FileSink, RotatingFileSink, MemorySink, SocketSink, SQLiteSink,
+    query_log_db,
+    LogIndex, search_log, search_main,
+    LogContext, get_log_context,
+    mem_calc, MemoryProfile, MemoryStats, get_memory_stats, reset_memory_stats,
+    memory_report, dump_memory_stats,
 )
 
 
@@ -44,7 +79,7 @@ R = TypeVar("R")  # For function return values
 # --------------------------
 @pytest.fixture
 def mock_frameinfo():
-    """Fixture: Mock inspect.getframeinfo 返回有效 FrameInfo 对象"""
+    """Fixture: Mock inspect.getframeinfo / _get_caller_location 返回有效位置"""
     # 构造标准的 FrameInfo 对象（无需mock frame/code）
     mock_frame_info = inspect.FrameInfo(
         frame=None,
@@ -54,7 +89,8 @@ def mock_frameinfo():
         code_context=["test_code_line"],
         index=0
     )
-    with patch("inspect.getframeinfo", return_value=mock_frame_info):
+    with patch("inspect.getframeinfo", return_value=mock_frame_info), \
+         patch("src.pyutilities.logit._get_caller_location", return_value=(42, "/test/file.py")):
         yield mock_frame_info
 
 @pytest.fixture
@@ -89,10 +125,59 @@ def create_mock_frameinfo(
         index=index
     )
 
-def test_get_caller_location_valid_frame(mock_frameinfo):
+def create_mock_frame_chain(
+    filename: str | None = "/test/file.py",
+    lineno: int | None = 42,
+    depth: int = 2
+) -> Mock:
+    """Helper: build a current frame whose depth-th f_back is the caller frame"""
+    caller = Mock(spec=types.FrameType)
+    caller.f_lineno = lineno
+    caller.f_code = Mock(spec=types.CodeType)
+    caller.f_code.co_filename = filename
+    frame = caller
+    for _ in range(depth):
+        current = Mock(spec=types.FrameType)
+        current.f_back = frame
+        frame = current
+    return frame
+
+def test_get_caller_location_valid_frame():
     """Test: Valid current/caller frame"""
-    location = _get_caller_location()
-    assert location == (42, '/test/file.py')
+    with patch("inspect.currentframe", return_value=create_mock_frame_chain()):
+        location = _get_caller_location()
+        assert location == (42, '/test/file.py')
+
+def test_get_caller_location_real_frame():
+    """Test: Real caller frame (this test function)"""
+    def helper():
+        return _get_caller_location()
+    expected_lineno = inspect.currentframe().f_lineno + 1
+    lineno, filename = helper()
+    assert lineno == expected_lineno
+    assert filename == __file__
+
+def test_get_caller_location_skipframe():
+    """Test: skipframe selects deeper frames"""
+    with patch("inspect.currentframe", return_value=create_mock_frame_chain(lineno=7, depth=3)):
+        assert _get_caller_location(3) == (7, '/test/file.py')
+
+def test_get_caller_location_no_getframeinfo():
+    """Test: Fast path never builds a Traceback via inspect.getframeinfo"""
+    with patch("inspect.getframeinfo", side_effect=AssertionError("slow path used")):
+        lineno, filename = _get_caller_location(1)
+        assert isinstance(lineno, int)
+        assert filename == _code_filename(inspect.currentframe().f_code)
+
+def test_code_filename_cached():
+    """Test: Filename resolution happens once per source file"""
+    code = test_code_filename_cached.__code__
+    _filename_cache.pop(code.co_filename, None)
+    with patch("inspect.getsourcefile", return_value="/resolved.py") as mock_getsourcefile:
+        assert _code_filename(code) == "/resolved.py"
+        assert _code_filename(code) == "/resolved.py"
+        assert mock_getsourcefile.call_count == 1
+    _filename_cache.pop(code.co_filename, None)
 
 def test_get_caller_location_current_frame_none():
     """Test: current_frame = None"""
@@ -112,37 +197,22 @@ def test_get_caller_location_caller_frame_none():
         location = _get_caller_location()
         assert location == ('unknown', 'unknown')
 
-# def test_get_caller_location_missing_filename(mock_frameinfo_no_filename):
 def test_get_caller_location_missing_filename():
     """Test: Valid frame but missing co_filename"""
-    mock_frameinfo_no_filename = create_mock_frameinfo(
-        filename=None, # missing file name
-        lineno=42,
-        function="test_func",
-        code_context=["test_code_line"],
-        index=0
-    )
-    # mock_frameinfo_no_filename.
-    with patch("inspect.getframeinfo", return_value=mock_frameinfo_no_filename):
+    with patch("inspect.currentframe", return_value=create_mock_frame_chain(filename=None)):
         location = _get_caller_location()
         assert location == (42, None)
 
 def test_get_caller_location_missing_lineno():
     """Test: Valid frame but missing lineno"""
-    mock_frameinfo = create_mock_frameinfo(
-        filename="/test/file.py",
-        lineno=None,
-        function="test_func",
-        code_context=["test_code_line"],
-        index=0
-    )
-    with patch("inspect.getframeinfo", return_value=mock_frameinfo):
+    with patch("inspect.currentframe", return_value=create_mock_frame_chain(lineno=None)):
         location = _get_caller_location()
         assert location == (None, '/test/file.py')
 
-def test_get_caller_location_memory_cleanup(mock_frameinfo):
+def test_get_caller_location_memory_cleanup():
     """Test: del statements execute (memory cleanup path)"""
-    _get_caller_location()
+    with patch("inspect.currentframe", return_value=create_mock_frame_chain()):
+        _get_caller_location()
     assert True
 
 # --------------------------
@@ -226,6 +296,47 @@ def test_resolve_index_multi_comma():
     # Test mixed valid/invalid
     assert _resolve_index("i,undefined,k", locals_dict) == "(0,undefined,2)"
 
+def test_resolve_index_compile_cache():
+    """Test index expressions are compiled once and reused (LRU cache)"""
+    _compile_index.cache_clear()
+    for i in range(5):
+        assert _resolve_index("i * 2 + 1", {"i": i}) == str(i * 2 + 1)
+    info = _compile_index.cache_info()
+    assert (info.misses, info.hits) == (1, 4)
+
+def test_resolve_index_safe_mode(capsys: CaptureFixture[str]):
+    """Test safe mode evaluates names/attributes/subscripts/arithmetic only"""
+    class Point:
+        x = 3
+    locals_dict = {"i": 2, "p": Point(), "rows": [[1, 2], [3, 4, 5]], "os": os}
+    assert _resolve_index("rows[1][i] - p.x // 2", locals_dict, safe=True) == '4'
+    assert _resolve_index("-i % 3", locals_dict, safe=True) == '1'
+    # Calls, builtins, dunder attributes and imports are left unresolved
+    assert _resolve_index("len(rows)", locals_dict, safe=True) == "len(rows)"
+    assert _resolve_index("len(rows)", locals_dict) == '2'
+    assert _resolve_index("p.__class__", locals_dict, safe=True) == "p.__class__"
+    assert _resolve_index("os.getcwd()", locals_dict, safe=True) == "os.getcwd()"
+    assert _resolve_index("__import__('os')", locals_dict, safe=True) == "__import__('os')"
+    assert _resolve_index("i ** 99", locals_dict, safe=True) == "i ** 99"
+    assert _resolve_index("i, len(rows)", locals_dict, safe=True) == "(2,len(rows))"
+    assert "unsafe expression: len(rows)" in capsys.readouterr().out
+
+def test_safe_index_eval_switch(capsys: CaptureFixture[str]):
+    """Test set_safe_index_eval applies to pv() indexes"""
+    rows = [10, 20, 30]
+    i = 2
+    assert not is_safe_index_eval_enabled()
+    try:
+        set_safe_index_eval(True)
+        assert is_safe_index_eval_enabled()
+        pv(rows[i if i else 0])
+        pv(rows[1])
+    finally:
+        set_safe_index_eval(False)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].endswith("rows[i if i else 0] = 30")  # Conditional is not allowed
+    assert lines[1].endswith("rows[1] = 20")
+
 # --------------------------
 # Test po Function
 # --------------------------
@@ -379,6 +490,56 @@ def test_pv_three_level_index(capsys: CaptureFixture[str]):
     captured = capsys.readouterr()
     assert "test_3d[0][1][2] = 6" in captured.out
 
+def test_pv_call_site_cache(capsys: CaptureFixture[str]):
+    """Test pv() parses each call site once and re-evaluates its indexes on every call"""
+    test_list = [10, 20, 30]
+    with patch("inspect.getframeinfo", wraps=inspect.getframeinfo) as mock_getframeinfo:
+        for i in range(3):
+            pv(test_list[i])
+    captured = capsys.readouterr()
+    assert mock_getframeinfo.call_count == 1
+    assert [line.split(" ", 1)[1] for line in captured.out.splitlines()] == [
+        "test_list[0] = 10", "test_list[1] = 20", "test_list[2] = 30"
+    ]
+
+def test_pe_call_site_cache(capsys: CaptureFixture[str]):
+    """Test pe() parses each call site once"""
+    with patch("inspect.getframeinfo", wraps=inspect.getframeinfo) as mock_getframeinfo:
+        for i in range(3):
+            pe(i * 2)
+    captured = capsys.readouterr()
+    assert mock_getframeinfo.call_count == 1
+    assert captured.out.count("i * 2 = ") == 3 and "i * 2 = 4" in captured.out
+
+def test_call_site_caches_bounded(capsys: CaptureFixture[str]):
+    """Test exec()-generated call sites are evicted (LRU) and their code not kept alive"""
+    code_refs: list[weakref.ref[types.CodeType]] = []
+    with patch("src.pyutilities.logit._SITE_CACHE_SIZE", 8):
+        for i in range(50):
+            code = compile(f"value = {i}\npv(value)\npe(value + 1)\n", f"<generated {i}>", "exec")
+            code_refs.append(weakref.ref(code))
+            exec(code, {"pv": pv, "pe": pe})
+            del code
+        assert len(_pv_sites) <= 8 and len(_pe_sites) <= 8
+    _ = gc.collect()
+    assert sum(ref() is not None for ref in code_refs) <= 8
+    assert capsys.readouterr().out.count("@<generated ") == 100
+
+def test_pv_multi_line_and_same_line_calls(capsys: CaptureFixture[str]):
+    """Test pv() names come from the exact call (multi-line calls, two calls on one line)"""
+    i, j = 1, 0
+    test_matrix = [[1, 2], [3, 4]]
+    pv(
+        test_matrix[i]
+                   [j],
+        endstr="\n"
+    )
+    first, second = "a", "b"
+    pv(first); pv(second)
+    pv(test_matrix[min(i, j)])
+    lines = [line.split(" ", 1)[1] for line in capsys.readouterr().out.splitlines()]
+    assert lines == ["test_matrix[1][0] = 3", "first = a", "second = b", "test_matrix[0] = [1, 2]"]
+
 # --------------------------
 # Test pe Function
 # --------------------------
@@ -436,7 +597,8 @@ def test_pe_complex_expression(capsys: CaptureFixture[str]):
 
         # Capture output and validat
         captured = capsys.readouterr()
-        assert f"420@{__file__} expression = 12" in captured.out
+        # Full expression from the AST (the regex scan gave up at this nesting depth)
+        assert f"420@{__file__} sum(filter(lambda x: x>2, [1,2,3,4,5])) = 12" in captured.out
         assert "= 12" in captured.out
 
 def test_pe_multi_line_expression(capsys: CaptureFixture[str]):
@@ -473,6 +635,17 @@ def test_pe_caller_frame_none(capsys: CaptureFixture[str]):
         captured = capsys.readouterr()
         assert "expression = caller frame none" in captured.out
 
+def test_pe_multi_line_call(capsys: CaptureFixture[str]):
+    """Test pe() extracts a call spanning several lines"""
+    values = [1, 2, 3]
+    pe(sum(
+        value * 2
+        for value in values
+    ))
+    pe(len(values)); pe(max(values))
+    lines = [line.split(" ", 1)[1] for line in capsys.readouterr().out.splitlines()]
+    assert lines == ["sum( value * 2 for value in values ) = 12", "len(values) = 3", "max(values) = 3"]
+
 # --------------------------
 # Test time_calc Decorator
 # --------------------------
@@ -529,6 +702,737 @@ def test_time_calc_zero_time(capsys: CaptureFixture[str], monkeypatch: MonkeyPat
     captured = capsys.readouterr()
     assert "fast_func execution time: 0.000000 seconds" in captured.out
 
+def test_time_calc_with_options(capsys: CaptureFixture[str]):
+    """Test time_calc used with (empty) options still wraps and times"""
+    @time_calc()
+    def optioned_func() -> int:
+        return 7
+
+    assert optioned_func() == 7
+    assert "optioned_func execution time:" in capsys.readouterr().out
+
+def test_time_calc_disabled_returns_original(capsys: CaptureFixture[str]):
+    """Test time_calc(enabled=False) returns the undecorated function"""
+    def plain_func() -> str:
+        return "plain"
+
+    decorated = time_calc(enabled=False)(plain_func)
+    assert decorated is plain_func
+    assert decorated() == "plain"
+    assert capsys.readouterr().out == ""
+
+# --------------------------
+# Test time_calc Statistics Mode
+# --------------------------
+def test_timing_stats_aggregates():
+    """Test TimingStats exact aggregates and percentile estimates"""
+    stats = TimingStats("demo")
+    for ns in range(1, 101):
+        stats.add(ns * 1000)
+
+    assert stats.count == 100
+    assert stats.total_ns == 5050 * 1000
+    assert stats.min_ns == 1000
+    assert stats.max_ns == 100_000
+    assert stats.mean_ns == 50_500
+    assert stats.percentile(50) == 50_000
+    assert stats.percentile(95) == 95_000
+    assert stats.percentile(99) == 99_000
+    assert "demo: count=100" in stats.summary()
+
+def test_timing_stats_reservoir_bounded():
+    """Test the percentile reservoir never exceeds its size"""
+    stats = TimingStats("bounded", reservoir_size=16)
+    for ns in range(10_000):
+        stats.add(ns)
+    assert stats.count == 10_000
+    assert len(stats._samples) == 16
+    assert stats.max_ns == 9_999
+
+def test_time_calc_stats_mode(capsys: CaptureFixture[str]):
+    """Test stats mode records every call silently into the registry"""
+    @time_calc(stats=True)
+    def stats_func(x: int) -> int:
+        return x * 2
+
+    for i in range(50):
+        assert stats_func(i) == i * 2
+
+    assert capsys.readouterr().out == ""
+    name = f"{stats_func.__module__}.{stats_func.__qualname__}"
+    stats = get_timing_stats(name)
+    assert isinstance(stats, TimingStats)
+    assert stats.count == 50
+    assert 0 < stats.min_ns <= stats.percentile(50) <= stats.max_ns
+    assert name in timing_report()
+
+    reset_timing_stats()
+    assert stats.count == 0
+    _ = stats_func(1)
+    assert stats.count == 1
+
+def test_time_calc_stats_periodic_logit():
+    """Test stats mode emits summaries through Logit once per interval,
+    located at the decorated function (not at the wrapper in logit.py)"""
+    logger = Logit()
+    with patch.object(logger, "_notify") as mock_notify:
+        @time_calc(stats=True, logger=logger, report_interval=0)
+        def periodic_func():
+            pass
+
+        periodic_func()
+        periodic_func()
+
+    assert mock_notify.call_count == 2
+    summary = mock_notify.call_args[0][0]
+    assert "periodic_func: count=2" in summary
+    lineno = inspect.unwrap(periodic_func).__code__.co_firstlineno
+    assert f" {lineno:03d}@{__file__} [INFO]: " in summary
+
+def test_dump_timing_stats(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test dump_timing_stats prints or logs one line per function"""
+    @time_calc(stats=True)
+    def dumped_func():
+        pass
+
+    dumped_func()
+    dump_timing_stats()
+    assert "dumped_func: count=" in capsys.readouterr().out
+
+    dump_timing_stats(Logit())
+    assert "[INFO]: " in capsys.readouterr().out
+
+# --------------------------
+# Test Coroutine / Generator Timing
+# --------------------------
+def _parse_seconds(output: str, label: str) -> float:
+    """Helper: extract '<label>: X seconds' / 'time: X seconds' value from output"""
+    after = output.split(f"{label}: ", 1)[1]
+    return float(after.split(" seconds", 1)[0])
+
+def test_time_calc_coroutine_times_completion(capsys: CaptureFixture[str]):
+    """Test async def is timed until the coroutine completes"""
+    @time_calc
+    async def slow_coroutine() -> str:
+        await asyncio.sleep(0.05)
+        return "done"
+
+    coro = slow_coroutine()
+    assert capsys.readouterr().out == ""  # Creating the coroutine times nothing
+    assert asyncio.run(coro) == "done"
+    output = capsys.readouterr().out
+    assert _parse_seconds(output, "slow_coroutine execution time") >= 0.04
+
+def test_time_calc_coroutine_split(capsys: CaptureFixture[str]):
+    """Test split mode attributes awaiting to suspended time"""
+    @time_calc(split_suspended=True)
+    async def awaiting_coroutine() -> int:
+        await asyncio.sleep(0.05)
+        return 1
+
+    assert asyncio.run(awaiting_coroutine()) == 1
+    output = capsys.readouterr().out
+    assert _parse_seconds(output, "suspended") >= 0.04
+    assert _parse_seconds(output, "running") < 0.04
+
+def test_time_calc_coroutine_exception(capsys: CaptureFixture[str]):
+    """Test coroutine exceptions propagate and are still timed"""
+    @time_calc(split_suspended=True)
+    async def failing_coroutine():
+        await asyncio.sleep(0)
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        asyncio.run(failing_coroutine())
+    assert "failing_coroutine execution time:" in capsys.readouterr().out
+
+def test_time_calc_generator(capsys: CaptureFixture[str]):
+    """Test generators are timed from first next() to exhaustion, with send() support"""
+    @time_calc(split_suspended=True)
+    def echo_generator():
+        received = yield 1
+        yield received
+        return "finished"
+
+    gen = echo_generator()
+    assert capsys.readouterr().out == ""
+    assert next(gen) == 1
+    time.sleep(0.05)  # Consumer time counts as suspended
+    assert gen.send("sent") == "sent"
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    assert stop.value.value == "finished"
+
+    output = capsys.readouterr().out
+    assert "echo_generator execution time:" in output
+    assert _parse_seconds(output, "suspended") >= 0.04
+
+def test_time_calc_generator_throw_and_close(capsys: CaptureFixture[str]):
+    """Test throw() reaches the original generator and close() reports timing"""
+    seen: list[str] = []
+
+    @time_calc(split_suspended=True)
+    def guarded_generator():
+        while True:
+            try:
+                yield "tick"
+            except ValueError:
+                seen.append("caught")
+
+    gen = guarded_generator()
+    assert next(gen) == "tick"
+    assert gen.throw(ValueError("x")) == "tick"
+    gen.close()
+    assert seen == ["caught"]
+    assert "guarded_generator execution time:" in capsys.readouterr().out
+
+def test_time_calc_async_generator(capsys: CaptureFixture[str]):
+    """Test async generators are timed until exhausted"""
+    @time_calc(split_suspended=True)
+    async def ticker(n: int):
+        for i in range(n):
+            await asyncio.sleep(0.01)
+            yield i
+
+    async def consume() -> list[int]:
+        return [i async for i in ticker(3)]
+
+    assert asyncio.run(consume()) == [0, 1, 2]
+    output = capsys.readouterr().out
+    assert _parse_seconds(output, "ticker execution time") >= 0.025
+    assert _parse_seconds(output, "suspended") >= 0.025
+
+def test_time_calc_stats_coroutine_split():
+    """Test stats mode records total, running and suspended entries for coroutines"""
+    @time_calc(stats=True, split_suspended=True)
+    async def stats_coroutine():
+        await asyncio.sleep(0.01)
+
+    asyncio.run(stats_coroutine())
+    name = f"{stats_coroutine.__module__}.{stats_coroutine.__qualname__}"
+    total = get_timing_stats(name)
+    suspended = get_timing_stats(f"{name}:suspended")
+    running = get_timing_stats(f"{name}:running")
+    assert isinstance(total, TimingStats) and total.count == 1
+    assert isinstance(suspended, TimingStats) and suspended.max_ns >= 5_000_000
+    assert isinstance(running, TimingStats) and running.count == 1
+
+def test_logit_coroutine_logs_on_start_and_finish(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test Logit logs coroutine start when it runs and its completion time"""
+    logger = Logit(timing=True, split_suspended=True)
+
+    @logger
+    async def handler() -> int:
+        await asyncio.sleep(0.01)
+        return 5
+
+    coro = handler()
+    assert capsys.readouterr().out == ""
+    assert asyncio.run(coro) == 5
+    output = capsys.readouterr().out
+    assert "[INFO]: handler() was called" in output
+    assert "[INFO]: handler() finished in " in output
+    assert "suspended: " in output
+
+def test_logit_suspendable_call_site_location(capsys: CaptureFixture[str]):
+    """Test coroutine/generator start and finish lines report the caller, not logit.py"""
+    logger = Logit(timing=True)
+
+    @logger
+    async def handler() -> int:
+        return 5
+
+    @logger
+    async def agen():
+        yield 1
+
+    @logger
+    def gen():
+        yield 1
+
+    @logger
+    def plain() -> int:
+        return 3
+
+    async def main():
+        await handler()
+        async for _ in agen():
+            pass
+
+    asyncio.run(main())
+    list(gen())
+    plain()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 8
+    for line in lines:
+        assert f"@{__file__} [INFO]: " in line
+
+def test_logit_timing_sync(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test Logit(timing=True) logs completion time of plain functions"""
+    logger = Logit(timing=True)
+
+    @logger
+    def plain() -> int:
+        return 3
+
+    assert plain() == 3
+    output = capsys.readouterr().out
+    assert "[INFO]: plain() was called" in output
+    assert "[INFO]: plain() finished in " in output
+
+# --------------------------
+# Test time_calc Trace Mode
+# --------------------------
+@pytest.fixture
+def clean_trace():
+    """Fixture: start and end each trace test with an empty call tree"""
+    reset_trace()
+    yield get_call_tree()
+    reset_trace()
+
+def test_trace_call_tree_self_time(clean_trace, capsys: CaptureFixture[str]):
+    """Test nested traced calls build a tree with inclusive and self time"""
+    @time_calc(trace=True)
+    def leaf():
+        time.sleep(0.02)
+
+    @time_calc(trace=True)
+    def parent():
+        time.sleep(0.01)
+        leaf()
+        leaf()
+
+    parent()
+    assert capsys.readouterr().out == ""
+
+    parent_node = clean_trace.children[parent.__qualname__]
+    leaf_node = parent_node.children[leaf.__qualname__]
+    assert parent_node.count == 1
+    assert leaf_node.count == 2
+    assert leaf_node.inclusive_ns >= 40_000_000
+    assert parent_node.inclusive_ns >= leaf_node.inclusive_ns
+    # Self time excludes children: roughly the 10ms sleep
+    assert 5_000_000 <= parent_node.exclusive_ns < 35_000_000
+
+    report = trace_report().splitlines()
+    assert report[0].startswith(f"{parent.__qualname__} count=1")
+    assert report[1].startswith(f"  {leaf.__qualname__} count=2")
+
+def test_trace_threads_are_independent(clean_trace):
+    """Test spans opened in other threads do not nest under this thread's span"""
+    @time_calc(trace=True)
+    def worker():
+        pass
+
+    @time_calc(trace=True)
+    def spawner():
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+
+    spawner()
+    assert set(clean_trace.children) == {spawner.__qualname__, worker.__qualname__}
+    assert not clean_trace.children[spawner.__qualname__].children
+
+def test_trace_asyncio_tasks(clean_trace):
+    """Test child tasks attach to the span active when they were created"""
+    @time_calc(trace=True)
+    async def child(delay: float):
+        await asyncio.sleep(delay)
+
+    @time_calc(trace=True)
+    async def root():
+        await asyncio.gather(child(0.01), child(0.02))
+
+    asyncio.run(root())
+    root_node = clean_trace.children[root.__qualname__]
+    child_node = root_node.children[child.__qualname__]
+    assert child_node.count == 2
+    assert root_node.exclusive_ns >= 0
+
+def test_trace_generator_leaf(clean_trace):
+    """Test traced generators are recorded under the consuming span"""
+    @time_calc(trace=True)
+    def numbers():
+        yield from range(3)
+
+    @time_calc(trace=True)
+    def consumer() -> int:
+        return sum(numbers())
+
+    assert consumer() == 3
+    consumer_node = clean_trace.children[consumer.__qualname__]
+    assert consumer_node.children[numbers.__qualname__].count == 1
+
+def test_trace_chrome_export(clean_trace, tmp_path: Path):
+    """Test Chrome trace-event JSON export"""
+    @time_calc(trace=True)
+    def exported():
+        pass
+
+    exported()
+    exported()
+    document = chrome_trace()
+    events = document["traceEvents"]
+    assert len(events) == 2
+    assert events[0]["name"] == exported.__qualname__
+    assert events[0]["ph"] == "X"
+
+    out_file = tmp_path / "trace.json"
+    dump_chrome_trace(str(out_file))
+    assert json.loads(out_file.read_text(encoding="utf8"))["traceEvents"][1]["name"] == exported.__qualname__
+
+# --------------------------
+# Test SamplingProfiler
+# --------------------------
+def _busy_spin(seconds: float) -> int:
+    """Helper: burn CPU for the given time"""
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        count += 1
+    return count
+
+def test_sampling_profiler_context_manager(tmp_path: Path):
+    """Test profiling a hot section collects folded stacks and writes output"""
+    out_file = tmp_path / "hot.folded"
+    with SamplingProfiler(interval=0.001, output=str(out_file)) as profiler:
+        _ = _busy_spin(0.2)
+
+    assert profiler.samples > 0
+    folded = profiler.folded()
+    assert "_busy_spin (test_logit.py:" in folded
+    # Folded format: semicolon-joined stack, space, count
+    first_stack, first_count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(first_count) > 0
+    assert "test_sampling_profiler_context_manager" in first_stack
+    assert out_file.read_text(encoding="utf8").strip() == folded
+
+def test_sampling_profiler_only_starting_thread():
+    """Test default mode ignores threads other than the starting one"""
+    stop = threading.Event()
+
+    def other_thread_spin():
+        while not stop.is_set():
+            _ = _busy_spin(0.01)
+
+    worker = threading.Thread(target=other_thread_spin)
+    worker.start()
+    try:
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        time.sleep(0.1)
+        profiler.stop()
+        assert "other_thread_spin" not in profiler.folded()
+
+        all_profiler = SamplingProfiler(interval=0.001, all_threads=True)
+        with all_profiler:
+            time.sleep(0.1)
+        assert "other_thread_spin" in all_profiler.folded()
+    finally:
+        stop.set()
+        worker.join()
+
+def test_sampling_profiler_start_stop_reset():
+    """Test start/stop are idempotent and reset clears samples"""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.stop()  # Not started: no-op
+    profiler.start()
+    profiler.start()
+    _ = _busy_spin(0.05)
+    profiler.stop()
+    profiler.stop()
+    assert profiler.samples > 0
+    profiler.reset()
+    assert profiler.samples == 0
+    assert profiler.folded() == ""
+
+def test_sampling_profiler_folded_while_sampling():
+    """Test folded() can be read while the sampler keeps adding new stacks"""
+    def descend(depth: int, profiler: SamplingProfiler) -> str:
+        if depth:
+            return descend(depth - 1, profiler)
+        return profiler.folded()
+
+    with SamplingProfiler(interval=0.0001) as profiler:
+        deadline = time.perf_counter() + 0.2
+        depth = 0
+        while time.perf_counter() < deadline:
+            _ = descend(depth % 40, profiler)
+            depth += 1
+    counts = [int(line.rsplit(" ", 1)[1]) for line in profiler.folded().splitlines()]
+    assert sum(counts) == profiler.samples > 0
+
+# --------------------------
+# Test Memory Profiling
+# --------------------------
+def test_memory_profile_peak_net_and_sites():
+    """Test MemoryProfile reports peak/net bytes and the allocating line"""
+    assert not tracemalloc.is_tracing()
+    with patch("builtins.print") as mock_print:
+        with MemoryProfile("block", top_sites=5) as profile:
+            temporary = bytearray(2_000_000)
+            del temporary
+            kept = bytearray(300_000)
+    assert profile.sampled
+    assert profile.peak_bytes >= 2_000_000
+    assert 300_000 <= profile.net_bytes < 310_000
+    site, size, _ = profile.sites[0]
+    assert site.startswith(f"{__file__}:") and size >= 300_000
+    assert mock_print.call_args[0][0].startswith("block memory: peak=1.9MiB net=293.")
+    assert not tracemalloc.is_tracing()  # Stopped again after the last profiled block
+    assert len(kept) == 300_000
+
+def test_memory_profile_nested_peak():
+    """Test an inner profiled call does not hide the outer block's earlier peak"""
+    @mem_calc(top_sites=0)
+    def small() -> bytes:
+        return bytes(1000)
+
+    with patch("builtins.print"):
+        with MemoryProfile("outer", top_sites=0) as outer:
+            big = bytearray(1_000_000)
+            del big
+            _ = small()
+    assert outer.peak_bytes >= 1_000_000
+
+def test_mem_calc_stats_sampling():
+    """Test stats mode aggregates 1 call in N into the memory registry"""
+    reset_memory_stats()
+
+    @mem_calc(stats=True, sample_every=4, top_sites=1)
+    def allocate() -> bytearray:
+        return bytearray(50_000)
+
+    with patch("builtins.print") as mock_print:
+        for _ in range(10):
+            _ = allocate()
+    mock_print.assert_not_called()
+
+    stats = get_memory_stats(f"{__name__}.test_mem_calc_stats_sampling.<locals>.allocate")
+    assert isinstance(stats, MemoryStats)
+    assert (stats.calls, stats.count) == (10, 3)
+    assert stats.min_net >= 50_000 and stats.max_peak >= 50_000
+    assert stats.top_sites(1)[0][1] >= 3 * 50_000
+    assert "calls=10 profiled=3" in memory_report()
+
+    logger = Logit(location=False)
+    with patch.object(logger, "_notify") as mock_notify:
+        dump_memory_stats(logger)
+    assert any("allocate: calls=10" in c[0][0] for c in mock_notify.call_args_list)
+
+    reset_memory_stats()
+    assert stats.count == 0 and memory_report() == ""
+
+def test_mem_calc_default_sampling_and_qualified_key():
+    """Test mem_calc profiles 1 call in 100 by default, counted per module.qualname,
+    without allocation-site snapshots"""
+    class First:
+        @mem_calc
+        def run(self) -> bytes:
+            return bytes(1000)
+
+    class Second:
+        @mem_calc()
+        def run(self) -> bytes:
+            return bytes(1000)
+
+    with patch("builtins.print") as mock_print, \
+            patch("tracemalloc.take_snapshot", side_effect=tracemalloc.take_snapshot) as mock_snapshot:
+        for _ in range(150):
+            _ = First().run()
+        _ = Second().run()
+    mock_snapshot.assert_not_called()
+    assert mock_print.call_count == 3  # Calls 1 and 101 of First.run, call 1 of Second.run
+    assert " top: " not in mock_print.call_args[0][0]
+    assert mock_print.call_args[0][0].startswith("run memory: peak=")
+
+    prefix = f"{__name__}.test_mem_calc_default_sampling_and_qualified_key.<locals>"
+    first, second = get_memory_stats(f"{prefix}.First.run"), get_memory_stats(f"{prefix}.Second.run")
+    assert isinstance(first, MemoryStats) and isinstance(second, MemoryStats)
+    assert (first.calls, second.calls) == (150, 1)
+    assert get_memory_stats("run") is None
+
+def test_memory_periodic_summary_location():
+    """Test periodic memory summaries are located at the function/block, not logit.py"""
+    logger = Logit()
+
+    @mem_calc(stats=True, sample_every=1, top_sites=0, logger=logger, report_interval=0)
+    def summarized() -> bytes:
+        return bytes(100)
+
+    with patch.object(logger, "_notify") as mock_notify:
+        _ = summarized()
+        with MemoryProfile("summarized block", stats=True, top_sites=0, logger=logger, report_interval=0):
+            pass
+        block_line = inspect.currentframe().f_lineno - 2  # type: ignore
+    function_line, block_summary = (c[0][0] for c in mock_notify.call_args_list)
+    lineno = inspect.unwrap(summarized).__code__.co_firstlineno
+    assert f" {lineno:03d}@{__file__} [INFO]: " in function_line and "summarized: calls=1" in function_line
+    assert f" {block_line:03d}@{__file__} [INFO]: summarized block: calls=" in block_summary
+
+def test_mem_calc_disabled_and_suspendable():
+    """Test disabled mem_calc returns the function; coroutines are rejected"""
+    def plain():
+        pass
+    assert mem_calc(plain, enabled=False) is plain
+
+    async def coroutine():
+        pass
+    with pytest.raises(TypeError):
+        _ = mem_calc(coroutine)
+
+def test_memory_stats_bounded_sites():
+    """Test MemoryStats keeps a bounded number of allocation sites"""
+    stats = MemoryStats("sites", max_sites=8)
+    for i in range(100):
+        stats.add(100, 10, [(f"file.py:{i}", i, 1)])
+    assert len(stats.top_sites(100)) <= 8
+    assert stats.top_sites(1)[0] == ("file.py:99", 99, 1)
+
+# --------------------------
+# Test Debug Print Switch
+# --------------------------
+def test_set_debug_print_disables_output(capsys: CaptureFixture[str]):
+    """Test set_debug_print(False) silences po/pv/pe without frame inspection"""
+    value = 1
+    try:
+        set_debug_print(False)
+        assert not is_debug_print_enabled()
+        with patch("inspect.currentframe") as mock_currentframe:
+            po("hidden")
+            pv(value)
+            pe(value + 1)
+            mock_currentframe.assert_not_called()
+        assert capsys.readouterr().out == ""
+    finally:
+        set_debug_print(True)
+
+    assert is_debug_print_enabled()
+    po("visible")
+    assert "visible" in capsys.readouterr().out
+
+def test_debug_print_env_disables_until_enabled():
+    """Test PYUTILITIES_DEBUG_PRINT=0 silences po/pv/pe and set_debug_print(True) turns them back on"""
+    code = (
+        "from src.pyutilities import logit\n"
+        "assert not logit.is_debug_print_enabled()\n"
+        "logit.po('should not print')\n"
+        "logit.set_debug_print(True)\n"
+        "value = 3\n"
+        "logit.po('visible')\n"
+        "logit.pv(value)\n"
+        "logit.pe(value + 1)\n"
+    )
+    env = dict(os.environ, PYUTILITIES_DEBUG_PRINT="0")
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    assert len(lines) == 3 and "should not print" not in result.stdout
+    assert lines[0].endswith(" visible")
+    assert lines[1].endswith(" = 3") and lines[2].endswith(" = 4")
+
+# --------------------------
+# Test Debug Print Output
+# --------------------------
+@pytest.fixture
+def restore_debug_output():
+    """Fixture: put po/pv/pe output back on unbuffered stdout after the test"""
+    yield
+    set_debug_output()
+
+def test_debug_output_memory_buffered(restore_debug_output: None):
+    """Test buffered memory target: lines are held back until the batch is full or flushed"""
+    output = set_debug_output("memory", buffer_lines=3)
+    assert isinstance(output, DebugOutput) and get_debug_output() is output
+    value = 7
+    po("first")
+    pv(value)
+    assert isinstance(output._stream, io.StringIO)
+    assert output._stream.getvalue() == ""  # Still buffered
+    pe(value * 2)
+    lines = output._stream.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[0].endswith(" first") and lines[1].endswith(" value = 7")
+    assert lines[2].endswith(" value * 2 = 14")
+
+    po("pending", endstr="")
+    flush_debug_output()
+    assert output.getvalue().endswith(" pending")
+
+def test_debug_output_batched_writes(restore_debug_output: None):
+    """Test one stream write per batch of lines"""
+    stream = Mock(spec=io.StringIO)
+    _ = set_debug_output(stream, buffer_lines=10)
+    for i in range(25):
+        po(i)
+    assert stream.write.call_count == 2
+    flush_debug_output()
+    assert stream.write.call_count == 3
+    stream.flush.assert_called_once()
+    written = "".join(c[0][0] for c in stream.write.call_args_list)
+    assert written.count("\n") == 25
+
+def test_debug_output_stderr_and_file(tmp_path: Path, capsys: CaptureFixture[str], restore_debug_output: None):
+    """Test stderr and file targets (file is appended to and closed on redirect)"""
+    _ = set_debug_output("stderr")
+    po("to stderr")
+    captured = capsys.readouterr()
+    assert captured.out == "" and "to stderr" in captured.err
+
+    log_path = tmp_path / "debug.log"
+    output = set_debug_output(str(log_path), buffer_lines=100)
+    po("to file")
+    assert log_path.read_text(encoding="utf8") == ""
+    _ = set_debug_output()
+    assert output._stream is not None and output._stream.closed
+    assert log_path.read_text(encoding="utf8").endswith(" to file\n")
+
+def test_debug_output_sink(restore_debug_output: None):
+    """Test LogSink target: each line becomes an INFO record"""
+    sink = MemorySink()
+    _ = set_debug_output(sink)
+    po("into sink")
+    assert len(sink.records) == 1
+    record = sink.records[0]
+    assert record.level == LogLevel.INFO
+    assert record.line.endswith(" into sink") and record.location is not None
+    assert record.line.startswith(f"{record.location[0]}@{record.location[1]} ")
+
+def test_debug_output_direct_use(tmp_path: Path):
+    """Test a DebugOutput used on its own (independent of the po/pv/pe target)"""
+    memory = DebugOutput("memory", buffer_lines=2)
+    memory.write("042@/test/file.py", "a")
+    memory.write("043@/test/file.py", "b", end="")
+    assert memory.getvalue() == "042@/test/file.py a\n043@/test/file.py b"
+
+    log_path = tmp_path / "direct.log"
+    to_file = DebugOutput(str(log_path))
+    to_file.write("007@/test/file.py", "line")
+    to_file.close()
+    assert log_path.read_text(encoding="utf8") == "007@/test/file.py line\n"
+
+def test_debug_output_atomic_lines(restore_debug_output: None):
+    """Test lines written from many threads never interleave"""
+    output = set_debug_output("memory", buffer_lines=64)
+
+    def worker(n: int):
+        for i in range(200):
+            po(f"thread {n} line {i}", "x" * 50)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 1600
+    assert all(line.endswith(", " + "x" * 50) for line in lines)
+
 # --------------------------
 # Test LogLevel Enum
 # --------------------------
@@ -676,6 +1580,89 @@ def test_logit_empty_logfile(capsys: CaptureFixture[str], mock_frameinfo: Mock):
     captured = capsys.readouterr()
     assert "[ERROR]: Empty logfile test" in captured.out
 
+def test_logit_printf_args(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test printf-style arguments are applied to the message template"""
+    logger = Logit()
+    logger.warn("user %s failed %d times", "alice", 3)
+    captured = capsys.readouterr()
+    assert "[WARN]: user alice failed 3 times" in captured.out
+
+def test_logit_callable_message(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test zero-argument callable messages are evaluated on emit"""
+    logger = Logit()
+    logger.err(lambda: f"computed {6 * 7}")
+    captured = capsys.readouterr()
+    assert "[ERROR]: computed 42" in captured.out
+
+def test_logit_lazy_message_not_evaluated_when_filtered(capsys: CaptureFixture[str]):
+    """Test filtered records skip formatting, timestamping and caller lookup"""
+    class ExpensiveArg:
+        def __str__(self) -> str:
+            raise AssertionError("formatted a filtered record")
+
+    expensive_callable = Mock(return_value="never")
+    logger = Logit(level=LogLevel.ERROR)
+    with patch("src.pyutilities.logit._get_caller_location") as mock_location, \
+         patch("time.strftime") as mock_strftime:
+        logger.info("value %s", ExpensiveArg())
+        logger.warn(expensive_callable)
+
+    expensive_callable.assert_not_called()
+    mock_location.assert_not_called()
+    mock_strftime.assert_not_called()
+    assert capsys.readouterr().out == ""
+
+def test_logit_format_error(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test a broken template is reported instead of raising"""
+    logger = Logit()
+    logger.info("%d items", "not a number")
+    captured = capsys.readouterr()
+    assert "[INFO]: [Format Error]: TypeError" in captured.out
+
+def test_logit_percent_without_args(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test plain messages containing % are left untouched"""
+    logger = Logit()
+    logger.info("100% done")
+    captured = capsys.readouterr()
+    assert "[INFO]: 100% done" in captured.out
+
+def test_logit_is_enabled_for():
+    """Test is_enabled_for() mirrors the level threshold"""
+    logger = Logit(level=LogLevel.WARN)
+    assert not logger.is_enabled_for(LogLevel.INFO)
+    assert logger.is_enabled_for(LogLevel.WARN)
+    assert logger.is_enabled_for(LogLevel.ERROR)
+
+def test_logit_disabled_decorator_returns_original(capsys: CaptureFixture[str]):
+    """Test Logit(enabled=False) neither wraps functions nor emits records"""
+    logger = Logit(enabled=False)
+
+    def plain_func() -> int:
+        return 1
+
+    assert logger(plain_func) is plain_func
+    logger.err("silenced")
+    assert not logger.is_enabled_for(LogLevel.ERROR)
+    assert capsys.readouterr().out == ""
+
+def test_logit_location_disabled(capsys: CaptureFixture[str]):
+    """Test Logit(location=False) skips caller location capture entirely"""
+    with patch("src.pyutilities.logit._get_caller_location") as mock_location, \
+         patch("time.strftime", return_value="2026-01-23 12:34:56"):
+        logger = Logit(location=False)
+        logger.info("No location")
+        captured = capsys.readouterr()
+        assert "2026-01-23 12:34:56 [INFO]: No location" in captured.out
+        mock_location.assert_not_called()
+
+def test_logit_real_location(capsys: CaptureFixture[str]):
+    """Test Logit reports the line of the info() call site"""
+    logger = Logit()
+    expected_lineno = inspect.currentframe().f_lineno + 1
+    logger.info("Real location")
+    captured = capsys.readouterr()
+    assert f"{expected_lineno:03d}@{__file__} [INFO]: Real location" in captured.out
+
 def test_logit_caller_frame_none(capsys: CaptureFixture[str]):
     """Test Logit _log with caller_frame = None (unknown location)"""
     # Mock current frame with no f_back
@@ -687,6 +1674,1083 @@ def test_logit_caller_frame_none(capsys: CaptureFixture[str]):
         captured = capsys.readouterr()
         assert "unknown@unknown [INFO]: Unknown location test" in captured.out
 
+
+# --------------------------
+# Test AsyncFileWriter / Logit Asynchronous Mode
+# --------------------------
+def _wait_queue_empty(writer: AsyncFileWriter, timeout: float = 2.0) -> None:
+    """Helper: wait until the writer thread has taken every queued item"""
+    deadline = time.monotonic() + timeout
+    while not writer._queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    # Give the thread time to finish draining and block on the write lock
+    time.sleep(0.02)
+
+def test_logit_async_write_flush(tmp_path: Path, mock_frameinfo: Mock) -> None:
+    """Test Logit asynchronous mode writes all records after flush()"""
+    log_file: Path = tmp_path / "async_log.txt"
+    logger = Logit(level=LogLevel.INFO, logfile=str(log_file), async_write=True)
+    try:
+        for i in range(100):
+            logger.info(f"async message {i}")
+        logger.flush()
+
+        lines = log_file.read_text(encoding="utf8").splitlines()
+        assert len(lines) == 100
+        assert lines[0].endswith("[INFO]: async message 0")
+        assert lines[-1].endswith("[INFO]: async message 99")
+        assert logger.dropped == 0
+    finally:
+        logger.close()
+
+def test_logit_async_close_idempotent(tmp_path: Path, mock_frameinfo: Mock) -> None:
+    """Test close() drains the queue and is safe to call twice; later records are ignored"""
+    log_file: Path = tmp_path / "async_close.txt"
+    logger = Logit(logfile=str(log_file), async_write=True)
+    logger.warn("before close")
+    logger.close()
+    logger.close()
+    logger.warn("after close")
+
+    content = log_file.read_text(encoding="utf8")
+    assert "[WARN]: before close" in content
+    assert "after close" not in content
+
+def test_async_writer_drop_newest(tmp_path: Path) -> None:
+    """Test drop_newest policy discards incoming records when the queue is full"""
+    log_file: Path = tmp_path / "drop_newest.txt"
+    writer = AsyncFileWriter(str(log_file), queue_size=2, policy="drop_newest")
+    try:
+        # Stall the writer thread on its first batch
+        with writer._lock:
+            writer.put("first")
+            _wait_queue_empty(writer)
+            for line in ("a", "b", "c", "d"):
+                writer.put(line)
+        writer.flush()
+    finally:
+        writer.close()
+
+    assert log_file.read_text(encoding="utf8").splitlines() == ["first", "a", "b"]
+    assert writer.dropped == 2
+
+def test_async_writer_drop_oldest(tmp_path: Path) -> None:
+    """Test drop_oldest policy evicts the oldest queued records"""
+    log_file: Path = tmp_path / "drop_oldest.txt"
+    writer = AsyncFileWriter(str(log_file), queue_size=2, policy="drop_oldest")
+    try:
+        with writer._lock:
+            writer.put("first")
+            _wait_queue_empty(writer)
+            for line in ("a", "b", "c", "d"):
+                writer.put(line)
+        writer.flush()
+    finally:
+        writer.close()
+
+    assert log_file.read_text(encoding="utf8").splitlines() == ["first", "c", "d"]
+    assert writer.dropped == 2
+
+def test_async_writer_invalid_policy(tmp_path: Path) -> None:
+    """Test unknown overflow policy is rejected"""
+    with pytest.raises(ValueError, match="Unknown overflow policy"):
+        _ = AsyncFileWriter(str(tmp_path / "x.txt"), policy="spill")  # type: ignore
+
+def test_logit_sync_mode_flush_close_noop(mock_frameinfo: Mock) -> None:
+    """Test flush()/close()/dropped are harmless without a background writer"""
+    logger = Logit()
+    logger.flush()
+    logger.close()
+    assert logger.dropped == 0
+
+# --------------------------
+# Test RotatingFile / Logit Rotation
+# --------------------------
+def test_rotating_file_size_rotation_and_retention(tmp_path: Path) -> None:
+    """Test size-based rotation keeps only backup_count plain-text backups"""
+    log_file = tmp_path / "size.log"
+    rotating = RotatingFile(str(log_file), max_bytes=100, backup_count=2)
+    try:
+        for i in range(20):
+            rotating.write(f"line {i:02d} " + "x" * 30 + "\n")
+    finally:
+        rotating.close()
+
+    backups = rotating.rotated_files()
+    assert len(backups) == 2
+    assert log_file.stat().st_size <= 100
+    # Newest records stay in the active file, nothing is lost in the kept window
+    assert "line 19" in log_file.read_text(encoding="utf8")
+    assert "line 17" in Path(backups[-1]).read_text(encoding="utf8")
+
+def test_rotating_file_gzip_background(tmp_path: Path) -> None:
+    """Test rotated files are gzip-compressed by the background thread"""
+    log_file = tmp_path / "zip.log"
+    rotating = RotatingFile(str(log_file), max_bytes=50, compress="gzip")
+    try:
+        rotating.write("first " + "a" * 40 + "\n")
+        rotating.write("second " + "b" * 40 + "\n")
+        rotating.wait_compression()
+    finally:
+        rotating.close()
+
+    backups = rotating.rotated_files()
+    assert len(backups) == 1 and backups[0].endswith(".gz")
+    with gzip.open(backups[0], "rt", encoding="utf8") as f:
+        assert f.read().startswith("first ")
+    assert log_file.read_text(encoding="utf8").startswith("second ")
+
+def test_rotating_file_compression_with_retention(tmp_path: Path, capsys: CaptureFixture[str]) -> None:
+    """Test compression + backup_count keeps the newest archives (queued files are not deleted)"""
+    log_file = tmp_path / "kept.log"
+    rotating = RotatingFile(str(log_file), max_bytes=50, backup_count=2, compress="gzip")
+    try:
+        for i in range(14):
+            rotating.write(f"rec{i:02d} " + "x" * 40 + "\n")
+    finally:
+        rotating.close()
+
+    assert "Log Rotation Error" not in capsys.readouterr().out
+    backups = rotating.rotated_files()
+    assert len(backups) == 2 and all(backup.endswith(".gz") for backup in backups)
+    kept = []
+    for backup in backups:
+        with gzip.open(backup, "rt", encoding="utf8") as f:
+            kept.append(f.read()[:5])
+    assert kept == ["rec11", "rec12"]
+    assert log_file.read_text(encoding="utf8").startswith("rec13")
+
+def test_rotating_file_order_from_names(tmp_path: Path) -> None:
+    """Test rotated files are ordered by name timestamp and numeric counter, not mtime"""
+    log_file = tmp_path / "order.log"
+    names = ["order.log.20260101-000000-10.gz", "order.log.20260101-000000-2.gz",
+             "order.log.20260101-000000.gz", "order.log.20251231-235959"]
+    for age, name in enumerate(names):
+        path = tmp_path / name
+        _ = path.write_text("x", encoding="utf8")
+        os.utime(path, (1000 + age, 1000 + age))  # mtime order is the reverse of name order
+    rotating = RotatingFile(str(log_file))
+    rotating.close()
+    assert [Path(f).name for f in rotating.rotated_files()] == names[::-1]
+
+def test_rotating_file_time_rotation_lzma(tmp_path: Path) -> None:
+    """Test time-based rotation with lzma compression"""
+    log_file = tmp_path / "time.log"
+    rotating = RotatingFile(str(log_file), rotate_interval=3600, compress="lzma")
+    try:
+        rotating.write("old record\n")
+        rotating._next_rollover = 0  # Interval elapsed
+        rotating.write("new record\n")
+    finally:
+        rotating.close()
+
+    backups = rotating.rotated_files()
+    assert len(backups) == 1 and backups[0].endswith(".xz")
+    with lzma.open(backups[0], "rt", encoding="utf8") as f:
+        assert f.read() == "old record\n"
+    assert log_file.read_text(encoding="utf8") == "new record\n"
+
+def test_rotating_file_invalid_compression(tmp_path: Path) -> None:
+    """Test unknown compression type is rejected"""
+    with pytest.raises(ValueError, match="Unknown compression type"):
+        _ = RotatingFile(str(tmp_path / "x.log"), compress="zip")  # type: ignore
+
+def test_logit_rotation_sync_and_async(tmp_path: Path, mock_frameinfo: Mock) -> None:
+    """Test Logit rotation settings apply in synchronous and asynchronous modes"""
+    for async_write in (False, True):
+        log_file = tmp_path / f"logit_{async_write}.log"
+        logger = Logit(
+            logfile=str(log_file), async_write=async_write,
+            max_bytes=200, backup_count=3, compress="gzip"
+        )
+        for i in range(30):
+            logger.info("record %d", i)
+            logger.flush()  # One batch per record (batches are never split)
+        logger.close()
+
+        backups = sorted(str(p) for p in tmp_path.glob(f"logit_{async_write}.log.*"))
+        assert 1 <= len(backups) <= 3
+        assert all(b.endswith(".gz") for b in backups)
+        assert "record 29" in log_file.read_text(encoding="utf8")
+
+# --------------------------
+# Test LogCollector (Multi-Process Mode)
+# --------------------------
+def _collector_worker(record_queue, worker_id: int, count: int) -> None:
+    """Helper: worker process logging through the collector queue"""
+    logger = Logit(collector=record_queue, location=False)
+    logger._notify = lambda log_str: None  # Keep worker consoles quiet
+    for i in range(count):
+        logger.info("worker %d record %d %s", worker_id, i, "y" * 50)
+
+def test_log_collector_multi_process(tmp_path: Path) -> None:
+    """Test records from several processes arrive as whole, non-interleaved lines"""
+    log_file = tmp_path / "collected.log"
+    collector = LogCollector(str(log_file))
+    with collector:
+        workers = [
+            collector._context.Process(target=_collector_worker, args=(collector.queue, w, 200))
+            for w in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    lines = log_file.read_text(encoding="utf8").splitlines()
+    assert len(lines) == 800
+    assert all(line.endswith("y" * 50) for line in lines)
+    for w in range(4):
+        own = [line for line in lines if f"worker {w} record" in line]
+        # Per-process ordering is preserved
+        assert [int(line.split("record ")[1].split()[0]) for line in own] == list(range(200))
+
+def test_logit_collector_accepts_instance(tmp_path: Path, mock_frameinfo: Mock) -> None:
+    """Test Logit(collector=LogCollector) uses the collector queue, not the logfile"""
+    log_file = tmp_path / "collected_direct.log"
+    local_file = tmp_path / "local.log"
+    with LogCollector(str(log_file)) as collector:
+        logger = Logit(logfile=str(local_file), collector=collector)
+        logger.err("via collector")
+        logger.close()  # Send the locally batched records before the collector stops
+    assert "[ERROR]: via collector" in log_file.read_text(encoding="utf8")
+    assert not local_file.exists()
+
+# --------------------------
+# Test Flight Recorder (Ring Buffer)
+# --------------------------
+def test_logit_ring_buffers_until_error(capsys: CaptureFixture[str], tmp_path: Path, mock_frameinfo: Mock):
+    """Test records below ERROR stay in memory and are dumped before the error"""
+    log_file = tmp_path / "ring.log"
+    logger = Logit(logfile=str(log_file), ring_size=3)
+    for i in range(5):
+        logger.info("step %d", i)
+    assert capsys.readouterr().out == ""
+    assert not log_file.exists()
+
+    logger.err("failure")
+    lines = log_file.read_text(encoding="utf8").splitlines()
+    # Only the last 3 records survive, oldest first, then the trigger record
+    assert [line.split(": ", 1)[1] for line in lines] == ["step 2", "step 3", "step 4", "failure"]
+    assert "042@/test/file.py [INFO]: step 2" in lines[0]
+    assert "[ERROR]: failure" in capsys.readouterr().out
+
+    # The ring was emptied by the dump
+    logger.err("second failure")
+    assert log_file.read_text(encoding="utf8").splitlines()[-1].endswith("[ERROR]: second failure")
+    assert len(log_file.read_text(encoding="utf8").splitlines()) == 5
+
+def test_logit_ring_unformatted_defers_formatting(mock_frameinfo: Mock):
+    """Test unformatted mode evaluates messages only when dumped"""
+    expensive = Mock(return_value="expensive detail")
+    logger = Logit(ring_size=10)
+    with patch.object(logger, "_notify") as mock_notify:
+        logger.warn(expensive)
+        expensive.assert_not_called()
+        assert logger.dump_ring() == 1
+        expensive.assert_called_once()
+        assert "[WARN]: expensive detail" in mock_notify.call_args[0][0]
+        assert logger.dump_ring() == 0
+
+def test_logit_ring_formatted_snapshot(mock_frameinfo: Mock):
+    """Test formatted mode snapshots the message at record time"""
+    state = {"value": 1}
+    logger = Logit(ring_size=10, ring_formatted=True, ring_trigger=LogLevel.WARN)
+    with patch.object(logger, "_notify") as mock_notify:
+        logger.info("value=%s", state["value"])
+        logger.info(lambda: f"lazy value={state['value']}")
+        state["value"] = 2
+        logger.warn("trigger")
+        emitted = [call[0][0] for call in mock_notify.call_args_list]
+    assert emitted[0].endswith("[INFO]: value=1")
+    assert emitted[1].endswith("[INFO]: lazy value=1")
+    assert emitted[2].endswith("[WARN]: trigger")
+
+def test_logit_ring_disabled_dump_noop():
+    """Test dump_ring() without a ring buffer does nothing"""
+    assert Logit().dump_ring() == 0
+
+# --------------------------
+# Test JSON Lines Output
+# --------------------------
+def test_json_line_encoder_layout():
+    """Test encoded lines are valid JSON with fixed keys first and flattened fields"""
+    encoder = JsonLineEncoder()
+    line = encoder.encode(
+        "2024-01-01 00:00:00", LogLevel.WARN, (42, "/test/file.py"), 'say "hi" 你好',
+        {"user": "bob", "count": 3, "ratio": 0.5, "ok": True, "none": None,
+         "tags": ["a", 1], "msg": "clash", "obj": Path("x")}
+    )
+    assert line.startswith('{"ts":"2024-01-01 00:00:00","level":"WARN","line":42,"file":"/test/file.py",')
+    assert "你好" in line  # Non-ASCII kept as is
+    record = json.loads(line)
+    assert record["msg"] == 'say "hi" 你好'
+    assert record["field_msg"] == "clash"
+    assert record["tags"] == ["a", 1]
+    assert record["obj"] == "x"  # Unknown types fall back to str()
+    assert (record["count"], record["ratio"], record["ok"], record["none"]) == (3, 0.5, True, None)
+
+    no_location = json.loads(encoder.encode("t", LogLevel.INFO, None, "m"))
+    assert no_location == {"ts": "t", "level": "INFO", "msg": "m"}
+
+def test_json_line_encoder_non_finite_floats():
+    """Test NaN/Infinity field values are written as strings (strict JSON)"""
+    encoder = JsonLineEncoder()
+    line = encoder.encode("t", LogLevel.INFO, None, "m",
+                          {"nan": float("nan"), "inf": float("inf"), "nested": [1.5, {"x": float("-inf")}]})
+    assert "NaN" not in line and "Infinity" not in line
+    record = json.loads(line, parse_constant=lambda name: pytest.fail(f"non-standard JSON: {name}"))
+    assert (record["nan"], record["inf"], record["nested"]) == ("nan", "inf", [1.5, {"x": "-inf"}])
+
+def test_logit_reserved_field_names(mock_frameinfo: Mock):
+    """Test fields named like the positional parameters (msg, level, ...) are accepted"""
+    memory = MemorySink()
+    logger = Logit(output_format="json", sinks=[memory])
+    logger.info("plain", msg="m", level="debug", ts=1)
+    logger.warn("warned", msg="w")
+    logger.err("failed", level=5)
+    logger._log_at(None, LogLevel.INFO, "located", location="here", level="x")
+    first, second, third, fourth = (json.loads(line) for line in memory.lines)
+    assert (first["msg"], first["field_msg"], first["field_level"], first["field_ts"]) == ("plain", "m", "debug", 1)
+    assert first["level"] == "INFO" and second["field_msg"] == "w"
+    assert third["level"] == "ERROR" and third["field_level"] == 5
+    assert fourth["location"] == "here" and fourth["field_level"] == "x"
+
+def test_logit_json_output_and_reader(tmp_path: Path, mock_frameinfo: Mock):
+    """Test Logit JSON Lines mode round-trips through read_json_lines"""
+    log_file = tmp_path / "app.jsonl"
+    logger = Logit(logfile=str(log_file), output_format="json")
+    with patch.object(logger, "_notify"):
+        logger.info("user %s logged in", "bob", request_id="r-1", attempt=2)
+        logger.warn("slow")
+        logger.err(lambda: "boom", code=500)
+    with open(log_file, "a", encoding="utf8") as log:
+        _ = log.write("\nnot json\n")  # Blank and corrupt lines are skipped
+
+    records = list(read_json_lines(str(log_file)))
+    assert len(records) == 3
+    assert records[0]["msg"] == "user bob logged in"
+    assert records[0]["request_id"] == "r-1" and records[0]["attempt"] == 2
+    assert records[0]["line"] == 42 and records[0]["file"] == "/test/file.py"
+    assert [r["level"] for r in read_json_lines(str(log_file), LogLevel.WARN)] == ["WARN", "ERROR"]
+
+def test_read_json_lines_compressed(tmp_path: Path):
+    """Test the reader streams gzip-compressed rotated files"""
+    log_file = tmp_path / "app.jsonl.gz"
+    encoder = JsonLineEncoder()
+    with gzip.open(log_file, "wt", encoding="utf8") as log:
+        _ = log.write(encoder.encode("t", LogLevel.ERROR, None, "gz", {"k": "v"}) + "\n")
+    assert list(read_json_lines(str(log_file))) == [
+        {"ts": "t", "level": "ERROR", "msg": "gz", "k": "v"}
+    ]
+
+def test_logit_text_output_fields(mock_frameinfo: Mock):
+    """Test fields are appended as key=value in text mode (also via the ring buffer)"""
+    logger = Logit(ring_size=5, ring_trigger=LogLevel.WARN)
+    with patch.object(logger, "_notify") as mock_notify:
+        logger.info("queued", job=7)
+        logger.warn("done", status="ok", took=1.5)
+        emitted = [call[0][0] for call in mock_notify.call_args_list]
+    assert emitted[0].endswith("[INFO]: queued job=7")
+    assert emitted[1].endswith("[WARN]: done status=ok took=1.5")
+
+# --------------------------
+# Test Cached Timestamps
+# --------------------------
+def test_timestamp_cache_reformats_once_per_second():
+    """Test strftime runs only when the second changes"""
+    cache = TimestampCache("ms")
+    with patch("time.strftime", return_value="2026-01-23 12:34:56") as mock_strftime:
+        assert cache.format(1000.25) == "2026-01-23 12:34:56.250"
+        assert cache.format(1000.789) == "2026-01-23 12:34:56.789"
+        assert mock_strftime.call_count == 1
+        _ = cache.format(1001.0)
+        assert mock_strftime.call_count == 2
+
+def test_timestamp_cache_precisions_and_utc():
+    """Test seconds/microseconds precision and UTC ISO-8601 output"""
+    created = 1769171696.123456  # 2026-01-23 12:34:56.123456 UTC
+    assert TimestampCache("us", utc=True).format(created) == "2026-01-23T12:34:56.123456Z"
+    assert TimestampCache("ms", utc=True).format(created) == "2026-01-23T12:34:56.123Z"
+    assert TimestampCache("s", utc=True).format(created) == "2026-01-23T12:34:56Z"
+    assert TimestampCache().format(created) == time.strftime(
+        '%Y-%m-%d %H:%M:%S', time.localtime(created)
+    )
+    # Current time path (time.time_ns)
+    assert len(TimestampCache("us").format()) == len("2026-01-23 12:34:56.123456")
+    with pytest.raises(ValueError):
+        _ = TimestampCache("ns")  # type: ignore
+
+def test_timestamp_cache_threads_alternating_seconds():
+    """Test threads formatting different seconds never mix a second with another's text"""
+    cache = TimestampCache("s", utc=True)
+    base = 1769171696  # 2026-01-23 12:34:56 UTC
+    expected = {base + k: time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(base + k)) for k in range(4)}
+    mismatches: list[str] = []
+
+    def format_many(offset: int):
+        for i in range(2000):
+            second = base + (i + offset) % 4
+            if (text := cache.format(second + 0.5)) != expected[second]:
+                mismatches.append(text)
+
+    threads = [threading.Thread(target=format_many, args=(k,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert mismatches == []
+
+def test_logit_timestamp_options(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test Logit passes precision/UTC options to its timestamp cache"""
+    logger = Logit(timestamp_precision="ms", utc=True)
+    logger.info("precise")
+    timestr = capsys.readouterr().out.split(" ", 1)[0]
+    assert timestr.endswith("Z") and "T" in timestr and len(timestr) == len("2026-01-23T12:34:56.123Z")
+
+# --------------------------
+# Test Log Storm Suppression
+# --------------------------
+def test_rate_limiter_token_bucket():
+    """Test burst, refill and suppressed counts of the token bucket"""
+    with patch("time.monotonic", return_value=100.0) as mock_clock:
+        limiter = RateLimiter(rate=2.0, burst=3)
+        assert [limiter.allow("k") for _ in range(5)] == [0, 0, 0, -1, -1]
+        assert limiter.allow("other") == 0  # Independent bucket
+        mock_clock.return_value = 100.5  # +1 token
+        assert limiter.allow("k") == 2  # Allowed, reports the suppressed records
+        assert limiter.allow("k") == -1
+        assert limiter.suppressed == 3
+        assert limiter.drain() == [("k", 1)]
+        assert limiter.drain() == []
+
+def test_rate_limiter_evicts_oldest_key():
+    """Test the number of tracked keys stays bounded"""
+    limiter = RateLimiter(rate=1.0, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        assert limiter.allow(key) == 0
+    assert list(limiter._buckets) == ["b", "c"]
+    limiter.reset()
+    assert not limiter._buckets and limiter.suppressed == 0
+    with pytest.raises(ValueError):
+        _ = RateLimiter(rate=0)
+
+def test_logit_rate_limit_summaries(mock_frameinfo: Mock):
+    """Test Logit suppresses storms per key and summarizes them"""
+    logger = Logit(rate_limit=1.0, rate_burst=2)
+    with patch.object(logger, "_notify") as mock_notify, \
+         patch("time.monotonic", return_value=50.0) as mock_clock:
+        for i in range(10):
+            logger.err("db down: %s", i)
+            logger.err(lambda: "lazy storm")
+        logger.warn("db down: %s", 0)  # Different level → different key
+        assert logger.suppressed == 16
+        mock_clock.return_value = 51.0
+        logger.err("db down: %s", 99)
+        logger.flush()
+        emitted = [call[0][0] for call in mock_notify.call_args_list]
+
+    assert [line.split("[ERROR]: ")[-1] for line in emitted[:4]] == [
+        "db down: 0", "lazy storm", "db down: 1", "lazy storm"
+    ]
+    assert emitted[5].endswith("[ERROR]: [Suppressed] db down: %s: repeated 8 times")
+    assert emitted[6].endswith("[ERROR]: db down: 99")
+    assert emitted[7].endswith("[ERROR]: [Suppressed] <<lambda>>: repeated 8 times")
+    assert len(emitted) == 8
+    assert logger.flush_suppressed() == 0
+    assert Logit().flush_suppressed() == 0
+
+# --------------------------
+# Test Output Sinks
+# --------------------------
+def test_logit_sinks_fan_out_once(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test every sink gets the same record object, filtered by its own level"""
+    everything = MemorySink()
+    errors_only = MemorySink(level=LogLevel.ERROR)
+    logger = Logit(sinks=[everything, errors_only], output_format="json")
+    with patch.object(logger, "_format_record", wraps=logger._format_record) as mock_format:
+        logger.info("started", job=1)
+        logger.err("failed")
+    assert mock_format.call_count == 2  # Formatted once per record, not per sink
+    assert capsys.readouterr().out == ""  # Sinks replace the built-in console output
+    assert [r.text for r in everything.records] == ["started", "failed"]
+    assert errors_only.records[0] is everything.records[1]
+    record = everything.records[0]
+    assert record.fields == {"job": 1} and record.location == (42, "/test/file.py")
+    assert json.loads(everything.lines[0])["job"] == 1
+    everything.clear()
+    assert everything.lines == []
+
+def test_console_and_file_sinks(capsys: CaptureFixture[str], tmp_path: Path, mock_frameinfo: Mock):
+    """Test console/file/rotating-file sinks write the formatted lines"""
+    log_file = tmp_path / "sink.log"
+    rotating_file = tmp_path / "rotating.log"
+    rotating = RotatingFileSink(str(rotating_file), max_bytes=60, backup_count=1)
+    logger = Logit(sinks=[ConsoleSink(), FileSink(str(log_file), level=LogLevel.WARN), rotating])
+    for i in range(3):
+        logger.warn("warning number %d", i)
+    logger.info("info only on console and rotating file")
+    logger.close()
+    logger.close()
+    console = capsys.readouterr().out.splitlines()
+    assert len(console) == 4 and console[0].endswith("[WARN]: warning number 0")
+    assert [line.split(": ", 1)[1] for line in log_file.read_text(encoding="utf8").splitlines()] == [
+        "warning number 0", "warning number 1", "warning number 2"
+    ]
+    assert len(RotatingFile(str(rotating_file)).rotated_files()) == 1
+
+def test_async_sink_isolates_slow_sink(mock_frameinfo: Mock):
+    """Test a slow asynchronous sink neither blocks the caller nor the other sinks"""
+    class SlowSink(LogSink):
+        def __init__(self):
+            self.written: list[str] = []
+            super().__init__(async_queue=True)
+
+        def write(self, records: list[LogRecord]):
+            time.sleep(0.2)
+            self.written.extend(record.text for record in records)
+
+    slow, fast = SlowSink(), MemorySink()
+    logger = Logit(sinks=[slow, fast], location=False)
+    start = time.perf_counter()
+    for i in range(5):
+        logger.info("record %d", i)
+    assert time.perf_counter() - start < 0.15
+    assert len(fast.records) == 5
+    logger.flush()
+    assert slow.written == [f"record {i}" for i in range(5)]
+    logger.close()
+    slow.emit(fast.records[0])  # Ignored after close()
+    assert len(slow.written) == 5
+
+def test_sink_errors_are_reported(capsys: CaptureFixture[str], mock_frameinfo: Mock):
+    """Test a failing sink is reported and does not affect the others"""
+    class BrokenSink(LogSink):
+        def write(self, records: list[LogRecord]):
+            raise OSError("disk gone")
+
+    broken, memory = BrokenSink(), MemorySink()
+    logger = Logit(sinks=[broken, memory])
+    logger.err("still delivered")
+    assert broken.errors == 1 and len(memory.records) == 1
+    assert "[Log Sink Error]: BrokenSink: OSError: disk gone" in capsys.readouterr().out
+    with pytest.raises(NotImplementedError):
+        LogSink().write([])
+    with pytest.raises(ValueError):
+        _ = MemorySink(policy="spill")  # type: ignore
+
+def test_socket_sink_tcp_and_udp(mock_frameinfo: Mock):
+    """Test the socket sink ships newline-terminated lines (TCP) and datagrams (UDP)"""
+    with socket.create_server(("127.0.0.1", 0)) as tcp_server, \
+            socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp_server:
+        udp_server.bind(("127.0.0.1", 0))
+        udp_server.settimeout(5)
+        tcp_sink = SocketSink("127.0.0.1", tcp_server.getsockname()[1])
+        udp_sink = SocketSink("127.0.0.1", udp_server.getsockname()[1], protocol="udp", async_queue=False)
+        logger = Logit(sinks=[tcp_sink, udp_sink])
+        logger.info("over the wire")
+        logger.warn("second")
+        logger.close()
+
+        connection, _ = tcp_server.accept()
+        with connection:
+            connection.settimeout(5)
+            received = b""
+            while chunk := connection.recv(4096):
+                received += chunk
+        lines = received.decode("utf8").splitlines()
+        assert len(lines) == 2 and lines[0].endswith("[INFO]: over the wire")
+        assert udp_server.recv(4096).decode("utf8").endswith("[INFO]: over the wire")
+    with pytest.raises(ValueError):
+        _ = SocketSink("127.0.0.1", 1, protocol="sctp")  # type: ignore
+
+def test_sqlite_sink_inserts_records(tmp_path: Path, mock_frameinfo: Mock):
+    """Test the SQLite sink stores the structured parts of each record"""
+    database = tmp_path / "logs.db"
+    sink = SQLiteSink(str(database), async_queue=True)
+    logger = Logit(sinks=[sink], ring_size=5, ring_formatted=True)
+    logger.info("ringed", user="bob")  # Formatted ring entry (LogRecord) dumped by the error
+    logger.err("stored")
+    logger.close()
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute("SELECT level, lineno, filename, msg, fields FROM logs").fetchall()
+    connection.close()
+    assert rows == [
+        (1, 42, "/test/file.py", "ringed", '{"user": "bob"}'),
+        (3, 42, "/test/file.py", "stored", None),
+    ]
+    with pytest.raises(ValueError):
+        _ = SQLiteSink(":memory:", table="logs; DROP TABLE x")
+
+def test_sqlite_sink_batches_by_count(tmp_path: Path):
+    """Test synchronous mode commits one executemany() transaction per commit_records"""
+    sink = SQLiteSink(str(tmp_path / "logs.db"), commit_records=3, commit_interval=60.0)
+    logger = Logit(sinks=[sink], location=False)
+    with patch.object(sink._db, "executemany", wraps=sink._db.executemany) as mock_many:
+        for i in range(7):
+            logger.info("record %d", i)
+        assert [len(call.args[1]) for call in mock_many.call_args_list] == [3, 3]
+        assert len(sink._pending) == 1
+        assert len(sink.query()) == 7  # query() commits pending records first
+    logger.close()
+
+@pytest.mark.parametrize("async_queue", [True, False], ids=["sink_thread", "sync_timer"])
+def test_sqlite_sink_commits_by_interval(tmp_path: Path, mock_frameinfo: Mock, async_queue: bool):
+    """Test aged records are committed without new records arriving (sink thread in
+    asynchronous mode, timer in synchronous mode)"""
+    database = tmp_path / "logs.db"
+    sink = SQLiteSink(str(database), commit_records=1000, commit_interval=0.05, async_queue=async_queue)
+    logger = Logit(sinks=[sink])
+    logger.warn("aged record")
+    deadline = time.monotonic() + 5
+    rows: list[dict[str, object]] = []
+    while not rows and time.monotonic() < deadline:
+        time.sleep(0.02)
+        rows = list(query_log_db(str(database)))
+    assert [row["msg"] for row in rows] == ["aged record"]
+    logger.close()
+
+def test_sqlite_sink_sync_commits_at_exit(tmp_path: Path):
+    """Test buffered rows of a synchronous SQLite sink are committed at interpreter exit"""
+    database = tmp_path / "exit.db"
+    code = (
+        "import sys\n"
+        "from src.pyutilities.logit import Logit, SQLiteSink\n"
+        "logger = Logit(location=False, sinks=[SQLiteSink(sys.argv[1])])\n"
+        "for i in range(10):\n"
+        "    logger.info('record %d', i)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(database)],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    with sqlite3.connect(database) as connection:
+        count = connection.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+    connection.close()
+    assert count == 10
+
+def test_unclosed_sinks_are_not_kept_alive():
+    """Test exit finalizers do not keep unclosed sinks/debug outputs alive"""
+    registry = multiprocessing.util._finalizer_registry  # type: ignore
+    before = len(registry)
+    refs = [weakref.ref(MemorySink()) for _ in range(200)]
+    refs.append(weakref.ref(DebugOutput("memory", buffer_lines=10)))
+    _ = gc.collect()
+    assert all(ref() is None for ref in refs)
+    assert len(registry) <= before
+
+def test_logit_sinks_with_logfile(tmp_path: Path, mock_frameinfo: Mock):
+    """Test a logfile given together with sinks is written through an added FileSink"""
+    for async_write in (False, True):
+        memory = MemorySink()
+        log_file = tmp_path / f"with_sinks_{async_write}.log"
+        logger = Logit(logfile=str(log_file), async_write=async_write, sinks=[memory])
+        assert logger._writer is None and logger._file is None  # No unused writer thread/file
+        with patch("builtins.print"):
+            logger.info("both")
+        logger.close()
+        assert log_file.read_text(encoding="utf8").endswith("[INFO]: both\n")
+        assert len(memory.records) == 1
+
+    with pytest.raises(ValueError, match="collector"):
+        _ = Logit(sinks=[MemorySink()], collector=Mock())  # type: ignore
+
+def test_sqlite_sink_non_finite_fields(tmp_path: Path):
+    """Test NaN/Infinity fields are stored as strict JSON strings"""
+    database = tmp_path / "nan.db"
+    sink = SQLiteSink(str(database))
+    sink.emit(LogRecord(1.0, LogLevel.INFO, None, "ratio", {"ratio": float("nan"), "max": float("inf")}, "ratio"))
+    sink.close()
+    with sqlite3.connect(database) as connection:
+        stored = connection.execute("SELECT fields FROM logs").fetchone()[0]
+    connection.close()
+    assert json.loads(stored) == {"ratio": "nan", "max": "inf"}
+
+def test_sqlite_sink_indexed_queries(tmp_path: Path):
+    """Test time range / level / location queries and the table indexes"""
+    database = str(tmp_path / "logs.db")
+    sink = SQLiteSink(database)
+    for created, level, location, text in (
+        (100.0, LogLevel.INFO, (10, "a.py"), "boot"),
+        (200.0, LogLevel.WARN, (20, "a.py"), "slow"),
+        (300.0, LogLevel.ERROR, (10, "b.py"), "crash"),
+        (400.0, LogLevel.INFO, (10, "a.py"), "idle"),
+    ):
+        sink.emit(LogRecord(created, level, location, text, {"n": created} if text == "crash" else None, text))
+    assert [r["msg"] for r in sink.query(start=200.0, end=400.0)] == ["slow", "crash"]
+    assert [r["msg"] for r in sink.query(min_level=LogLevel.WARN)] == ["slow", "crash"]
+    assert [r["msg"] for r in sink.query(filename="a.py", lineno=10)] == ["boot", "idle"]
+    assert [r["msg"] for r in sink.query(limit=1)] == ["boot"]
+    crash = sink.query(min_level=LogLevel.ERROR)[0]
+    assert crash["level"] is LogLevel.ERROR and crash["fields"] == {"n": 300.0}
+    sink.close()
+
+    assert [r["msg"] for r in query_log_db(database, start=300.0)] == ["crash", "idle"]
+    with sqlite3.connect(database) as connection:
+        indexes = {row[0] for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'logs'"
+        )}
+        plan = " ".join(str(row) for row in connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM logs WHERE level >= 2 ORDER BY ts"
+        ))
+    connection.close()
+    assert indexes == {"logs_ts", "logs_level", "logs_location"}
+    assert "USING INDEX" in plan
+
+# --------------------------
+# Test Log File Search
+# --------------------------
+def _write_search_log(path: Path, count: int, start: float = 1769171696.0, **options: object) -> list[str]:
+    """Helper: write count records one second apart (every 7th an ERROR with a continuation line)"""
+    logger = Logit(location=False, **options)  # type: ignore[arg-type]
+    lines: list[str] = []
+    for i in range(count):
+        level = LogLevel.ERROR if i % 7 == 0 else LogLevel.INFO
+        lines.append(logger._format_record(level, f"record {i:05d}", None, start + i))
+        if level == LogLevel.ERROR:
+            lines.append(f"  traceback of record {i:05d}")
+    with open(path, "a", encoding="utf8") as log:
+        _ = log.write("".join(line + "\n" for line in lines))
+    return lines
+
+def test_log_index_time_range_and_level(tmp_path: Path):
+    """Test indexed searches match a full scan and the sparse index is saved"""
+    log_file = tmp_path / "big.log"
+    lines = _write_search_log(log_file, 3000, utc=True)
+    index = LogIndex(str(log_file), index_interval=4096)
+    assert index.update() > 10
+    assert (tmp_path / "big.log.idx").exists()
+    keys = [key for key, _ in index.entries]
+    assert keys == sorted(keys)
+
+    records = [line for line in lines if not line.startswith(" ")]
+    start, end = records[1000][:19], records[1200][:19]  # UTC: "2026-01-23T12:..."
+    expected: list[str] = []
+    selected = False
+    for line in lines:
+        if not line.startswith(" "):  # Continuation lines follow their record
+            selected = start <= line[:19] < end
+        if selected:
+            expected.append(line)
+    assert len(expected) > 200
+    assert list(index.search(start, end)) == expected
+    assert list(index.search(1769171696.0 + 1000, 1769171696.0 + 1200)) == expected  # Epoch bounds
+
+    errors = list(search_log(str(log_file), start, end, LogLevel.ERROR))
+    assert errors[0].endswith("[ERROR]: record 01001") and errors[1] == "  traceback of record 01001"
+    assert len(errors) == 2 * len([i for i in range(1000, 1200) if i % 7 == 0])
+    assert list(index.search("2099")) == []
+    assert len(list(index.search())) == len(lines)
+
+def test_log_index_incremental_and_rebuild(tmp_path: Path):
+    """Test a growing file extends the index and a replaced file rebuilds it"""
+    log_file = tmp_path / "grow.log"
+    _ = _write_search_log(log_file, 500)
+    first = LogIndex(str(log_file), index_interval=2048)
+    _ = first.update()
+    old_entries = first.entries
+
+    _ = _write_search_log(log_file, 500, start=1769171696.0 + 500)
+    reloaded = LogIndex(str(log_file), index_interval=2048)  # Loads the saved index
+    with patch.object(LogIndex, "_next_record", wraps=LogIndex._next_record) as mock_next:
+        _ = reloaded.update()
+    assert reloaded.entries[:len(old_entries)] == old_entries
+    assert len(reloaded.entries) > len(old_entries)
+    assert mock_next.call_count <= len(reloaded.entries) - len(old_entries) + 1  # Only new blocks
+    assert len(list(reloaded.search(min_level=LogLevel.WARN))) == 2 * len(range(0, 500, 7)) * 2
+
+    log_file.write_text("", encoding="utf8")
+    _ = _write_search_log(log_file, 3, start=1769171696.0 + 86400)
+    replaced = LogIndex(str(log_file), index_interval=2048)
+    assert [line[-5:] for line in replaced.search() if "record" in line and "traceback" not in line] == [
+        "00000", "00001", "00002"
+    ]
+    empty = tmp_path / "empty.log"
+    empty.touch()
+    assert list(LogIndex(str(empty)).search()) == []
+
+def test_log_index_json_lines(tmp_path: Path):
+    """Test JSON Lines logs are indexed by their "ts" key and filtered by "level" """
+    log_file = tmp_path / "app.jsonl"
+    _ = _write_search_log(log_file, 50, output_format="json")
+    found = list(search_log(str(log_file), 1769171696.0 + 10, 1769171696.0 + 20, LogLevel.ERROR))
+    assert [json.loads(line)["msg"] for line in found if line.startswith("{")] == ["record 00014"]
+
+def test_log_index_survives_rotation_retention(tmp_path: Path):
+    """Test the "<path>.idx" sidecar is not counted or deleted as a rotated file"""
+    log_file = tmp_path / "app.log"
+    rotating = RotatingFile(str(log_file), max_bytes=200, backup_count=2)
+    index = LogIndex(str(log_file), index_interval=64)
+    try:
+        for i in range(40):
+            rotating.write(f"2026-01-23 12:00:{i:02d} [INFO]: record {i:02d} " + "x" * 20 + "\n")
+            if i % 10 == 0:
+                _ = index.update()
+    finally:
+        rotating.close()
+
+    assert (tmp_path / "app.log.idx").exists()
+    backups = rotating.rotated_files()
+    assert len(backups) == 2
+    assert all(not backup.endswith(".idx") for backup in backups)
+    # The index still answers queries over the active file
+    _ = index.update()
+    assert list(index.search()) == log_file.read_text(encoding="utf8").splitlines()
+
+def test_search_main_cli(tmp_path: Path, capsys: CaptureFixture[str]):
+    """Test the pyutilities-logsearch console entry point"""
+    log_file = tmp_path / "cli.log"
+    lines = _write_search_log(log_file, 30)  # lines[0:2] are record 0 and its traceback
+    assert search_main([str(log_file), "--start", lines[3][:19], "--end", lines[5][:19],
+                        "--level", "INFO", "--rebuild"]) == 0
+    assert capsys.readouterr().out.splitlines() == lines[3:5]
+    assert search_main([str(tmp_path / "missing.log")]) == 1
+    assert "No such file" in capsys.readouterr().err
+
+def test_search_main_installed_layout(tmp_path: Path):
+    """Test the console entry point imports as pyutilities.logit (installed package layout)"""
+    log_file = tmp_path / "installed.log"
+    lines = _write_search_log(log_file, 10)
+    code = (
+        "import sys\n"
+        "from pyutilities.logit import search_main\n"
+        "sys.exit(search_main(sys.argv[1:]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code, str(log_file), "--level", "ERROR"],
+        cwd=Path(__file__).parent.parent / "src",
+        capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    output = result.stdout.splitlines()
+    assert [line for line in output if "[" in line] == [line for line in lines if "[ERROR]" in line]
+    assert "  traceback of record 00000" in output
+
+# --------------------------
+# Test Log Context Fields
+# --------------------------
+def test_log_context_nesting_and_text_output(mock_frameinfo: Mock):
+    """Test bound fields are appended to records and nested contexts merge"""
+    logger = Logit()
+    with patch.object(logger, "_notify") as mock_notify:
+        with logger.bind(request_id="r-1"):
+            logger.info("outer")
+            with LogContext(trace_id="t-9", request_id="r-2"):
+                logger.info("inner", step=2)
+                assert get_log_context() == {"request_id": "r-2", "trace_id": "t-9"}
+            logger.info("outer again")
+        logger.info("unbound")
+        emitted = [call[0][0].split("]: ", 1)[1] for call in mock_notify.call_args_list]
+    assert emitted == [
+        "outer request_id=r-1",
+        "inner request_id=r-2 trace_id=t-9 step=2",
+        "outer again request_id=r-1",
+        "unbound",
+    ]
+    assert get_log_context() == {}
+
+def test_log_context_json_sinks_and_ring(mock_frameinfo: Mock):
+    """Test context fields in JSON output, sink records and deferred ring records"""
+    memory = MemorySink()
+    logger = Logit(output_format="json", sinks=[memory], ring_size=5)
+    with LogContext(request_id="r-7"):
+        logger.info("queued")  # Ring record: context captured now, formatted on dump
+    with LogContext(request_id="r-8"):
+        logger.err("failed", code=500)
+    first, second = (json.loads(line) for line in memory.lines)
+    assert first["request_id"] == "r-7" and first["msg"] == "queued"
+    assert second["request_id"] == "r-8" and second["code"] == 500
+    assert memory.records[1].fields == {"request_id": "r-8", "code": 500}
+
+def test_log_context_overridden_by_call_field(mock_frameinfo: Mock):
+    """Test a per-call field replaces a bound field of the same key (written once)"""
+    memory = MemorySink()
+    json_logger = Logit(output_format="json", sinks=[memory])
+    text_logger = Logit()
+    with LogContext(request_id="r-1", user="ann"):
+        json_logger.info("retry", request_id="r-2")
+        with patch.object(text_logger, "_notify") as mock_notify:
+            text_logger.info("retry", request_id="r-2")
+    line = memory.lines[0]
+    assert line.count('"request_id"') == 1
+    assert json.loads(line)["request_id"] == "r-2" and json.loads(line)["user"] == "ann"
+    assert mock_notify.call_args[0][0].endswith("]: retry request_id=r-2 user=ann")
+
+def test_log_context_isolated_between_tasks(mock_frameinfo: Mock):
+    """Test concurrent asyncio tasks and threads keep their own bindings"""
+    memory = MemorySink()
+    logger = Logit(sinks=[memory], location=False)
+
+    async def handle(request_id: str):
+        with logger.bind(request_id=request_id):
+            await asyncio.sleep(0.01)
+            logger.info("handled")
+
+    async def main():
+        _ = await asyncio.gather(handle("a"), handle("b"))
+
+    with LogContext(request_id="main"):
+        thread = threading.Thread(target=logger.info, args=("from thread",))
+        thread.start()
+        thread.join()
+    asyncio.run(main())
+    assert sorted(memory.lines[i].split("]: ")[1] for i in range(3)) == [
+        "from thread", "handled request_id=a", "handled request_id=b"
+    ]
+
+# --------------------------
+# Test Decorator Call Capture
+# --------------------------
+def _captured_lines(logger: Logit, call: "types.FunctionType", *args: object, **kwargs: object) -> list[str]:
+    """Helper: run call(*args, **kwargs) and return the emitted messages"""
+    with patch.object(logger, "_notify") as mock_notify:
+        try:
+            _ = call(*args, **kwargs)
+        except Exception:
+            pass
+    return [c[0][0].split("]: ", 1)[1] for c in mock_notify.call_args_list]
+
+def test_logit_capture_args_result_and_redaction(mock_frameinfo: Mock):
+    """Test arguments/return value are logged size-limited and redacted"""
+    logger = Logit(capture_args=True, capture_result=True, redact={"password"}, max_repr=12)
+
+    @logger
+    def login(user: str, password: str, *extra: int, retries: int = 3) -> dict[str, object]:
+        return {"user": user, "roles": list(range(1000))}
+
+    lines = _captured_lines(logger, login, "x" * 50, "hunter2", 7, retries=5)
+    assert lines[0] == "login(user='xxx...xxxx', password=***, 7, retries=5) was called"
+    assert "hunter2" not in "".join(lines)
+    assert lines[1] == "login() returned {'roles': [0, 1, 2, 3, 4, 5, ...], 'user': 'xxx...xxxx'}"
+
+def test_logit_capture_exception_and_duration(mock_frameinfo: Mock):
+    """Test raised exceptions are logged at ERROR with the duration and re-raised"""
+    logger = Logit(capture_exceptions=True, timing=True)
+
+    @logger
+    def fail(value: int) -> int:
+        raise KeyError(value)
+
+    with patch.object(logger, "_notify") as mock_notify:
+        with pytest.raises(KeyError):
+            _ = fail(3)
+    lines = [c[0][0] for c in mock_notify.call_args_list]
+    assert lines[0].endswith("[INFO]: fail() was called")
+    assert "[ERROR]: fail() raised KeyError: 3 in " in lines[1] and lines[1].endswith(" seconds")
+
+    quiet = Logit(capture_result=True, timing=True)
+
+    @quiet
+    def also_fail() -> None:
+        raise ValueError("x")
+
+    lines = _captured_lines(quiet, also_fail)
+    assert lines[1].startswith("also_fail() finished in ")  # Exceptions not captured
+
+def test_logit_capture_sampling(mock_frameinfo: Mock):
+    """Test sample_every logs one call in N (unsampled calls run unlogged)"""
+    logger = Logit(sample_every=4)
+    calls: list[int] = []
+
+    @logger
+    def work(i: int):
+        calls.append(i)
+
+    with patch.object(logger, "_notify") as mock_notify:
+        for i in range(10):
+            work(i)
+    assert calls == list(range(10))
+    assert mock_notify.call_count == 3  # Calls 0, 4 and 8
+    assert mock_notify.call_args[0][0].endswith("work() was called")
+
+def test_logit_capture_bounded_repr_cost(mock_frameinfo: Mock):
+    """Test huge or broken arguments cost a bounded amount of work"""
+    class Broken:
+        def __repr__(self) -> str:
+            raise RuntimeError("no repr")
+
+    class CountingList(list[int]):
+        visited = 0
+
+        def __iter__(self):
+            for item in super().__iter__():
+                CountingList.visited += 1
+                yield item
+
+    logger = Logit(capture_args=True, max_repr=20)
+
+    @logger
+    def consume(data: list[int], other: object):
+        pass
+
+    lines = _captured_lines(logger, consume, CountingList(range(1_000_000)), Broken())
+    assert lines[0].startswith("consume(data=[0, 1, 2, 3, 4, 5, ...], other=")
+    assert "<Broken instance at 0x" in lines[0]
+    assert CountingList.visited <= 10
+
+    wide = Logit(capture_args=True, max_repr=8)
+
+    @wide
+    def many(*values: int):
+        pass
+
+    line = _captured_lines(wide, many, *range(100, 200))[0]
+    assert len(line) <= len("many() was called") + 32 and "..." in line
+
+def test_logit_capture_coroutine_and_generator(mock_frameinfo: Mock):
+    """Test capture on coroutine (result awaited) and generator functions"""
+    logger = Logit(capture_args=True, capture_result=True, timing=True)
+
+    @logger
+    async def double(value: int) -> int:
+        await asyncio.sleep(0)
+        return value * 2
+
+    @logger
+    def count(limit: int):
+        yield from range(limit)
+
+    with patch.object(logger, "_notify") as mock_notify:
+        assert asyncio.run(double(21)) == 42
+        assert list(count(3)) == [0, 1, 2]
+    lines = [c[0][0].split("]: ", 1)[1] for c in mock_notify.call_args_list]
+    assert lines[0] == "double(value=21) was called"
+    assert lines[1].startswith("double() returned 42 in ")
+    assert lines[2] == "count(limit=3) was called"
+    assert lines[3].startswith("count() finished in ")
+
+def test_logit_capture_coroutine_call_site_location(capsys: CaptureFixture[str]):
+    """Test captured coroutine/generator lines report the caller, not logit.py or asyncio"""
+    logger = Logit(capture_args=True, capture_result=True, capture_exceptions=True, timing=True)
+
+    @logger
+    async def double(value: int) -> int:
+        await asyncio.sleep(0)
+        return value * 2
+
+    @logger
+    async def fail():
+        raise ValueError("bad")
+
+    @logger
+    def count(limit: int):
+        yield from range(limit)
+
+    async def main():
+        assert await double(21) == 42
+        with pytest.raises(ValueError):
+            await fail()
+
+    assert inspect.iscoroutinefunction(double)
+    asyncio.run(main())
+    assert list(count(2)) == [0, 1]
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 6
+    assert "fail() raised ValueError" in lines[3]
+    for line in lines:
+        assert f"@{__file__} [" in line
+
 # --------------------------
 # Test EmailLogit Class
 # --------------------------
@@ -961,6 +3025,141 @@ def test_email_logit_notify_smtp_connection_failure(capsys: CaptureFixture[str])
         assert expected_error_msg in captured.out
 
 
+
+# --------------------------
+# Test EmailLogit Asynchronous Delivery
+# --------------------------
+class _SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server: records sessions/messages, can drop idle sessions"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPStandInHandler)
+        self.sessions = 0
+        self.logins: list[str] = []
+        self.messages: list[str] = []
+        self.drop_after_message = False
+
+class _SMTPStandInHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP for smtplib (EHLO, AUTH PLAIN, MAIL, RCPT, DATA, QUIT)"""
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        assert isinstance(server, _SMTPStandIn)
+        server.sessions += 1
+        self.reply("220 stand-in ready")
+        while line := self.rfile.readline().decode().strip():
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-stand-in")
+                self.reply("250 AUTH PLAIN")
+            elif command == "AUTH":
+                server.logins.append(line)
+                self.reply("235 ok")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                data: list[str] = []
+                while (body := self.rfile.readline().decode()) not in (".\r\n", ""):
+                    data.append(body)
+                server.messages.append("".join(data))
+                self.reply("250 queued")
+                if server.drop_after_message:
+                    return  # Simulate the server closing an idle session
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+@pytest.fixture
+def smtp_stand_in():
+    """Fixture: local SMTP stand-in server running on a background thread"""
+    server = _SMTPStandIn()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_email_digest_sender_batches_by_size(smtp_stand_in: _SMTPStandIn):
+    """Test records are combined into digests over one reused SMTP session"""
+    sender = EmailDigestSender(
+        "127.0.0.1", smtp_stand_in.server_address[1], "bot@example.com", "pw",
+        "dev@example.com", digest_interval=60.0, digest_size=3, starttls=False
+    )
+    for i in range(7):
+        sender.put(f"record {i}")
+    sender.flush()  # Sends the incomplete third digest
+    assert len(smtp_stand_in.messages) == 3
+    assert "Subject: Log Digest (3 records)" in smtp_stand_in.messages[0]
+    assert "record 0\r\nrecord 1\r\nrecord 2" in smtp_stand_in.messages[0]
+    assert "record 6" in smtp_stand_in.messages[2]
+    assert smtp_stand_in.sessions == 1 and len(smtp_stand_in.logins) == 1
+    sender.close()
+    sender.close()
+    assert sender.sent == 3 and sender.failed == 0
+
+def test_email_digest_sender_time_window_and_reconnect(smtp_stand_in: _SMTPStandIn):
+    """Test digests are sent when the window elapses and dropped sessions reconnect"""
+    smtp_stand_in.drop_after_message = True
+    sender = EmailDigestSender(
+        "127.0.0.1", smtp_stand_in.server_address[1], "", "", "dev@example.com",
+        digest_interval=0.05, digest_size=100, retry_backoff=0.0, starttls=False
+    )
+    sender.put("first")
+    deadline = time.monotonic() + 5
+    while not smtp_stand_in.messages and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(smtp_stand_in.messages) == 1  # Sent without flush()
+    sender.put("second")
+    sender.close()
+    assert "second" in smtp_stand_in.messages[1]
+    assert smtp_stand_in.sessions == 2  # Stale session replaced
+    assert smtp_stand_in.logins == []  # No username → no login
+
+def test_email_digest_sender_retry_backoff(capsys: CaptureFixture[str]):
+    """Test failed deliveries are retried with exponential backoff, then reported"""
+    with patch("smtplib.SMTP") as mock_smtp, patch("time.sleep") as mock_sleep:
+        mock_smtp.side_effect = [
+            ConnectionRefusedError("refused"),
+            ConnectionRefusedError("refused"),
+            MagicMock(),
+        ]
+        sender = EmailDigestSender("smtp.example.com", 587, "u", "p", "dev@example.com",
+                                   max_retries=2, retry_backoff=0.5)
+        sender.put("will be retried")
+        sender.flush()
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [0.5, 1.0]
+        assert sender.sent == 1
+
+        mock_smtp.side_effect = smtplib.SMTPConnectError(421, "busy")
+        sender._disconnect()
+        sender.put("gives up")
+        sender.flush()
+        sender.close()
+    assert sender.failed == 1
+    assert "[Email Notification Error]: SMTPConnectError" in capsys.readouterr().out
+
+def test_email_logit_async_delivery(smtp_stand_in: _SMTPStandIn, capsys: CaptureFixture[str]):
+    """Test EmailLogit(async_delivery=True) prints inline and mails digests in the background"""
+    logger = EmailLogit(
+        email="dev@example.com", username="bot@example.com", password="pw",
+        smtp_server=f"127.0.0.1:{smtp_stand_in.server_address[1]}",
+        level=LogLevel.WARN, async_delivery=True, digest_size=10, starttls=False
+    )
+    with patch("smtplib.SMTP.starttls") as mock_starttls:
+        logger.warn("disk almost full")
+        logger.err("disk full")
+        assert "disk full" in capsys.readouterr().out
+        logger.close()
+    mock_starttls.assert_not_called()
+    assert len(smtp_stand_in.messages) == 1
+    assert "Subject: [WARN] Log Digest (2 records)" in smtp_stand_in.messages[0]
+
+
 if __name__ == "__main__":
     pytest_args: list[str] = ["-v", __file__, "--cov=src.pyutilities.logit"]
     _ = pytest.main(pytest_args)
@@ -5,6 +5,7 @@
 """
 import sqlite3
 import tempfile
+from typing import cast
 
 import pytest
 from pytest import CaptureFixture
@@ -306,6 +307,32 @@ def test_commit_method(sqlite_instance: SQLite):
     assert sqlite_instance.get("SELECT * FROM orders WHERE id=3") == (3, 299.99)
 
 
+def test_executemany_method():
+    """
+    Test executemany() method:
+    - One statement over many positional/named parameter sets
+    - No auto-commit (batch persisted by commit(), discarded by rollback)
+    - RuntimeError without connection
+    """
+    sql = SQLite()
+    _ = sql.open(":memory:", factory=sqlite3.Connection)
+    _ = sql.execute1("CREATE TABLE users (id INT, name TEXT)")
+
+    assert sql.executemany("INSERT INTO users VALUES (?, ?)", [(1, "Alice"), (2, "Bob")]) == 2
+    assert sql.executemany("INSERT INTO users VALUES (:id, :name)", iter([{"id": 3, "name": "Eve"}])) == 1
+    assert sql._conn is not None and sql._conn.in_transaction
+    sql.commit()
+    assert tuple(cast(sqlite3.Row, sql.get("SELECT COUNT(*) FROM users"))) == (3,)
+
+    _ = sql.executemany("INSERT INTO users VALUES (?, ?)", [(4, "Mallory")])
+    sql._conn.rollback()
+    assert tuple(cast(sqlite3.Row, sql.get("SELECT COUNT(*) FROM users"))) == (3,)
+    _ = sql.close()
+
+    with pytest.raises(RuntimeError):
+        _ = sql.executemany("INSERT INTO users VALUES (?, ?)", [])
+
+
 def test_all_methods_without_connection():
     """
     Test that ALL methods raise RuntimeError when called without open() (covers if not self._conn: ...):